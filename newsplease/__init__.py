@@ -1,5 +1,8 @@
+import atexit
 import concurrent.futures as cf
+import contextlib
 import datetime
+import multiprocessing
 import os
 import sys
 import urllib
@@ -15,6 +18,44 @@ from dotmap import DotMap
 from newsplease.pipeline.pipelines import ExtractedInformationStorage
 from newsplease.crawler.simple_crawler import SimpleCrawler
 
+# number of extraction processes of iter_urls
+EXTRACTION_PROCESSES = os.cpu_count() or 1
+# maximum number of fetched pages per extraction process that wait for their extraction in iter_urls
+MAX_PENDING_PAGES_PER_PROCESS = 2
+
+# the extraction processes of iter_urls, which are reused across calls, see _get_extraction_pool
+_extraction_pool = None
+
+
+def _reset_extraction_pool(broken_pool):
+    """
+    Discards the pool of extraction processes if it is the given broken pool, so that _get_extraction_pool creates a
+    new one
+    :param broken_pool: A ProcessPoolExecutor whose processes broke
+    """
+    global _extraction_pool
+    if _extraction_pool is broken_pool:
+        _extraction_pool = None
+        broken_pool.shutdown(wait=False)
+
+
+def _get_extraction_pool(spawn=False):
+    """
+    Returns the pool of extraction processes, which is created on first use and after its processes broke
+    :param spawn: if True, a new pool spawns its processes instead of forking them, which is required while other
+        threads are running
+    :return: A ProcessPoolExecutor
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = cf.ProcessPoolExecutor(max_workers=EXTRACTION_PROCESSES,
+                                                  mp_context=multiprocessing.get_context("spawn") if spawn else None)
+        atexit.register(_extraction_pool.shutdown)
+        # the first task starts the processes (all of them if they are forked), so that they are not forked while the
+        # threads of SimpleCrawler fetch the urls, which can deadlock the forked processes
+        _extraction_pool.submit(int).result()
+    return _extraction_pool
+
 
 class EmptyResponseError(ValueError):
     pass
@@ -26,10 +67,13 @@ class NewsPlease:
     """
 
     @staticmethod
-    def from_warc(warc_record, decode_errors="replace", fetch_images=True):
+    def from_warc(warc_record, decode_errors="replace", fetch_images=True, extraction_timeout=None,
+                  max_html_size=None):
         """
         Extracts relevant information from a WARC record. This function does not invoke scrapy but only uses the article
         extractor.
+        :param extraction_timeout: see from_html
+        :param max_html_size: see from_html
         :return:
         """
         raw_stream = warc_record.raw_stream.read()
@@ -58,12 +102,14 @@ class NewsPlease:
         url = warc_record.rec_headers.get_header("WARC-Target-URI")
         download_date = warc_record.rec_headers.get_header("WARC-Date")
         article = NewsPlease.from_html(
-            html, url=url, download_date=download_date, fetch_images=fetch_images
+            html, url=url, download_date=download_date, fetch_images=fetch_images,
+            extraction_timeout=extraction_timeout, max_html_size=max_html_size
         )
         return article
 
     @staticmethod
-    def from_html(html, url=None, download_date=None, fetch_images=True):
+    def from_html(html, url=None, download_date=None, fetch_images=True, extraction_timeout=None,
+                  max_html_size=None):
         """
         Extracts relevant information from an HTML page given as a string. This function does not invoke scrapy but only
         uses the article extractor. If you have the original URL make sure to provide it as this helps NewsPlease
@@ -72,18 +118,25 @@ class NewsPlease:
         :param url:
         :param download_date:
         :param fetch_images:
+        :param extraction_timeout: time budget for the extraction in seconds. If it is exceeded, the extraction is
+            interrupted and the article only contains the information extracted until then. The extraction can only be
+            interrupted in the main thread on Unix, elsewhere the time budget is only checked between the extractors.
+        :param max_html_size: if set, larger HTML is reduced by emptying its <script> and <style> tags and then
+            truncated to this many characters before the extraction
         :return:
         """
         if bool(html) is False:
             return {}
 
-        extractor = article_extractor.Extractor(
+        extractor = article_extractor.get_extractor(
             (
                 ["newspaper_extractor"]
                 if fetch_images
                 else [("newspaper_extractor_no_images", "NewspaperExtractorNoImages")]
             )
-            + ["readability_extractor", "date_extractor", "lang_detect_extractor"]
+            + ["readability_extractor", "date_extractor", "lang_detect_extractor"],
+            timeout=extraction_timeout,
+            max_html_size=max_html_size,
         )
 
         title_encoded = "".encode()
@@ -113,28 +166,34 @@ class NewsPlease:
         return final_article
 
     @staticmethod
-    def from_url(url, request_args=None, fetch_images=True):
+    def from_url(url, request_args=None, fetch_images=True, extraction_timeout=None, max_html_size=None):
         """
         Crawls the article from the url and extracts relevant information.
         :param url:
         :param request_args: optional arguments that `request` takes
         :param fetch_images: whether to download images
+        :param extraction_timeout: see from_html
+        :param max_html_size: see from_html
         :return: A NewsArticle object containing all the information of the article. Else, None.
         :rtype: NewsArticle, None
         """
-        articles = NewsPlease.from_urls([url], request_args=request_args, fetch_images=fetch_images)
+        articles = NewsPlease.from_urls([url], request_args=request_args, fetch_images=fetch_images,
+                                        extraction_timeout=extraction_timeout, max_html_size=max_html_size)
         if url in articles.keys():
             return articles[url]
         else:
             return None
 
     @staticmethod
-    def from_urls(urls, request_args=None, fetch_images=True):
+    def from_urls(urls, request_args=None, fetch_images=True, extraction_timeout=None, max_html_size=None):
         """
         Crawls articles from the urls and extracts relevant information.
         :param urls:
         :param request_args: optional arguments that `request` takes
         :param fetch_images: whether to download images
+        :param extraction_timeout: time budget for the extraction of each article in seconds, see from_html. The
+            timeout in request_args only applies to the requests.
+        :param max_html_size: see from_html
         :return: A dict containing given URLs as keys, and extracted information as corresponding values.
         """
         results = {}
@@ -147,26 +206,83 @@ class NewsPlease:
         elif len(urls) == 1:
             url = urls[0]
             html = SimpleCrawler.fetch_url(url, request_args=request_args)
-            results[url] = NewsPlease.from_html(html, url, download_date, fetch_images)
+            results[url] = NewsPlease.from_html(html, url, download_date, fetch_images,
+                                                extraction_timeout=extraction_timeout, max_html_size=max_html_size)
         else:
-            results = SimpleCrawler.fetch_urls(urls, request_args=request_args)
+            results = dict(NewsPlease.iter_urls(urls, request_args=request_args, fetch_images=fetch_images,
+                                                extraction_timeout=extraction_timeout, max_html_size=max_html_size))
 
-            futures = {}
-            with cf.ProcessPoolExecutor() as exec:
-                for url in results:
-                    future = exec.submit(
-                        NewsPlease.from_html, results[url], url, download_date, fetch_images
+        return results
+
+    @staticmethod
+    def iter_urls(urls, request_args=None, fetch_images=True, extraction_timeout=None, max_html_size=None):
+        """
+        Crawls articles from the urls and extracts relevant information. Each page is passed on to a pool of extraction
+        processes as soon as it is fetched, and the articles are yielded as their extraction completes, hence in no
+        particular order. The extraction processes are reused across calls.
+        :param urls:
+        :param request_args: optional arguments that `request` takes
+        :param fetch_images: whether to download images
+        :param extraction_timeout: see from_urls
+        :param max_html_size: see from_html
+        :return: A generator of tuples of each given URL and its extracted information, which is an empty dict if the
+            page could not be fetched or extracted
+        """
+        download_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        max_pending = MAX_PENDING_PAGES_PER_PROCESS * EXTRACTION_PROCESSES
+        # futures mapped to their url, html, and whether the page was already resubmitted after its pool broke
+        futures = {}
+        _get_extraction_pool()
+
+        def submit(url, html, resubmitted=False):
+            """Submits the page to the pool, returns False if the processes of a new pool broke, too."""
+            for attempt in range(2):
+                pool = _get_extraction_pool(spawn=True)
+                try:
+                    future = pool.submit(
+                        NewsPlease.from_html, html, url, download_date, fetch_images,
+                        extraction_timeout=extraction_timeout, max_html_size=max_html_size
                     )
-                    futures[future] = url
+                except cf.process.BrokenProcessPool:
+                    # a process died, e.g., killed for its memory consumption, the page is passed on to a new pool,
+                    # whose processes are spawned since the threads of SimpleCrawler are running
+                    _reset_extraction_pool(pool)
+                    continue
+                futures[future] = (url, html, resubmitted)
+                return True
+            return False
 
-            for future in cf.as_completed(futures):
-                url = futures[future]
+        def pop_results(done_futures):
+            for future in done_futures:
+                url, html, resubmitted = futures.pop(future)
                 try:
-                    results[url] = future.result(timeout=request_args.get("timeout"))
-                except Exception as err:
-                    results[url] = {}
+                    yield url, future.result()
+                except cf.process.BrokenProcessPool:
+                    # all pending pages of a pool fail if one of its processes dies, each of them is extracted once more
+                    if resubmitted or not submit(url, html, resubmitted=True):
+                        yield url, {}
+                except Exception:
+                    yield url, {}
 
-        return results
+        try:
+            with contextlib.closing(SimpleCrawler.iter_fetch_urls(urls, request_args=request_args)) as fetched_pages:
+                for url, html in fetched_pages:
+                    if not submit(url, html):
+                        yield url, {}
+                        continue
+
+                    # no further pages are fetched while too many pages wait for their extraction
+                    if len(futures) >= max_pending:
+                        cf.wait(futures, return_when=cf.FIRST_COMPLETED)
+                    yield from pop_results([future for future in futures if future.done()])
+
+            while futures:
+                done_futures, _ = cf.wait(futures, return_when=cf.FIRST_COMPLETED)
+                yield from pop_results(done_futures)
+        finally:
+            # the generator was closed early
+            for future in futures:
+                future.cancel()
 
     @staticmethod
     def from_file(path):
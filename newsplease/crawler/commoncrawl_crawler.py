@@ -4,22 +4,27 @@ Provides functionality to crawl and extract news articles from commoncrawl.org.
 and host list, can be defined. Currently, all WARC files will be downloaded to the path WORKINGDIR/cc_download_warc, if
 not otherwise specified.
 """
+import collections
+import concurrent.futures as cf
+import json
 import logging
 import os
+import queue
+import threading
 import time
 from functools import partial
-from multiprocessing import Pool
+from multiprocessing import Manager, Pool
 import datetime
 import gzip
 from urllib.parse import urlparse
 
 import boto3
 import botocore
-from dateutil import parser
 import requests
 from scrapy.utils.log import configure_logging
 
-from ..crawler.commoncrawl_extractor import CommonCrawlExtractor
+from ..crawler.commoncrawl_extractor import CommonCrawlExtractor, _accepts_keyword_argument
+from ..crawler.commoncrawl_sink import ArticleBatcher
 
 __author__ = "Felix Hamborg"
 __copyright__ = "Copyright 2017"
@@ -32,6 +37,14 @@ __cc_bucket = 'commoncrawl'
 # log file of fully extracted WARC files
 __log_pathname_fully_extracted_warcs = None
 
+# cache file of the monthly listings of WARC files on commoncrawl.org
+__remote_index_cache_pathname = None
+# number of months whose WARC files are listed concurrently
+__number_of_remote_index_threads = 8
+# the listing of a month is final if it was fetched at least this long after the end of the month, so that files that
+# are published shortly after the end of the month are included
+__remote_index_grace_period = datetime.timedelta(days=2)
+
 # logging
 logging.basicConfig(level=logging.INFO)
 __logger = logging.getLogger(__name__)
@@ -43,6 +56,7 @@ __counter_article_passed = 0
 __counter_article_discarded = 0
 __counter_article_error = 0
 __counter_article_total = 0
+__counter_article_rejected_by_stage = collections.Counter()
 __counter_warc_skipped = 0
 __counter_warc_processed = 0
 __start_time = time.time()
@@ -60,6 +74,9 @@ def __setup(local_download_dir_warc, log_level):
     global __log_pathname_fully_extracted_warcs
     __log_pathname_fully_extracted_warcs = os.path.join(local_download_dir_warc, 'fullyextractedwarcs.list')
 
+    global __remote_index_cache_pathname
+    __remote_index_cache_pathname = os.path.join(local_download_dir_warc, 'remoteindex.json')
+
     # make loggers quiet
     configure_logging({"LOG_LEVEL": "ERROR"})
     logging.getLogger('requests').setLevel(logging.CRITICAL)
@@ -79,18 +96,6 @@ def __setup(local_download_dir_warc, log_level):
     __logger.setLevel(log_level)
 
 
-def __get_publishing_date(warc_record, article):
-    """
-    Extracts the publishing date from the article
-    :param warc_record:
-    :return:
-    """
-    if article.publish_date:
-        return parser.parse(article.publish_date)
-    else:
-        return None
-
-
 def __get_download_url(name):
     """
     Creates a download url given the name
@@ -142,12 +147,72 @@ def __date_within_period(date, start_date=None, end_date=None):
     return start_date <= date < end_date
 
 
-def __get_remote_index(warc_files_start_date=None, warc_files_end_date=None):
+def __list_warc_paths_of_month(s3_client, month):
+    """
+    Lists the WARC files of one month
+    :param s3_client: if None, the listing is fetched from data.commoncrawl.org
+    :param month: year and month as string, e.g., 2016/09
+    :return: list of WARC paths or None if the listing could not be fetched
+    """
+    if s3_client:
+        prefix = 'crawl-data/CC-NEWS/%s/' % month
+        __logger.debug('Listing objects on S3 bucket %s and prefix %s', __cc_bucket, prefix)
+        warc_paths = []
+        for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=__cc_bucket, Prefix=prefix):
+            # the prefix also contains the listing warc.paths.gz
+            warc_paths += [x['Key'] for x in page.get('Contents', []) if x['Key'].endswith('.warc.gz')]
+        return warc_paths
+    else:
+        url = '%scrawl-data/CC-NEWS/%s/warc.paths.gz' % (__cc_base_url, month)
+        __logger.debug('Fetching WARC paths listing %s', url)
+        response = requests.get(url)
+        if response:
+            return gzip.decompress(response.content).decode('ascii').strip().split('\n')
+        else:
+            __logger.info('Failed to fetch WARC file list %s: %s', url, response)
+            return None
+
+
+def __read_remote_index_cache():
+    """
+    Reads the cached monthly listings of WARC files
+    :return: A dict mapping months (e.g., 2016/09) to dicts with the time of the listing (listed_at) and the list of
+        WARC paths (warc_paths)
+    """
+    try:
+        with open(__remote_index_cache_pathname) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def __write_remote_index_cache(cache):
+    with open(__remote_index_cache_pathname + '.tmp', 'w') as cache_file:
+        json.dump(cache, cache_file)
+    os.replace(__remote_index_cache_pathname + '.tmp', __remote_index_cache_pathname)
+
+
+def __is_final_listing(month, listed_at):
     """
-    Gets the index of news crawl files from commoncrawl.org and returns an array of names
+    Checks whether a listing of WARC files is final, i.e., whether it was fetched after the month had been closed
+    :param month: year and month as string, e.g., 2016/09
+    :param listed_at: time of the listing as string, e.g., 2016-10-03T12:00:00
+    :return:
+    """
+    month_start = datetime.datetime.strptime(month, '%Y/%m')
+    next_month_start = (month_start + datetime.timedelta(days=32)).replace(day=1)
+    return datetime.datetime.strptime(listed_at, '%Y-%m-%dT%H:%M:%S') >= next_month_start + __remote_index_grace_period
+
+
+def __get_remote_index(warc_files_start_date=None, warc_files_end_date=None, cache_remote_index=True):
+    """
+    Gets the index of news crawl files from commoncrawl.org and returns an array of names. The months are listed
+    concurrently. If cache_remote_index is True, the listings are cached in local_download_dir_warc, and a month is
+    only listed again if its cached listing was fetched before the month had been closed.
     :param warc_files_start_date: only list .warc files with greater or equal date in
     their filename
     :param warc_files_end_date: only list .warc files with smaller date in their filename
+    :param cache_remote_index:
     :return:
     """
 
@@ -159,55 +224,73 @@ def __get_remote_index(warc_files_start_date=None, warc_files_end_date=None):
         __logger.info('Failed to read %s bucket, using monthly WARC file listings', __cc_bucket)
         s3_client = None
 
-    objects = []
+    # The news files are grouped per year and month in separate folders
+    months = [date.strftime('%Y/%m') for date in
+              __iterate_by_month(start_date=warc_files_start_date, end_date=warc_files_end_date)]
 
-    if s3_client:
-        def s3_list_objects(bucket, prefix):
-            response = s3_client.list_objects(Bucket=bucket, Prefix=prefix)
-            if 'Contents' not in response:
-                return []
-            return [x['Key'] for x in response['Contents']]
-
-        if warc_files_start_date or warc_files_end_date:
-            # The news files are grouped per year and month in separate folders
-            warc_dates = __iterate_by_month(start_date=warc_files_start_date, end_date=warc_files_end_date)
-            for date in warc_dates:
-                year = date.strftime('%Y')
-                month = date.strftime('%m')
-                prefix = 'crawl-data/CC-NEWS/%s/%s/' % (year, month)
-                __logger.debug('Listing objects on S3 bucket %s and prefix %s', __cc_bucket, prefix)
-                objects += s3_list_objects(__cc_bucket, prefix)
-        else:
-            objects = s3_list_objects(__cc_bucket, 'crawl-data/CC-NEWS/')
+    cache = __read_remote_index_cache() if cache_remote_index else {}
+    listed_at = datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+    months_to_list = [month for month in months
+                      if month not in cache or not __is_final_listing(month, cache[month]['listed_at'])]
+    __logger.info('Listing WARC files of %i months (%i months cached)', len(months_to_list),
+                  len(months) - len(months_to_list))
 
-    else:
-        # The news files are grouped per year and month in separate folders
-        warc_dates = __iterate_by_month(start_date=warc_files_start_date, end_date=warc_files_end_date)
-        for date in warc_dates:
-            year = date.strftime('%Y')
-            month = date.strftime('%m')
-            url = '%scrawl-data/CC-NEWS/%s/%s/warc.paths.gz' % (__cc_base_url, year, month)
-            __logger.debug('Fetching WARC paths listing %s', url)
-            response = requests.get(url)
-            if response:
-                objects += gzip.decompress(response.content).decode('ascii').strip().split('\n')
-            else:
-                __logger.info('Failed to fetch WARC file list %s: %s', url, response)
+    with cf.ThreadPoolExecutor(__number_of_remote_index_threads) as executor:
+        for month, warc_paths in zip(months_to_list,
+                                     executor.map(partial(__list_warc_paths_of_month, s3_client), months_to_list)):
+            if warc_paths is not None:
+                cache[month] = {'listed_at': listed_at, 'warc_paths': warc_paths}
+    if cache_remote_index and months_to_list:
+        __write_remote_index_cache(cache)
+
+    objects = [warc_path for month in months if month in cache for warc_path in cache[month]['warc_paths']]
 
     if warc_files_start_date or warc_files_end_date:
         # Now filter further on day of month, hour, minute
-        objects = [
-            p for p in objects if __date_within_period(
-                __extract_date_from_warc_filename(p),
-                start_date=warc_files_start_date,
-                end_date=warc_files_end_date,
-            )
-        ]
+        objects = __filter_warc_paths_by_date(objects, warc_files_start_date, warc_files_end_date)
 
     __logger.info('Found %i WARC files', len(objects))
 
     return objects
 
+
+def __filter_warc_paths_by_date(warc_paths, warc_files_start_date=None, warc_files_end_date=None):
+    """
+    Keeps only the WARC paths whose filename contains a date within [warc_files_start_date, warc_files_end_date)
+    :param warc_paths:
+    :param warc_files_start_date:
+    :param warc_files_end_date:
+    :return:
+    """
+    return [
+        p for p in warc_paths if __date_within_period(
+            __extract_date_from_warc_filename(p),
+            start_date=warc_files_start_date,
+            end_date=warc_files_end_date,
+        )
+    ]
+
+
+def __get_index_source_ranges(index_source, valid_hosts=None, warc_files_start_date=None, warc_files_end_date=None):
+    """
+    Resolves the records of the valid hosts from an index source
+    :param index_source: An IndexSource, see commoncrawl_index
+    :param valid_hosts:
+    :param warc_files_start_date: only keep .warc files with greater or equal date in their filename
+    :param warc_files_end_date: only keep .warc files with smaller date in their filename
+    :return: A dict of WARC paths mapping to lists of (offset, length) tuples
+    """
+    warc_record_ranges_by_path = index_source.lookup_by_warc_path(valid_hosts)
+    if warc_files_start_date or warc_files_end_date:
+        warc_paths = __filter_warc_paths_by_date(warc_record_ranges_by_path.keys(), warc_files_start_date,
+                                                 warc_files_end_date)
+        warc_record_ranges_by_path = {p: warc_record_ranges_by_path[p] for p in warc_paths}
+
+    __logger.info('Found %i records in %i WARC files in the index',
+                  sum(len(ranges) for ranges in warc_record_ranges_by_path.values()), len(warc_record_ranges_by_path))
+
+    return warc_record_ranges_by_path
+
 def __get_url_path(url_or_path):
     if url_or_path.startswith('http:') or url_or_path.startswith('https:'):
         try:
@@ -217,27 +300,21 @@ def __get_url_path(url_or_path):
             pass
     return url_or_path
 
-def __get_list_of_fully_extracted_warc_paths():
+def __get_set_of_fully_extracted_warc_paths():
     """
     Reads in the log file that contains a list of all previously, fully extracted WARC urls
-    :return:
+    :return: set of the paths of the fully extracted WARC files
     """
     if not os.path.isfile(__log_pathname_fully_extracted_warcs):
-        return []
+        return set()
 
     with open(__log_pathname_fully_extracted_warcs) as log_file:
-        list_warcs = log_file.readlines()
-    # remove break lines
-    list_warcs = [x.strip() for x in list_warcs]
-
-    # (back-ward compatibility) if it's a URL keep only the path
-    list_warcs = [__get_url_path(x) for x in list_warcs]
-
-    return list_warcs
+        # remove break lines and (back-ward compatibility) if it's a URL keep only the path
+        return {__get_url_path(line.strip()) for line in log_file}
 
 
 def __callback_on_warc_completed(warc_path, counter_article_passed, counter_article_discarded, counter_article_error,
-                                 counter_article_total):
+                                 counter_article_total, counter_article_rejected_by_stage=None):
     """
     Internal callback on completion of one WARC file. Calculating some statistics on processing speed.
     :param warc_path:
@@ -245,6 +322,7 @@ def __callback_on_warc_completed(warc_path, counter_article_passed, counter_arti
     :param counter_article_discarded:
     :param counter_article_error:
     :param counter_article_total:
+    :param counter_article_rejected_by_stage: dict of the number of discarded articles per filter stage
     :return:
     """
     # have to use the global keyword in order to assign a value to a global variable (see https://stackoverflow.com/a/9936482)
@@ -261,6 +339,7 @@ def __callback_on_warc_completed(warc_path, counter_article_passed, counter_arti
     __counter_article_error += counter_article_error
     __counter_article_passed += counter_article_passed
     __counter_article_total += counter_article_total
+    __counter_article_rejected_by_stage.update(counter_article_rejected_by_stage or {})
     __counter_warc_processed += 1
 
     sec_per_article = elapsed_secs / counter_article_total
@@ -273,10 +352,18 @@ def __callback_on_warc_completed(warc_path, counter_article_passed, counter_arti
     __logger.info("global [s/article] = %f", sec_per_article)
     __logger.info("global [h/warc] = %.3f", h_per_warc)
     __logger.info("estimated remaining time [h] = %f", remaining_warcs * h_per_warc)
+    __logger.info("articles rejected by stage = %s", dict(__counter_article_rejected_by_stage))
 
     # invoke the external callback
-    __extern_callback_on_warc_completed(warc_path, __counter_article_passed, __counter_article_discarded,
-                                        __counter_article_error, __counter_article_total, __counter_warc_processed)
+    if __extern_callback_on_warc_completed is None:
+        return
+    if _accepts_keyword_argument(__extern_callback_on_warc_completed, 'counter_article_rejected_by_stage'):
+        __extern_callback_on_warc_completed(warc_path, __counter_article_passed, __counter_article_discarded,
+                                            __counter_article_error, __counter_article_total, __counter_warc_processed,
+                                            counter_article_rejected_by_stage=dict(__counter_article_rejected_by_stage))
+    else:
+        __extern_callback_on_warc_completed(warc_path, __counter_article_passed, __counter_article_discarded,
+                                            __counter_article_error, __counter_article_total, __counter_warc_processed)
 
 
 def __start_commoncrawl_extractor(warc_path, callback_on_article_extracted=None,
@@ -290,7 +377,15 @@ def __start_commoncrawl_extractor(warc_path, callback_on_article_extracted=None,
                                   continue_process=True,
                                   log_pathname_fully_extracted_warcs=None,
                                   extractor_cls=CommonCrawlExtractor,
-                                  fetch_images=False):
+                                  fetch_images=False,
+                                  stream_warc=False,
+                                  number_of_record_extraction_processes=1,
+                                  ordered_record_delivery=True,
+                                  warc_record_ranges=None,
+                                  local_download_dir_warc_max_size=None,
+                                  checkpoint_interval=None,
+                                  extraction_timeout=None,
+                                  max_html_size=None):
     """
     Starts a single CommonCrawlExtractor
     :param warc_path: path to the WARC file on s3://commoncrawl/ resp. https://data.commoncrawl.org/
@@ -307,6 +402,16 @@ def __start_commoncrawl_extractor(warc_path, callback_on_article_extracted=None,
     :param log_level:
     :param extractor_cls: A subclass of CommonCrawlExtractor, which can be used
         to add custom filtering by overriding .filter_record(...)
+    :param stream_warc: if True, the WARC file is extracted while it is being transferred instead of downloading it first
+    :param number_of_record_extraction_processes: number of processes that extract articles from the WARC file's records
+    :param ordered_record_delivery: if True, articles are passed on in the order of their records
+    :param warc_record_ranges: if not None, only the records at these (offset, length) byte ranges of the WARC file are
+        fetched
+    :param local_download_dir_warc_max_size: maximum size of local_download_dir_warc in bytes
+    :param checkpoint_interval: if set, the position in the WARC file is saved every this many records, articles
+        after the last checkpoint are delivered again when resuming, see CommonCrawlExtractor.extract_from_commoncrawl
+    :param extraction_timeout: time budget for the extraction of an article in seconds
+    :param max_html_size: larger HTML is reduced to this size before the extraction
     :return:
     """
     commoncrawl_extractor = extractor_cls()
@@ -322,7 +427,127 @@ def __start_commoncrawl_extractor(warc_path, callback_on_article_extracted=None,
                                                    log_level=log_level,
                                                    delete_warc_after_extraction=delete_warc_after_extraction,
                                                    log_pathname_fully_extracted_warcs=__log_pathname_fully_extracted_warcs,
-                                                   fetch_images=fetch_images)
+                                                   fetch_images=fetch_images,
+                                                   stream_warc=stream_warc,
+                                                   number_of_record_extraction_processes=number_of_record_extraction_processes,
+                                                   ordered_record_delivery=ordered_record_delivery,
+                                                   warc_record_ranges=warc_record_ranges,
+                                                   local_download_dir_warc_max_size=local_download_dir_warc_max_size,
+                                                   checkpoint_interval=checkpoint_interval,
+                                                   extraction_timeout=extraction_timeout,
+                                                   max_html_size=max_html_size)
+
+    # pass on the remaining articles of this WARC file to the sink
+    flush = getattr(callback_on_article_extracted, 'flush', None)
+    if flush:
+        flush()
+
+
+def __start_commoncrawl_extractor_on_ranges(warc_path_and_ranges, **kwargs):
+    """
+    Starts a single CommonCrawlExtractor, see __start_commoncrawl_extractor. Pool processes get the byte ranges of
+    their WARC file only, instead of the byte ranges of all WARC files.
+    :param warc_path_and_ranges: a tuple of the path to the WARC file and its byte ranges or None
+    :param kwargs: the arguments of __start_commoncrawl_extractor
+    :return:
+    """
+    warc_path, warc_record_ranges = warc_path_and_ranges
+    __start_commoncrawl_extractor(warc_path, warc_record_ranges=warc_record_ranges, **kwargs)
+
+
+def __write_to_sink(sink, article_batch_queue):
+    """
+    Writes the batches of articles from the queue to the sink until it gets None, then closes the sink
+    :param sink: an ArticleSink
+    :param article_batch_queue:
+    :return:
+    """
+    try:
+        while True:
+            articles = article_batch_queue.get()
+            if articles is None:
+                break
+            try:
+                sink.write(articles)
+            except Exception:
+                # continue to empty the queue, so that the extraction processes are not blocked
+                __logger.exception('failed to write %i articles to sink', len(articles))
+    finally:
+        sink.close()
+
+
+def __stop_sink_writer(sink_writer, article_batch_queue, manager=None):
+    """
+    Stops the thread that writes the batches of articles to the sink, which closes the sink, after it has written the
+    batches on the queue, then shuts down the manager of the queue
+    :param sink_writer: the thread running __write_to_sink
+    :param article_batch_queue:
+    :param manager: the Manager of the queue or None
+    :return:
+    """
+    try:
+        article_batch_queue.put(None)
+    except Exception:
+        # the queue is broken, e.g., since the manager process died. Shutting down the manager makes the sink writer
+        # fail to get from the queue, too, which then closes the sink
+        __logger.exception('failed to stop the sink writer')
+        if manager is not None:
+            manager.shutdown()
+            manager = None
+    sink_writer.join()
+    if manager is not None:
+        manager.shutdown()
+
+
+def __start_commoncrawl_extractors(warc_paths, number_of_prefetched_warc_files=1, prefetch_max_size=None,
+                                   extractor_cls=CommonCrawlExtractor, **kwargs):
+    """
+    Starts a CommonCrawlExtractor for each of the given WARC files one after another. Meanwhile, a background thread
+    downloads the next WARC files, so that downloading and extracting overlap.
+    :param warc_paths: paths to the WARC files on s3://commoncrawl/ resp. https://data.commoncrawl.org/
+    :param number_of_prefetched_warc_files: maximum number of WARC files that are downloaded ahead of the one that is
+        currently extracted
+    :param prefetch_max_size: if set, no further WARC file is prefetched while the downloaded but not yet extracted
+        WARC files take more than this many bytes
+    :param extractor_cls:
+    :param kwargs: passed on to __start_commoncrawl_extractor
+    :return:
+    """
+    def download(warc_path):
+        return extractor_cls().download_from_commoncrawl(
+            warc_path, reuse_previously_downloaded_files=kwargs.get('reuse_previously_downloaded_files', True),
+            local_download_dir_warc=kwargs.get('local_download_dir_warc'),
+            local_download_dir_warc_max_size=kwargs.get('local_download_dir_warc_max_size'),
+            show_download_progress=kwargs.get('show_download_progress', False),
+            log_level=kwargs.get('log_level', logging.ERROR))
+
+    def prefetched_size():
+        return sum(os.path.getsize(future.result()) for future in downloads
+                   if future.done() and not future.exception() and os.path.isfile(future.result()))
+
+    # downloads of the current and the prefetched WARC files, in the order of warc_paths
+    downloads = collections.deque()
+    warc_paths_to_download = collections.deque(warc_paths)
+    with cf.ThreadPoolExecutor(max_workers=1) as download_executor:
+        try:
+            for warc_path in warc_paths:
+                while warc_paths_to_download and (
+                        not downloads or (len(downloads) <= number_of_prefetched_warc_files and (
+                        prefetch_max_size is None or prefetched_size() < prefetch_max_size))):
+                    downloads.append(download_executor.submit(download, warc_paths_to_download.popleft()))
+
+                try:
+                    downloads.popleft().result()
+                except Exception:
+                    # the extractor downloads the file again (resp. resumes the download) and handles the error
+                    __logger.exception('prefetching failed: %s', warc_path)
+
+                # the file has just been downloaded, even if previously downloaded files are not to be reused
+                __start_commoncrawl_extractor(warc_path, extractor_cls=extractor_cls,
+                                              **dict(kwargs, reuse_previously_downloaded_files=True))
+        finally:
+            for future in downloads:
+                future.cancel()
 
 
 def crawl_from_commoncrawl(callback_on_article_extracted, callback_on_warc_completed=None, valid_hosts=None,
@@ -332,28 +557,68 @@ def crawl_from_commoncrawl(callback_on_article_extracted, callback_on_warc_compl
                            number_of_extraction_processes=4, log_level=logging.ERROR,
                            delete_warc_after_extraction=True, continue_process=True,
                            extractor_cls=CommonCrawlExtractor, fetch_images=False,
-                           dry_run=False):
+                           dry_run=False, stream_warc=False, number_of_record_extraction_processes=1,
+                           ordered_record_delivery=True, index_source=None, local_download_dir_warc_max_size=None,
+                           number_of_prefetched_warc_files=0, prefetch_max_size=None, checkpoint_interval=None,
+                           cache_remote_index=True, sink=None, sink_batch_size=100, extraction_timeout=None,
+                           max_html_size=None):
     """
     Crawl and extract articles form the news crawl provided by commoncrawl.org. For each article that was extracted
     successfully the callback function callback_on_article_extracted is invoked where the first parameter is the
-    article object.
+    article object. Alternatively, the articles are passed to a sink.
     :param continue_process:
     :param delete_warc_after_extraction:
     :param number_of_extraction_processes:
-    :param callback_on_article_extracted:
-    :param valid_hosts:
+    :param callback_on_article_extracted: invoked within the extraction processes, ignored if sink is set
+    :param valid_hosts: list of host names, an article passes if its host is one of them or a subdomain of them
     :param start_date:
     :param end_date:
     :param warc_files_start_date
     :param warc_files_end_date
     :param strict_date:
-    :param reuse_previously_downloaded_files:
+    :param reuse_previously_downloaded_files: if True, completely downloaded WARC files are reused if the remote file
+        has not changed, and interrupted downloads are resumed
     :param local_download_dir_warc:
+    :param local_download_dir_warc_max_size: if set, the least recently used WARC files are deleted from
+        local_download_dir_warc to keep its size below this limit (in bytes). This is only useful in combination with
+        delete_warc_after_extraction=False, e.g., to rerun jobs over overlapping date ranges.
     :param continue_after_error:
     :param show_download_progress:
     :param log_level:
     :param extractor_cls:
     :param dry_run: if True just list the WARC files to be processed but do not actually process them
+    :param stream_warc: if True, WARC files are not downloaded to local_download_dir_warc but their records are
+        extracted while the files are being transferred
+    :param number_of_record_extraction_processes: if greater than 1, each WARC file is read by a single reader while
+        articles are extracted from its records by a pool of this many processes. This is useful if only a few WARC
+        files are to be processed. Since pool processes cannot have child processes, WARC files are then processed one
+        after another, i.e., number_of_extraction_processes is ignored.
+    :param ordered_record_delivery: if True, callback_on_article_extracted is invoked in the order of the records in
+        the WARC files, else as soon as an article has been extracted
+    :param index_source: if not None, an IndexSource (see commoncrawl_index) that resolves the records of valid_hosts.
+        Then, only WARC files listed in the index are processed and only the matching records are fetched via range
+        requests, which is much faster than scanning entire WARC files if only few records match.
+    :param number_of_prefetched_warc_files: if greater than 0, each process downloads up to this many WARC files ahead
+        in a background thread while it extracts the current WARC file. Then, the WARC files are distributed evenly to
+        the processes upfront. Has no effect if stream_warc is True or index_source is set.
+    :param prefetch_max_size: if set, a process does not prefetch further WARC files while its downloaded but not yet
+        extracted WARC files take more than this many bytes on disk
+    :param checkpoint_interval: if continue_process is True, the position in the WARC file that is currently extracted
+        is saved every this many records, so that the extraction of an interrupted WARC file resumes at the last
+        checkpoint instead of its beginning, e.g., 1000. None (default) disables checkpoints. The articles extracted
+        between the last checkpoint and the interruption are passed on again, i.e., delivery is at least once, so
+        callbacks and sinks that are not idempotent need to deduplicate them, e.g., by url.
+    :param cache_remote_index: if True, the monthly listings of WARC files are cached in local_download_dir_warc.
+        Listings of closed months are never fetched again, listings of the current month are refreshed on each run.
+    :param sink: if set, an ArticleSink (see commoncrawl_sink), e.g., a JsonLinesSink, to which the extraction processes
+        send the extracted articles in batches. All articles are written by a single thread of the main process. Use
+        CallbackSink to invoke a callback for each article in the main process.
+    :param sink_batch_size: number of articles that an extraction process sends to the sink at once
+    :param extraction_timeout: if set, the time budget for the extraction of an article in seconds. An article whose
+        extraction exceeds it only contains the information extracted until then, so that pathological pages, e.g., with
+        huge tables or deeply nested DOMs, do not stall the extraction processes.
+    :param max_html_size: if set, larger HTML is reduced by emptying its <script> and <style> tags and then truncated to
+        this size before the extraction
     :return:
     """
     __setup(local_download_dir_warc, log_level)
@@ -361,68 +626,147 @@ def crawl_from_commoncrawl(callback_on_article_extracted, callback_on_warc_compl
     global __extern_callback_on_warc_completed
     __extern_callback_on_warc_completed = callback_on_warc_completed
 
-    cc_news_crawl_names = __get_remote_index(warc_files_start_date, warc_files_end_date)
+    if index_source is not None:
+        warc_record_ranges_by_path = __get_index_source_ranges(index_source, valid_hosts, warc_files_start_date,
+                                                               warc_files_end_date)
+        cc_news_crawl_names = sorted(warc_record_ranges_by_path.keys())
+    else:
+        warc_record_ranges_by_path = None
+        cc_news_crawl_names = __get_remote_index(warc_files_start_date, warc_files_end_date, cache_remote_index)
     global __number_of_warc_files_on_cc
     __number_of_warc_files_on_cc = len(cc_news_crawl_names)
     __logger.info('found %i files at commoncrawl.org', __number_of_warc_files_on_cc)
 
-    # multiprocessing (iterate the list of crawl_names, and for each: download and process it)
-    __logger.info('creating extraction process pool with %i processes', number_of_extraction_processes)
-    warc_paths = []
-    fully_extracted_warc_paths = __get_list_of_fully_extracted_warc_paths()
-    for warc_path in cc_news_crawl_names:
-        if continue_process:
-            # check if the current WARC has already been fully extracted (assuming that the filter criteria have not
-            # been changed!)
-            if warc_path in fully_extracted_warc_paths:
-                __logger.info('skipping WARC because fully extracted: %s', warc_path)
-                global __counter_warc_skipped
-                __counter_warc_skipped += 1
-                pass
+    if not continue_process:
+        checkpoint_interval = None
+
+    sink_writer = None
+    manager = None
+    try:
+        if sink is not None and not dry_run:
+            # a multiprocessing queue can only be passed to pool processes via a manager
+            use_pool = number_of_extraction_processes > 1 and number_of_record_extraction_processes <= 1
+            manager = Manager() if use_pool else None
+            article_batch_queue = manager.Queue(4 * number_of_extraction_processes) if use_pool else queue.Queue(4)
+            sink_writer = threading.Thread(target=__write_to_sink, args=(sink, article_batch_queue), daemon=True)
+            sink_writer.start()
+            callback_on_article_extracted = ArticleBatcher(article_batch_queue, sink_batch_size)
+
+        # multiprocessing (iterate the list of crawl_names, and for each: download and process it)
+        __logger.info('creating extraction process pool with %i processes', number_of_extraction_processes)
+        warc_paths = []
+        fully_extracted_warc_paths = __get_set_of_fully_extracted_warc_paths()
+        for warc_path in cc_news_crawl_names:
+            if continue_process:
+                # check if the current WARC has already been fully extracted (assuming that the filter criteria have not
+                # been changed!)
+                if warc_path in fully_extracted_warc_paths:
+                    __logger.info('skipping WARC because fully extracted: %s', warc_path)
+                    global __counter_warc_skipped
+                    __counter_warc_skipped += 1
+                    pass
+                else:
+                    warc_paths.append(warc_path)
+
             else:
+                # if not continue process, then always add
                 warc_paths.append(warc_path)
 
+        if dry_run:
+            for warc_path in warc_paths:
+                __logger.info('(Dry run) Selected WARC file for processing: %s', warc_path)
+
+        elif number_of_prefetched_warc_files > 0 and not stream_warc and warc_record_ranges_by_path is None:
+            start_commoncrawl_extractors = partial(__start_commoncrawl_extractors,
+                                                   number_of_prefetched_warc_files=number_of_prefetched_warc_files,
+                                                   prefetch_max_size=prefetch_max_size,
+                                                   callback_on_article_extracted=callback_on_article_extracted,
+                                                   callback_on_warc_completed=__callback_on_warc_completed,
+                                                   valid_hosts=valid_hosts,
+                                                   start_date=start_date, end_date=end_date,
+                                                   strict_date=strict_date,
+                                                   reuse_previously_downloaded_files=reuse_previously_downloaded_files,
+                                                   local_download_dir_warc=local_download_dir_warc,
+                                                   continue_after_error=continue_after_error,
+                                                   show_download_progress=show_download_progress,
+                                                   log_level=log_level,
+                                                   delete_warc_after_extraction=delete_warc_after_extraction,
+                                                   log_pathname_fully_extracted_warcs=__log_pathname_fully_extracted_warcs,
+                                                   extractor_cls=extractor_cls,
+                                                   fetch_images=fetch_images,
+                                                   local_download_dir_warc_max_size=local_download_dir_warc_max_size,
+                                                   checkpoint_interval=checkpoint_interval,
+                                                   extraction_timeout=extraction_timeout,
+                                                   max_html_size=max_html_size)
+            if number_of_extraction_processes > 1 and number_of_record_extraction_processes <= 1:
+                # each process works through its own share of the WARC files, so that it knows which ones to prefetch
+                with Pool(number_of_extraction_processes) as extraction_process_pool:
+                    extraction_process_pool.map(start_commoncrawl_extractors,
+                                                [warc_paths[i::number_of_extraction_processes]
+                                                 for i in range(number_of_extraction_processes)])
+            else:
+                start_commoncrawl_extractors(
+                    warc_paths, number_of_record_extraction_processes=number_of_record_extraction_processes,
+                    ordered_record_delivery=ordered_record_delivery)
+
+        # run the crawler in the current, single process if number of extraction processes is set to 1 or if records are
+        # extracted in parallel
+        elif number_of_extraction_processes > 1 and number_of_record_extraction_processes <= 1:
+            with Pool(number_of_extraction_processes) as extraction_process_pool:
+                extraction_process_pool.map(partial(__start_commoncrawl_extractor_on_ranges,
+                                                    callback_on_article_extracted=callback_on_article_extracted,
+                                                    callback_on_warc_completed=__callback_on_warc_completed,
+                                                    valid_hosts=valid_hosts,
+                                                    start_date=start_date, end_date=end_date,
+                                                    strict_date=strict_date,
+                                                    reuse_previously_downloaded_files=reuse_previously_downloaded_files,
+                                                    local_download_dir_warc=local_download_dir_warc,
+                                                    continue_after_error=continue_after_error,
+                                                    show_download_progress=show_download_progress,
+                                                    log_level=log_level,
+                                                    delete_warc_after_extraction=delete_warc_after_extraction,
+                                                    log_pathname_fully_extracted_warcs=__log_pathname_fully_extracted_warcs,
+                                                    extractor_cls=extractor_cls,
+                                                    fetch_images=fetch_images,
+                                                    stream_warc=stream_warc,
+                                                    local_download_dir_warc_max_size=local_download_dir_warc_max_size,
+                                                    checkpoint_interval=checkpoint_interval,
+                                                    extraction_timeout=extraction_timeout,
+                                                    max_html_size=max_html_size),
+                                            [(warc_path, warc_record_ranges_by_path[warc_path]
+                                              if warc_record_ranges_by_path is not None else None)
+                                             for warc_path in warc_paths])
         else:
-            # if not continue process, then always add
-            warc_paths.append(warc_path)
-
-    if dry_run:
-        for warc_path in warc_paths:
-            __logger.info('(Dry run) Selected WARC file for processing: %s', warc_path)
-
-    # run the crawler in the current, single process if number of extraction processes is set to 1
-    elif number_of_extraction_processes > 1:
-        with Pool(number_of_extraction_processes) as extraction_process_pool:
-            extraction_process_pool.map(partial(__start_commoncrawl_extractor,
-                                                callback_on_article_extracted=callback_on_article_extracted,
-                                                callback_on_warc_completed=__callback_on_warc_completed,
-                                                valid_hosts=valid_hosts,
-                                                start_date=start_date, end_date=end_date,
-                                                strict_date=strict_date,
-                                                reuse_previously_downloaded_files=reuse_previously_downloaded_files,
-                                                local_download_dir_warc=local_download_dir_warc,
-                                                continue_after_error=continue_after_error,
-                                                show_download_progress=show_download_progress,
-                                                log_level=log_level,
-                                                delete_warc_after_extraction=delete_warc_after_extraction,
-                                                log_pathname_fully_extracted_warcs=__log_pathname_fully_extracted_warcs,
-                                                extractor_cls=extractor_cls,
-                                                fetch_images=fetch_images),
-                                        warc_paths)
-    else:
-        for warc_path in warc_paths:
-            __start_commoncrawl_extractor(warc_path,
-                                          callback_on_article_extracted=callback_on_article_extracted,
-                                          callback_on_warc_completed=__callback_on_warc_completed,
-                                          valid_hosts=valid_hosts,
-                                          start_date=start_date, end_date=end_date,
-                                          strict_date=strict_date,
-                                          reuse_previously_downloaded_files=reuse_previously_downloaded_files,
-                                          local_download_dir_warc=local_download_dir_warc,
-                                          continue_after_error=continue_after_error,
-                                          show_download_progress=show_download_progress,
-                                          log_level=log_level,
-                                          delete_warc_after_extraction=delete_warc_after_extraction,
-                                          log_pathname_fully_extracted_warcs=__log_pathname_fully_extracted_warcs,
-                                          extractor_cls=extractor_cls,
-                                          fetch_images=fetch_images)
+            for warc_path in warc_paths:
+                __start_commoncrawl_extractor(warc_path,
+                                              callback_on_article_extracted=callback_on_article_extracted,
+                                              callback_on_warc_completed=__callback_on_warc_completed,
+                                              valid_hosts=valid_hosts,
+                                              start_date=start_date, end_date=end_date,
+                                              strict_date=strict_date,
+                                              reuse_previously_downloaded_files=reuse_previously_downloaded_files,
+                                              local_download_dir_warc=local_download_dir_warc,
+                                              continue_after_error=continue_after_error,
+                                              show_download_progress=show_download_progress,
+                                              log_level=log_level,
+                                              delete_warc_after_extraction=delete_warc_after_extraction,
+                                              log_pathname_fully_extracted_warcs=__log_pathname_fully_extracted_warcs,
+                                              extractor_cls=extractor_cls,
+                                              fetch_images=fetch_images,
+                                              stream_warc=stream_warc,
+                                              number_of_record_extraction_processes=number_of_record_extraction_processes,
+                                              ordered_record_delivery=ordered_record_delivery,
+                                              warc_record_ranges=warc_record_ranges_by_path[warc_path]
+                                              if warc_record_ranges_by_path is not None else None,
+                                              local_download_dir_warc_max_size=local_download_dir_warc_max_size,
+                                              checkpoint_interval=checkpoint_interval,
+                                              extraction_timeout=extraction_timeout,
+                                              max_html_size=max_html_size)
+    finally:
+        # also if the extraction failed, stop the sink writer, which closes the sink, and the manager of its queue
+        if sink_writer is not None:
+            __stop_sink_writer(sink_writer, article_batch_queue, manager)
+        elif sink is not None and not dry_run:
+            if manager is not None:
+                manager.shutdown()
+            sink.close()
@@ -1,57 +1,204 @@
 #!/usr/bin/env python
 """
 Provides functionality to crawl and extract news articles from a single WARC file from commoncrawl.org. Filter criteria, such as publish date
-and host list, can be defined. Currently, the WARC file will be downloaded to the path WORKINGDIR/cc_download_warc, if
-not otherwise specified.
+and host list, can be defined. By default, the WARC file will be downloaded to the path WORKINGDIR/cc_download_warc, if
+not otherwise specified. Alternatively, the WARC file can be streamed and extracted while it is being transferred.
 """
+import collections
+import concurrent.futures as cf
+import hashlib
+import inspect
+import io
+import json
 import logging
+import multiprocessing
 import os
+import re
 import sys
+import threading
 import time
+from contextlib import closing
+from html import unescape
 
 from ago import human
 import boto3
 import botocore
-from dateutil import parser
+import requests
 from hurry.filesize import size
 from scrapy.utils.log import configure_logging
 from six.moves import urllib
 from warcio.archiveiterator import ArchiveIterator
 
 from .. import NewsPlease, EmptyResponseError
-from . import commoncrawl_crawler
+from ..helper_classes.date_parser import parse_date
+from ..pipeline.extractor.extractors.date_extractor import DateExtractor, DATE_META_KEYS, HTTP_EQUIV_DATE_META_KEY, \
+    IMAGE_META_KEYS, re_pub_date
 
 __author__ = "Felix Hamborg"
 __copyright__ = "Copyright 2017"
 __credits__ = ["Sebastian Nagel"]
 
+# to improve performance, regex statements are compiled only once per module
+re_meta_tag = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+re_tag_attribute = re.compile(r'([\w:.\-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+re_json_ld = re.compile(r'<script[^>]*application/ld\+json[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+re_md5 = re.compile(r'^[0-9a-fA-F]{32}$')
+
+# meta tags with a date that the date probe relies on if the DateExtractor would take the publishing date from them,
+# i.e., if they are the first meta tag with a date. Weaker tags, e.g., <meta name="date" ...>, are left to the extraction
+STRONG_DATE_META_KEYS = frozenset([('property', 'article:published_time'), ('itemprop', 'datepublished')])
+DATE_META_KEY_SET = frozenset(DATE_META_KEYS + [HTTP_EQUIV_DATE_META_KEY])
+IMAGE_META_KEY_SET = frozenset(IMAGE_META_KEYS)
+
+def _accepts_keyword_argument(func, name):
+    """
+    Returns true if the given function can be called with the keyword argument name, e.g., to keep callbacks with an
+    older signature working
+    :param func:
+    :param name:
+    :return:
+    """
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in parameters or any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+
+
+class HostSuffixIndex:
+    """
+    A set of host names that also contains all subdomains of its hosts, e.g., an index of ['example.com'] contains
+    'example.com' and 'www.example.com' but not 'badexample.com'. A lookup takes time linear in the number of labels of
+    the looked up host, independent of the number of hosts in the index.
+    """
+
+    def __init__(self, hosts):
+        self.__hosts = frozenset(self.__normalize(host) for host in hosts if host and host.strip())
+
+    @staticmethod
+    def __normalize(host):
+        return host.strip().lower().rstrip('.')
+
+    def __contains__(self, host):
+        host = self.__normalize(host)
+        while True:
+            if host in self.__hosts:
+                return True
+            # continue with the parent domain
+            _, dot, host = host.partition('.')
+            if not dot:
+                return False
+
+    def __len__(self):
+        return len(self.__hosts)
+
+
+class BufferedWarcRecord:
+    """
+    A detached copy of a WARC record whose payload has been read into memory. In contrast to the records yielded by
+    ArchiveIterator, it does not depend on the underlying stream and can thus be passed to other processes.
+    """
+
+    def __init__(self, record):
+        self.rec_type = record.rec_type
+        self.rec_headers = record.rec_headers
+        self.http_headers = record.http_headers
+        self.payload = record.raw_stream.read()
+        self.checkpoint = getattr(record, 'checkpoint', None)
+
+    @property
+    def raw_stream(self):
+        return io.BytesIO(self.payload)
+
+
+class ContiguousPrefixFile:
+    """
+    Wraps a file that the transfer manager of boto3 writes the parts of a download to, in any order, and keeps track of
+    the size of the prefix of the file that has been written without a gap.
+    """
+
+    def __init__(self, file_obj):
+        self.file_obj = file_obj
+        self.prefix_size = 0
+        # end positions of the writes behind the prefix by their start positions
+        self.__pending_writes = {}
+        self.__position = 0
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self.__position = self.file_obj.seek(offset, whence)
+        return self.__position
+
+    def tell(self):
+        return self.__position
+
+    def write(self, data):
+        start = self.__position
+        self.file_obj.write(data)
+        self.__position += len(data)
+        self.__pending_writes[start] = self.__position
+        while self.prefix_size in self.__pending_writes:
+            self.prefix_size = self.__pending_writes.pop(self.prefix_size)
+        return len(data)
+
 
 class CommonCrawlExtractor:
     # remote url where we can download the warc file
     __warc_path = None
     # download dir for warc files
     __local_download_dir_warc = './cc_download_warc/'
-    # hosts (if None or empty list, any host is OK)
-    __filter_valid_hosts = []  # example: ['elrancaguino.cl']
+    # hosts (if empty, any host is OK), as HostSuffixIndex
+    __filter_valid_hosts = HostSuffixIndex([])  # example: HostSuffixIndex(['elrancaguino.cl'])
     # start date (if None, any date is OK as start date), as datetime
     __filter_start_date = None
     # end date (if None, any date is OK as end date)
     __filter_end_date = None
     # if date filtering is string, e.g., if we could not detect the date of an article, we will discard the article
     __filter_strict_date = True
+    # records whose WARC payload is larger than this (in bytes) are discarded without extraction
+    __filter_max_content_length = 20000000
+    # finds the publishing date in the date probe like the article extraction does
+    __date_extractor = DateExtractor()
     # if True, the script checks whether a file has been downloaded already and uses that file instead of downloading
-    # again. Note that there is no check whether the file has been downloaded completely or is valid!
+    # again. Files are only reused if they have been downloaded completely and the remote file has not changed since.
+    # Interrupted downloads are resumed.
     __reuse_previously_downloaded_files = True
+    # if set, the least recently used WARC files are deleted from the download dir to keep its size below this limit
+    # (in bytes). This is only useful if WARC files are not deleted after extraction.
+    __local_download_dir_warc_max_size = None
+    # if True, the WARC file is not saved to disk but its records are extracted while it is being transferred
+    __stream_warc = False
+    # if not None, only the records at these (offset, length) byte ranges of the WARC file are fetched and extracted
+    __warc_record_ranges = None
+    # byte ranges that are at most this far apart are fetched with a single request
+    __max_range_gap = 64 * 1024
     # continue after error
     __continue_after_error = False
     # ignore unicode errors
     __ignore_unicode_errors = False
     # fetch images
     __fetch_images = False
+    # time budget for the extraction of an article in seconds (None = no time budget)
+    __extraction_timeout = None
+    # larger HTML is reduced to this size before the extraction (None = no limit)
+    __max_html_size = None
+    # number of processes that extract articles from the records of the WARC file (1 = in the current process)
+    __number_of_record_extraction_processes = 1
+    # if True, articles extracted by multiple processes are passed on in the order of their records
+    __ordered_record_delivery = True
+    # number of records that may be read ahead per record extraction process
+    __max_pending_records_per_process = 4
     # log level
     __log_level = logging.INFO
     __delete_warc_after_extraction = True
     __log_pathname_fully_extracted_warcs = None
+    # if set, the position in the WARC file is saved every this many records, so that an interrupted extraction can
+    # resume there
+    __checkpoint_interval = None
+    # index of the record at which the last checkpoint was saved
+    __checkpoint_index = 0
 
     # commoncrawl.org
     __cc_base_url = 'https://data.commoncrawl.org/'
@@ -104,25 +251,142 @@ class CommonCrawlExtractor:
             with open(self.__log_pathname_fully_extracted_warcs, 'a') as log_file:
                 log_file.write(warc_path + '\n')
 
+    def __get_checkpoint_filepath(self):
+        return os.path.join(self.__local_download_dir_warc, urllib.parse.quote_plus(self.__warc_path) + '.checkpoint')
+
+    def __read_checkpoint(self):
+        """
+        Reads the position at which a previous, interrupted extraction of the current WARC file stopped
+        :return: A tuple of the byte offset and the index of the first record that has not been processed yet
+        """
+        if not self.__checkpoint_interval:
+            return 0, 0
+        try:
+            with open(self.__get_checkpoint_filepath()) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            return checkpoint['offset'], checkpoint['records']
+        except (OSError, ValueError, KeyError):
+            return 0, 0
+
+    def __save_checkpoint(self, record):
+        """
+        Saves the position of the given record if at least __checkpoint_interval records have been read since the last
+        checkpoint. Must only be invoked once all previous records have been processed.
+        :param record: a record that is about to be processed
+        :return:
+        """
+        checkpoint = getattr(record, 'checkpoint', None)
+        if not self.__checkpoint_interval or checkpoint is None \
+                or self.__number_of_record_extraction_processes > 1 and not self.__ordered_record_delivery:
+            return
+        offset, index = checkpoint
+        if index - self.__checkpoint_index < self.__checkpoint_interval:
+            return
+
+        checkpoint_filepath = self.__get_checkpoint_filepath()
+        with open(checkpoint_filepath + '.tmp', 'w') as checkpoint_file:
+            json.dump({'offset': offset, 'records': index}, checkpoint_file)
+        os.replace(checkpoint_filepath + '.tmp', checkpoint_filepath)
+        self.__checkpoint_index = index
+
+    def __remove_checkpoint(self):
+        try:
+            os.remove(self.__get_checkpoint_filepath())
+        except OSError:
+            pass
+
+    def filter_record_headers(self, warc_record):
+        """
+        First, cheap filter stage, which only inspects the WARC and HTTP headers of a record. Returns true if the
+        response is successful, is an HTML document that is neither empty nor too large, and the record's host is valid.
+        :param warc_record:
+        :return: True or False
+        """
+        if not self.__passes_host_filter(warc_record):
+            return False
+
+        http_headers = warc_record.http_headers
+        if http_headers is not None:
+            if http_headers.get_statuscode() != '200':
+                return False
+
+            content_type = http_headers.get_header('Content-Type')
+            if content_type and 'html' not in content_type.lower():
+                return False
+
+            if http_headers.get_header('Content-Length', '').strip() == '0':
+                return False
+
+        content_length = warc_record.rec_headers.get_header('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > self.__filter_max_content_length:
+            return False
+
+        return True
+
+    def filter_record_date_probe(self, warc_record):
+        """
+        Second filter stage, which is only run if a date filter is set. Looks for the publishing date in the JSON-LD
+        blocks and meta tags of the record's HTML without parsing the document. Returns false only if a date was found
+        and it is outside of the date filter, i.e., records without a date are left to the full extraction.
+        :param warc_record: A BufferedWarcRecord
+        :return: True or False
+        """
+        publishing_date = self.__probe_publishing_date(warc_record.payload.decode('utf-8', errors='replace'))
+        if publishing_date is None:
+            return True
+        return self.__passes_date_filter(publishing_date)
+
+    def __probe_publishing_date(self, html):
+        """
+        Returns the publishing date that the DateExtractor would extract from the HTML if it is given by a strong
+        signal, i.e., by the first JSON-LD block or by a meta tag in STRONG_DATE_META_KEYS. Like the DateExtractor, the
+        first JSON-LD block is checked first and then the meta tags in document order, but the HTML is not parsed.
+        :param html:
+        :return: A datetime or None
+        """
+        json_ld = re_json_ld.search(html)
+        if json_ld:
+            publishing_date = self.__date_extractor.date_from_json_ld(json_ld.group(1))
+            if publishing_date is not None:
+                return publishing_date
+
+        for meta_tag in re_meta_tag.findall(html):
+            attributes = {name.lower(): unescape(value_dq or value_sq or value_uq)
+                          for name, value_dq, value_sq, value_uq in re_tag_attribute.findall(meta_tag)}
+            keys = set((name, value.lower()) for name, value in attributes.items() if name != 'content')
+            if keys & DATE_META_KEY_SET:
+                # the first meta tag with a date decides, the date is only used if the tag is a strong signal
+                if keys & STRONG_DATE_META_KEYS and attributes.get('content'):
+                    return self.__date_extractor.parse_date_str(attributes['content'].strip())
+                return None
+            if keys & IMAGE_META_KEY_SET and re_pub_date.search(attributes.get('content', '')):
+                # the DateExtractor would take the date from the image URL
+                return None
+        return None
+
+    def __passes_date_filter(self, publishing_date):
+        """
+        Returns true if the given publishing date is within the date filter
+        :param publishing_date: A datetime
+        :return:
+        """
+        # is article published too early?
+        if self.__filter_start_date and publishing_date < self.__filter_start_date:
+            return False
+        if self.__filter_end_date and publishing_date > self.__filter_end_date:
+            return False
+        return True
+
     def filter_record(self, warc_record, article=None):
         """
-        Returns true if a record passes all tests: hosts, publishing date
+        Returns true if a record passes all tests: hosts, publishing date. This is the last filter stage, which runs the
+        full article extraction if a date filter is set.
         :param warc_record:
         :return: A tuple of (True or False) and an article (might be None)
         """
         # filter by host
-        if self.__filter_valid_hosts:
-            url = warc_record.rec_headers.get_header('WARC-Target-URI')
-
-            # very simple check, check if one of the required host names is contained in the url of the WARC transaction
-            # better would be to extract the host name from the WARC transaction Target URI and then check for equality
-            # because currently something like g.co?forward_url=facebook.com would yield a positive filter test for
-            # facebook.com even though the actual host is g.co
-            for valid_host in self.__filter_valid_hosts:
-                if valid_host in url:
-                    break
-            else:
-                return False, article
+        if not self.__passes_host_filter(warc_record):
+            return False, article
 
         # filter by date
         if self.__filter_start_date or self.__filter_end_date:
@@ -133,15 +397,30 @@ class CommonCrawlExtractor:
             if not publishing_date:
                 if self.__filter_strict_date:
                     return False, article
-            else:  # here we for sure have a date
-                # is article published too early?
-                if self.__filter_start_date and publishing_date < self.__filter_start_date:
-                    return False, article
-                if self.__filter_end_date and publishing_date > self.__filter_end_date:
-                    return False, article
+            elif not self.__passes_date_filter(publishing_date):  # here we for sure have a date
+                return False, article
 
         return True, article
 
+    def __passes_host_filter(self, warc_record):
+        """
+        Returns true if the record's target URI belongs to one of the valid hosts, or if no hosts are configured
+        :param warc_record:
+        :return:
+        """
+        if not self.__filter_valid_hosts:
+            return True
+
+        url = warc_record.rec_headers.get_header('WARC-Target-URI')
+        try:
+            host = urllib.parse.urlsplit(url).hostname
+        except ValueError:
+            return False
+
+        # the host needs to be one of the valid hosts or a subdomain of them, checking the parsed host name ensures
+        # that something like g.co?forward_url=facebook.com does not pass the filter for facebook.com
+        return bool(host) and host in self.__filter_valid_hosts
+
     def __get_publishing_date(self, warc_record, article):
         """
         Extracts the publishing date from the record
@@ -149,7 +428,7 @@ class CommonCrawlExtractor:
         :return:
         """
         if hasattr(article, 'date_publish'):
-            return parser.parse(article.date_publish) if isinstance(article.date_publish, str) else article.date_publish
+            return parse_date(article.date_publish) if isinstance(article.date_publish, str) else article.date_publish
         else:
             return None
 
@@ -158,6 +437,9 @@ class CommonCrawlExtractor:
         Gets the index of news crawl files from commoncrawl.org and returns an array of names
         :return:
         """
+        # imported here, since the crawler imports this module, which the processes of the record extraction import
+        # first when they unpickle a record
+        from . import commoncrawl_crawler
         return commoncrawl_crawler.__get_remote_index()
 
     def __on_download_progress_update(self, blocknum, blocksize, totalsize):
@@ -180,113 +462,586 @@ class CommonCrawlExtractor:
         else:  # total size is unknown
             sys.stdout.write("\rread %s" % (size(readsofar)))
 
+    def __get_remote_file_info(self, path):
+        """
+        Gets the size and the ETag of a remote file
+        :param path: path to the WARC file on s3://commoncrawl/ resp. https://data.commoncrawl.org/
+        :return: A tuple of the size and the ETag, each might be None if unknown
+        """
+        if self.__s3_client:
+            response = self.__s3_client.head_object(Bucket=self.__cc_bucket, Key=path)
+            remote_size, remote_etag = response.get('ContentLength'), response.get('ETag')
+        else:
+            response = requests.head(self.__cc_base_url + path, allow_redirects=True)
+            response.raise_for_status()
+            remote_size, remote_etag = response.headers.get('Content-Length'), response.headers.get('ETag')
+            remote_size = int(remote_size) if remote_size else None
+
+        if remote_etag:
+            remote_etag = remote_etag.replace('W/', '', 1).strip('"')
+        return remote_size, remote_etag
+
+    @staticmethod
+    def __read_download_info(info_filepath):
+        """
+        Reads the size and the ETag of the remote file that a local file was (or is being) downloaded from
+        :param info_filepath:
+        :return: A dict with the keys size and etag or None if there is no such information
+        """
+        try:
+            with open(info_filepath) as info_file:
+                return json.load(info_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def __md5_of_file(filepath):
+        md5 = hashlib.md5()
+        with open(filepath, 'rb') as file_obj:
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    @staticmethod
+    def __mark_in_use(filepath):
+        """
+        Marks a WARC file in the download dir as in use by the current process, i.e., as being downloaded, prefetched or
+        extracted, so that __free_download_dir does not delete it
+        :param filepath: path of the local WARC file
+        :return:
+        """
+        with open(filepath + '.inuse', 'w') as marker_file:
+            marker_file.write(str(os.getpid()))
+
+    @staticmethod
+    def __unmark_in_use(filepath):
+        try:
+            os.remove(filepath + '.inuse')
+        except OSError:
+            pass
+
+    @staticmethod
+    def __is_in_use(filepath):
+        """
+        Returns true if a WARC file in the download dir is marked as in use by a running process
+        :param filepath: path of the local WARC file
+        :return:
+        """
+        try:
+            with open(filepath + '.inuse') as marker_file:
+                pid = int(marker_file.read())
+        except (OSError, ValueError):
+            return False
+        if os.name == 'nt':
+            # os.kill would terminate the process, keep the file even if the marker might be stale
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            # the process ended without unmarking the file, e.g., since it was killed
+            return False
+        except OSError:
+            pass
+        return True
+
+    def __free_download_dir(self, required_size):
+        """
+        Deletes the least recently used, completely downloaded WARC files until the WARC files in the download dir plus
+        required_size fit into __local_download_dir_warc_max_size. WARC files that are in use, e.g., prefetched but not
+        yet extracted, are not deleted.
+        :param required_size: size of the file that will be downloaded next
+        :return:
+        """
+        if not self.__local_download_dir_warc_max_size:
+            return
+
+        downloads = []
+        for filename in os.listdir(self.__local_download_dir_warc):
+            if not filename.endswith('.info'):
+                continue
+            filepath = os.path.join(self.__local_download_dir_warc, filename[:-len('.info')])
+            for candidate in (filepath, filepath + '.part', filepath + '.download'):
+                try:
+                    stat = os.stat(candidate)
+                except OSError:
+                    continue
+                downloads.append((stat.st_mtime, stat.st_size, candidate, filepath))
+
+        total_size = sum(download[1] for download in downloads) + (required_size or 0)
+        for _, file_size, candidate, filepath in sorted(downloads):
+            if total_size <= self.__local_download_dir_warc_max_size:
+                break
+            if candidate != filepath:
+                # do not delete partial downloads, another process might be writing them
+                continue
+            if self.__is_in_use(filepath):
+                continue
+            self.__logger.info('deleting least recently used WARC file %s to free disk space', filepath)
+            for obsolete_filepath in (filepath, filepath + '.info', filepath + '.inuse'):
+                try:
+                    os.remove(obsolete_filepath)
+                except OSError:
+                    pass
+            total_size -= file_size
+
+    def __download_with_transfer_manager(self, path, partial_filepath, remote_size=None):
+        """
+        Downloads a remote file from S3 with the transfer manager of boto3, which downloads parts of the file in parallel
+        and writes them in any order. The parts are written to a separate file, which replaces the partial file once
+        the download has completed. If the download is interrupted, the file is truncated to the parts that have been
+        written without a gap before it replaces the partial file, so that the download can be resumed.
+        :param path: path to the WARC file on s3://commoncrawl/
+        :param partial_filepath:
+        :param remote_size: size of the remote file, to show the download progress
+        :return:
+        """
+        download_filepath = partial_filepath[:-len('.part')] + '.download'
+        progress_lock = threading.Lock()
+        downloaded_size = [0]
+
+        def on_progress(number_of_bytes):
+            with progress_lock:
+                downloaded_size[0] += number_of_bytes
+                self.__on_download_progress_update(1, downloaded_size[0], remote_size or 0)
+
+        try:
+            with open(download_filepath, 'wb') as file_obj:
+                contiguous_prefix_file = ContiguousPrefixFile(file_obj)
+                try:
+                    self.__s3_client.download_fileobj(self.__cc_bucket, path, contiguous_prefix_file,
+                                                      Callback=on_progress)
+                except BaseException:
+                    file_obj.truncate(contiguous_prefix_file.prefix_size)
+                    raise
+        finally:
+            os.replace(download_filepath, partial_filepath)
+
+    def __download_to_file(self, path, partial_filepath, offset, remote_size=None):
+        """
+        Downloads a remote file starting at the given offset and appends it to the partial file. New downloads from S3
+        use the transfer manager of boto3, resumed downloads fetch the rest of the file with a single range request.
+        :param path: path to the WARC file on s3://commoncrawl/ resp. https://data.commoncrawl.org/
+        :param partial_filepath:
+        :param offset: number of bytes that have already been downloaded to partial_filepath
+        :param remote_size: size of the remote file, to show the download progress
+        :return:
+        """
+        chunk_size = 1024 * 1024
+        if self.__s3_client and not offset:
+            self.__download_with_transfer_manager(path, partial_filepath, remote_size)
+            return
+        if self.__s3_client:
+            response = self.__s3_client.get_object(Bucket=self.__cc_bucket, Key=path, Range='bytes=%i-' % offset)
+            total_size = offset + response['ContentLength']
+            chunks = response['Body'].iter_chunks(chunk_size)
+        else:
+            url = self.__cc_base_url + path
+            headers = {'Range': 'bytes=%i-' % offset} if offset else {}
+            response = requests.get(url, headers=headers, stream=True)
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                self.__logger.info('server does not support resuming downloads, downloading %s again', url)
+                offset = 0
+            total_size = offset + int(response.headers.get('Content-Length', 0))
+            chunks = response.iter_content(chunk_size)
+
+        with open(partial_filepath, 'ab' if offset else 'wb') as file_obj:
+            for blocknum, chunk in enumerate(chunks, 1):
+                file_obj.write(chunk)
+                self.__on_download_progress_update(blocknum, chunk_size, total_size)
+
     def __download(self, path):
         """
-        Download and save a file locally.
+        Download and save a file locally. The file is downloaded to a partial file first, which is validated against
+        the remote file's size and, if the ETag is an MD5 hash, its MD5 checksum and only then renamed, so that a
+        completely downloaded file is never truncated. If a previous download was interrupted, it is resumed. The file
+        is marked as in use until it has been extracted, so that __free_download_dir does not delete it.
         :param url: Where to download from
         :return: File path name of the downloaded file
         """
         local_filename = urllib.parse.quote_plus(path)
         local_filepath = os.path.join(self.__local_download_dir_warc, local_filename)
+        partial_filepath = local_filepath + '.part'
+        # size and ETag of the remote file that local_filepath resp. partial_filepath is downloaded from
+        info_filepath = local_filepath + '.info'
 
-        if os.path.isfile(local_filepath) and self.__reuse_previously_downloaded_files:
-            self.__logger.info("found local file %s, not downloading again due to configuration", local_filepath)
-            return local_filepath
-        else:
-            # cleanup
-            try:
-                os.remove(local_filepath)
-            except OSError:
-                pass
-
-            # download
-            if self.__s3_client:
-                with open(local_filepath, 'wb') as file_obj:
-                    self.__s3_client.download_fileobj(self.__cc_bucket, path, file_obj)
-                return local_filepath
-            else:
-                url = self.__cc_base_url + path
-                self.__logger.info('downloading %s (local: %s)', url, local_filepath)
-                urllib.request.urlretrieve(url, local_filepath, reporthook=self.__on_download_progress_update)
-                self.__logger.info('download completed, local file: %s', local_filepath)
+        # the file is unmarked once it has been extracted, see __process_warc_gz_file
+        self.__mark_in_use(local_filepath)
+        try:
+            return self.__download_to_local_file(path, local_filepath, partial_filepath, info_filepath)
+        except BaseException:
+            self.__unmark_in_use(local_filepath)
+            raise
+
+    def __download_to_local_file(self, path, local_filepath, partial_filepath, info_filepath):
+        """
+        Downloads a file to local_filepath unless it has been downloaded already, see __download
+        :param path: path to the WARC file on s3://commoncrawl/ resp. https://data.commoncrawl.org/
+        :param local_filepath:
+        :param partial_filepath:
+        :param info_filepath:
+        :return: local_filepath
+        """
+        # a download by the transfer manager that did not complete, since the process was killed, might have gaps
+        try:
+            os.remove(local_filepath + '.download')
+        except OSError:
+            pass
+
+        remote_size, remote_etag = self.__get_remote_file_info(path)
+        remote_info = {'size': remote_size, 'etag': remote_etag}
+        local_info = self.__read_download_info(info_filepath)
+        if local_info is None and os.path.isfile(local_filepath) and os.path.getsize(local_filepath) == remote_size:
+            # downloaded by an earlier version, which did not record the remote file's ETag
+            local_info = remote_info
+            with open(info_filepath, 'w') as info_file:
+                json.dump(remote_info, info_file)
+
+        if self.__reuse_previously_downloaded_files and local_info == remote_info:
+            if os.path.isfile(local_filepath) and (remote_size is None or os.path.getsize(local_filepath) == remote_size):
+                self.__logger.info("found local file %s, not downloading again due to configuration", local_filepath)
+                # mark the file as recently used
+                os.utime(local_filepath)
                 return local_filepath
+        else:
+            # cleanup, the remote file has changed or we should not reuse local files
+            for obsolete_filepath in (local_filepath, partial_filepath, info_filepath):
+                try:
+                    os.remove(obsolete_filepath)
+                except OSError:
+                    pass
+            with open(info_filepath, 'w') as info_file:
+                json.dump(remote_info, info_file)
+
+        offset = os.path.getsize(partial_filepath) if os.path.isfile(partial_filepath) else 0
+        if remote_size is not None and offset > remote_size:
+            offset = 0
+        self.__free_download_dir((remote_size or 0) - offset)
+
+        # download
+        self.__logger.info('downloading %s (local: %s, resuming at byte %i)', path, local_filepath, offset)
+        self.__download_to_file(path, partial_filepath, offset, remote_size)
+
+        # validate
+        local_size = os.path.getsize(partial_filepath)
+        if remote_size is not None and local_size != remote_size:
+            raise IOError('downloaded %i of %i bytes of %s' % (local_size, remote_size, path))
+        if remote_etag and re_md5.match(remote_etag) and self.__md5_of_file(partial_filepath) != remote_etag.lower():
+            os.remove(partial_filepath)
+            raise IOError('MD5 checksum of %s does not match the ETag %s' % (path, remote_etag))
+
+        os.replace(partial_filepath, local_filepath)
+        self.__logger.info('download completed, local file: %s', local_filepath)
+        return local_filepath
+
+    def __open_remote_stream(self, path, offset=0):
+        """
+        Opens a stream on a remote WARC file, so that its records can be extracted while the file is still being
+        transferred.
+        :param path: path to the WARC file on s3://commoncrawl/ resp. https://data.commoncrawl.org/
+        :param offset: byte offset at which the stream starts, must be the start of a record
+        :return: A file-like object providing the (compressed) bytes of the WARC file
+        """
+        if self.__s3_client:
+            self.__logger.info('streaming s3://%s/%s from byte %i', self.__cc_bucket, path, offset)
+            kwargs = {'Range': 'bytes=%i-' % offset} if offset else {}
+            return self.__s3_client.get_object(Bucket=self.__cc_bucket, Key=path, **kwargs)['Body']
+        else:
+            url = self.__cc_base_url + path
+            self.__logger.info('streaming %s from byte %i', url, offset)
+            headers = {'Range': 'bytes=%i-' % offset} if offset else {}
+            response = requests.get(url, headers=headers, stream=True)
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                raise IOError('server does not support range requests: %s' % url)
+            # the WARC file itself is gzipped, which is handled by ArchiveIterator
+            response.raw.decode_content = False
+            return response.raw
+
+    def __fetch_range(self, path, start, end):
+        """
+        Fetches the bytes [start, end) of a remote WARC file
+        :param path: path to the WARC file on s3://commoncrawl/ resp. https://data.commoncrawl.org/
+        :param start:
+        :param end:
+        :return: bytes
+        """
+        byte_range = 'bytes=%i-%i' % (start, end - 1)
+        if self.__s3_client:
+            return self.__s3_client.get_object(Bucket=self.__cc_bucket, Key=path, Range=byte_range)['Body'].read()
+        else:
+            response = self.__http_session.get(self.__cc_base_url + path, headers={'Range': byte_range})
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise IOError('server does not support range requests: %s' % response.url)
+            return response.content
+
+    def __iter_records_in_ranges(self, path, ranges):
+        """
+        Fetches the records at the given byte ranges of a remote WARC file. Ranges that are close to each other are
+        fetched with a single request.
+        :param path: path to the WARC file on s3://commoncrawl/ resp. https://data.commoncrawl.org/
+        :param ranges: list of (offset, length) tuples, each covering a single gzipped WARC record
+        :return: A generator of WARC records
+        """
+        ranges = sorted(ranges)
+        i = 0
+        while i < len(ranges):
+            # merge subsequent ranges as long as the gap between them is small
+            start = ranges[i][0]
+            end = start + ranges[i][1]
+            j = i + 1
+            while j < len(ranges) and ranges[j][0] - end <= self.__max_range_gap:
+                end = max(end, ranges[j][0] + ranges[j][1])
+                j += 1
+
+            self.__logger.info('fetching %i record(s) from %s (bytes %i-%i)', j - i, path, start, end - 1)
+            data = self.__fetch_range(path, start, end)
+            for offset, length in ranges[i:j]:
+                for record in ArchiveIterator(io.BytesIO(data[offset - start:offset - start + length])):
+                    yield record
+            i = j
 
     def _from_warc(self, record):
-        return NewsPlease.from_warc(record, decode_errors="replace" if self.__ignore_unicode_errors else "strict", fetch_images=self.__fetch_images)
+        return NewsPlease.from_warc(record, decode_errors="replace" if self.__ignore_unicode_errors else "strict",
+                                    fetch_images=self.__fetch_images, extraction_timeout=self.__extraction_timeout,
+                                    max_html_size=self.__max_html_size)
+
+    def __process_warc_gz_file(self, path_name, offset=0, index=0):
+        """
+        Extracts articles from a local WARC file and deletes the file afterwards, if configured.
+        :param path_name:
+        :param offset: byte offset of the first record to extract
+        :param index: index of the first record to extract
+        :return: A tuple of the counters (passed, discarded, error, total)
+        """
+        try:
+            with open(path_name, 'rb') as stream:
+                stream.seek(offset)
+                counters = self.__process_warc_stream(stream, offset, index)
+        finally:
+            self.__unmark_in_use(path_name)
+
+        # cleanup
+        if self.__delete_warc_after_extraction:
+            for obsolete_path_name in (path_name, path_name + '.info'):
+                try:
+                    os.remove(obsolete_path_name)
+                except OSError:
+                    pass
 
-    def __process_warc_gz_file(self, path_name):
+        return counters
+
+    def __process_warc_stream(self, stream, offset=0, index=0):
         """
         Iterates all transactions in one WARC file and for each transaction tries to extract an article object.
         Afterwards, each article is checked against the filter criteria and if all are passed, the function
         on_valid_article_extracted is invoked with the article object.
-        :param path_name:
+        :param stream: A file-like object providing the bytes of the WARC file, e.g., a local file or an HTTP response
+        :param offset: byte offset in the WARC file at which the stream starts
+        :param index: index of the first record in the stream
+        :return: A tuple of the counters (passed, discarded, error, total)
+        """
+        return self.__process_warc_records(self.__iter_records_with_checkpoints(stream, offset, index))
+
+    @staticmethod
+    def __iter_records_with_checkpoints(stream, offset=0, index=0):
+        """
+        Iterates the records in the stream and sets their attribute checkpoint to a tuple of their byte offset in the
+        WARC file and their index, i.e., the position at which the extraction can resume to process the record again
+        :param stream:
+        :param offset: byte offset in the WARC file at which the stream starts
+        :param index: index of the first record in the stream
+        :return: A generator of WARC records
+        """
+        archive_iterator = ArchiveIterator(stream)
+        for record in archive_iterator:
+            # while a record is read, the iterator's offset is the offset of the record's start
+            record.checkpoint = (offset + archive_iterator.offset, index)
+            index += 1
+            yield record
+
+    def __process_warc_records(self, records):
+        """
+        Processes the given WARC records, see __process_warc_stream
+        :param records: An iterable of WARC records
+        :return: A tuple of the counters (passed, discarded, error, total)
+        """
+        self.__counter_article_total = 0
+        self.__counter_article_passed = 0
+        self.__counter_article_discarded = 0
+        self.__counter_article_error = 0
+        self.__counter_article_rejected_by_stage = collections.Counter()
+        self.__start_time = time.time()
+
+        responses = (record for record in records if record.rec_type == 'response')
+        candidates = self.__prefilter_records(responses)
+        if self.__number_of_record_extraction_processes > 1:
+            # the processes are spawned, since forking while other threads run, e.g., the prefetching of the next WARC
+            # files or the writer of a sink, can copy locks that those threads hold, e.g., of logging, and deadlock
+            with cf.ProcessPoolExecutor(self.__number_of_record_extraction_processes,
+                                        mp_context=multiprocessing.get_context('spawn')) as executor:
+                self.__process_records(self.__extract_records_in_parallel(candidates, executor))
+        else:
+            self.__process_records((record, None) for record in candidates)
+
+        return self.__counter_article_passed, self.__counter_article_discarded, self.__counter_article_error, \
+            self.__counter_article_total
+
+    def __prefilter_records(self, records):
+        """
+        Runs the cheap filter stages on the given records, i.e., filter_record_headers and, if a date filter is set,
+        filter_record_date_probe. Rejected records are counted as discarded.
+        :param records: An iterable of WARC records
+        :return: A generator of the records that passed both stages. If the date probe was run, the records are
+            BufferedWarcRecords.
+        """
+        for record in records:
+            self.__counter_article_total += 1
+            self.__log_statistics()
+
+            try:
+                if not self.filter_record_headers(record):
+                    self.__discard_record(record, 'headers')
+                    continue
+
+                if self.__filter_start_date or self.__filter_end_date:
+                    record = BufferedWarcRecord(record)
+                    if not self.filter_record_date_probe(record):
+                        self.__discard_record(record, 'date_probe')
+                        continue
+            except:
+                self.__handle_unexpected_error()
+                continue
+
+            yield record
+
+    def __extract_records_in_parallel(self, records, executor):
+        """
+        Reads the given records in the current process and extracts articles from them in the process pool executor.
+        At most __max_pending_records_per_process records per process are kept in memory at any time.
+        :param records: An iterable of WARC records
+        :param executor: A concurrent.futures.Executor
+        :return: A generator of tuples of a record and a future of its article, in the order of the records if
+            __ordered_record_delivery is True, else as completed
+        """
+        max_pending = self.__max_pending_records_per_process * self.__number_of_record_extraction_processes
+        decode_errors = "replace" if self.__ignore_unicode_errors else "strict"
+        pending = collections.OrderedDict()
+
+        def complete_pending():
+            if self.__ordered_record_delivery:
+                done = [next(iter(pending))]
+                cf.wait(done)
+            else:
+                done, _ = cf.wait(pending, return_when=cf.FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+
+        for record in records:
+            if not isinstance(record, BufferedWarcRecord):
+                record = BufferedWarcRecord(record)
+            future = executor.submit(NewsPlease.from_warc, record, decode_errors=decode_errors,
+                                     fetch_images=self.__fetch_images, extraction_timeout=self.__extraction_timeout,
+                                     max_html_size=self.__max_html_size)
+            pending[future] = record
+            while len(pending) >= max_pending:
+                yield from complete_pending()
+
+        while pending:
+            yield from complete_pending()
+
+    def __process_records(self, records):
+        """
+        Processes the given records one after another.
+        :param records: An iterable of tuples of a record and a future of its article (or None)
         :return:
         """
-        counter_article_total = 0
-        counter_article_passed = 0
-        counter_article_discarded = 0
-        counter_article_error = 0
-        start_time = time.time()
+        for record, article_future in records:
+            self.__save_checkpoint(record)
+            try:
+                self.__process_record(record, article_future)
+            except:
+                self.__handle_unexpected_error()
 
-        with open(path_name, 'rb') as stream:
-            for record in ArchiveIterator(stream):
-                try:
-                    if record.rec_type == 'response':
-                        counter_article_total += 1
-
-                        # if the article passes filter tests, we notify the user
-                        try:
-                            filter_pass, article = self.filter_record(record)
-                        except (UnicodeDecodeError, EmptyResponseError):
-                            filter_pass = False
-                        if filter_pass:
-                            try:
-                                if not article:
-                                    article = self._from_warc(record)
-                            except (UnicodeDecodeError, EmptyResponseError):
-                                filter_pass = False
-                        if filter_pass:
-                            counter_article_passed += 1
-
-                            self.__logger.info('article pass (%s; %s; %s)', article.source_domain, article.date_publish,
-                                               article.title)
-                            self.__callback_on_article_extracted(article)
-                        else:
-                            counter_article_discarded += 1
-
-                            if article:
-                                self.__logger.info('article discard (%s; %s; %s)', article.source_domain,
-                                                   article.date_publish,
-                                                   article.title)
-                            else:
-                                self.__logger.info('article discard (%s)',
-                                                   record.rec_headers.get_header('WARC-Target-URI'))
-
-                        if counter_article_total % 10 == 0:
-                            elapsed_secs = time.time() - start_time
-                            secs_per_article = elapsed_secs / counter_article_total
-                            self.__logger.info('statistics')
-                            self.__logger.info('pass = %i, discard = %i, error = %i, total = %i',
-                                               counter_article_passed,
-                                               counter_article_discarded, counter_article_error, counter_article_total)
-                            self.__logger.info('extraction from current WARC file started %s; %f s/article',
-                                               human(start_time), secs_per_article)
-                except:
-                    if self.__continue_after_error:
-                        self.__logger.error('Unexpected error: %s (%s)', *sys.exc_info()[0:2])
-                        self.__logger.error(sys.exc_info()[2], exc_info=True)
-                        counter_article_error += 1
-                        pass
-                    else:
-                        raise
+    def __process_record(self, record, article_future=None):
+        """
+        Checks a record against the filter criteria and, if all are passed, invokes on_valid_article_extracted with
+        the article extracted from the record.
+        :param record:
+        :param article_future: A future of the article if it is extracted from the record elsewhere, else None
+        :return:
+        """
+        # if the article passes filter tests, we notify the user
+        article = None
+        try:
+            if article_future is not None:
+                article = article_future.result()
+            filter_pass, article = self.filter_record(record, article)
+        except (UnicodeDecodeError, EmptyResponseError):
+            filter_pass = False
+        if filter_pass:
+            try:
+                if not article:
+                    article = self._from_warc(record)
+            except (UnicodeDecodeError, EmptyResponseError):
+                filter_pass = False
+        if filter_pass:
+            self.__counter_article_passed += 1
 
-        # cleanup
-        if self.__delete_warc_after_extraction:
-            os.remove(path_name)
+            self.__logger.info('article pass (%s; %s; %s)', article.source_domain, article.date_publish,
+                               article.title)
+            self.__callback_on_article_extracted(article)
+        else:
+            self.__discard_record(record, 'extraction', article)
 
-        self.__register_fully_extracted_warc_file(self.__warc_path)
-        self.__callback_on_warc_completed(self.__warc_path, counter_article_passed, counter_article_discarded,
-                                          counter_article_error, counter_article_total)
+    def __discard_record(self, record, stage, article=None):
+        """
+        Counts a record that was rejected by the given filter stage
+        :param record:
+        :param stage: 'headers', 'date_probe', or 'extraction'
+        :param article: the article extracted from the record, if any
+        :return:
+        """
+        self.__counter_article_discarded += 1
+        self.__counter_article_rejected_by_stage[stage] += 1
+
+        if article:
+            self.__logger.info('article discard (%s; %s; %s)', article.source_domain,
+                               article.date_publish,
+                               article.title)
+        else:
+            self.__logger.info('article discard (%s; %s)', stage,
+                               record.rec_headers.get_header('WARC-Target-URI'))
+
+    def __handle_unexpected_error(self):
+        """
+        Logs and counts the exception that is currently handled if __continue_after_error is set, else re-raises it
+        :return:
+        """
+        if self.__continue_after_error:
+            self.__logger.error('Unexpected error: %s (%s)', *sys.exc_info()[0:2])
+            self.__logger.error(sys.exc_info()[2], exc_info=True)
+            self.__counter_article_error += 1
+        else:
+            raise
+
+    def __log_statistics(self):
+        """
+        Logs the counters of the current WARC file every 10 records
+        :return:
+        """
+        if self.__counter_article_total % 10 == 0:
+            elapsed_secs = time.time() - self.__start_time
+            secs_per_article = elapsed_secs / self.__counter_article_total
+            self.__logger.info('statistics')
+            self.__logger.info('pass = %i, discard = %i, error = %i, total = %i',
+                               self.__counter_article_passed,
+                               self.__counter_article_discarded, self.__counter_article_error,
+                               self.__counter_article_total)
+            self.__logger.info('rejected by stage: %s', dict(self.__counter_article_rejected_by_stage))
+            self.__logger.info('extraction from current WARC file started %s; %f s/article',
+                               human(self.__start_time), secs_per_article)
 
     def __run(self):
         """
@@ -297,8 +1052,31 @@ class CommonCrawlExtractor:
         """
         self.__setup()
 
-        local_path_name = self.__download(self.__warc_path)
-        self.__process_warc_gz_file(local_path_name)
+        if self.__warc_record_ranges is not None:
+            with requests.Session() as self.__http_session:
+                counters = self.__process_warc_records(
+                    self.__iter_records_in_ranges(self.__warc_path, self.__warc_record_ranges))
+        else:
+            offset, index = self.__read_checkpoint()
+            if index:
+                self.__logger.info('resuming extraction of %s at record %i (byte %i)', self.__warc_path, index, offset)
+            self.__checkpoint_index = index
+
+            if self.__stream_warc:
+                with closing(self.__open_remote_stream(self.__warc_path, offset)) as stream:
+                    counters = self.__process_warc_stream(stream, offset, index)
+            else:
+                local_path_name = self.__download(self.__warc_path)
+                counters = self.__process_warc_gz_file(local_path_name, offset, index)
+
+        self.__register_fully_extracted_warc_file(self.__warc_path)
+        self.__remove_checkpoint()
+        if self.__callback_on_warc_completed:
+            if _accepts_keyword_argument(self.__callback_on_warc_completed, 'counter_article_rejected_by_stage'):
+                self.__callback_on_warc_completed(self.__warc_path, *counters, counter_article_rejected_by_stage=dict(
+                    self.__counter_article_rejected_by_stage))
+            else:
+                self.__callback_on_warc_completed(self.__warc_path, *counters)
 
     def extract_from_commoncrawl(self, warc_path, callback_on_article_extracted,
                                  callback_on_warc_completed=None,
@@ -307,7 +1085,10 @@ class CommonCrawlExtractor:
                                  strict_date=True, reuse_previously_downloaded_files=True, local_download_dir_warc=None,
                                  continue_after_error=True, ignore_unicode_errors=False,
                                  show_download_progress=False, log_level=logging.ERROR, delete_warc_after_extraction=True,
-                                 log_pathname_fully_extracted_warcs=None, fetch_images=False):
+                                 log_pathname_fully_extracted_warcs=None, fetch_images=False, stream_warc=False,
+                                 number_of_record_extraction_processes=1, ordered_record_delivery=True,
+                                 warc_record_ranges=None, local_download_dir_warc_max_size=None,
+                                 checkpoint_interval=None, extraction_timeout=None, max_html_size=None):
         """
         Crawl and extract articles form the news crawl provided by commoncrawl.org. For each article that was extracted
         successfully the callback function callback_on_article_extracted is invoked where the first parameter is the
@@ -316,36 +1097,110 @@ class CommonCrawlExtractor:
         :param delete_warc_after_extraction:
         :param warc_path:
         :param callback_on_article_extracted:
-        :param callback_on_warc_completed:
-        :param valid_hosts:
+        :param callback_on_warc_completed: invoked with the WARC path and the counters of passed, discarded, erroneous,
+            and total articles. If it accepts the keyword argument counter_article_rejected_by_stage, it also gets the
+            number of discarded articles per filter stage ('headers', 'date_probe', 'extraction').
+        :param valid_hosts: list of host names, an article passes if its host is one of them or a subdomain of them. If
+            None or empty, any host is OK.
         :param start_date:
         :param end_date:
         :param strict_date:
-        :param reuse_previously_downloaded_files:
+        :param reuse_previously_downloaded_files: if True, reuse completely downloaded files if the remote file has not
+            changed, and resume interrupted downloads
         :param local_download_dir_warc:
+        :param local_download_dir_warc_max_size: if set, the least recently used WARC files are deleted from
+            local_download_dir_warc to keep its size below this limit (in bytes)
         :param continue_after_error:
         :param show_download_progress:
         :param log_level:
+        :param stream_warc: if True, the WARC file is not downloaded to local_download_dir_warc but its records are
+            extracted while the file is being transferred
+        :param number_of_record_extraction_processes: if greater than 1, the WARC file is read in the current process
+            while articles are extracted from its records by a pool of this many processes. Note that the article
+            extraction then uses NewsPlease.from_warc directly, i.e., overrides of _from_warc are not used. The
+            processes are spawned, not forked, once per WARC file.
+        :param ordered_record_delivery: if True, callback_on_article_extracted is invoked in the order of the records
+            in the WARC file, else as soon as an article has been extracted
+        :param warc_record_ranges: if not None, a list of (offset, length) tuples, e.g., resolved from an index (see
+            commoncrawl_index). Only the records at these byte ranges are fetched via range requests and extracted.
+        :param checkpoint_interval: if set, the position in the WARC file is saved to local_download_dir_warc every
+            this many records. If the extraction is interrupted, e.g., by a crash, the next extraction of the WARC file
+            resumes at the last checkpoint. The articles of the records between the last checkpoint and the
+            interruption are then passed to callback_on_article_extracted again, i.e., articles are delivered at least
+            once, so callbacks that write to sinks that are not idempotent need to deduplicate them, e.g., by url. The
+            counters passed to callback_on_warc_completed only cover the records that were processed after resuming.
+            Checkpoints are not saved if warc_record_ranges is set or if articles extracted by multiple processes are
+            passed on as completed.
+        :param extraction_timeout: if set, the time budget for the extraction of an article in seconds. If it is
+            exceeded, the article only contains the information extracted until then, so that pathological pages do
+            not stall the extraction of the WARC file.
+        :param max_html_size: if set, larger HTML is reduced by emptying its <script> and <style> tags and then
+            truncated to this size before the extraction
         :return:
         """
         self.__warc_path = warc_path
-        self.__filter_valid_hosts = valid_hosts
+        self.__filter_valid_hosts = HostSuffixIndex(valid_hosts or [])
         self.__filter_start_date = start_date
         self.__filter_end_date = end_date
         self.__filter_strict_date = strict_date
         if local_download_dir_warc:
             self.__local_download_dir_warc = local_download_dir_warc
         self.__reuse_previously_downloaded_files = reuse_previously_downloaded_files
+        self.__local_download_dir_warc_max_size = local_download_dir_warc_max_size
         self.__continue_after_error = continue_after_error
         self.__ignore_unicode_errors = ignore_unicode_errors
         self.__fetch_images = fetch_images
+        self.__extraction_timeout = extraction_timeout
+        self.__max_html_size = max_html_size
         self.__callback_on_article_extracted = callback_on_article_extracted
         self.__callback_on_warc_completed = callback_on_warc_completed
         self.__show_download_progress = show_download_progress
         self.__log_level = log_level
         self.__delete_warc_after_extraction = delete_warc_after_extraction
         self.__log_pathname_fully_extracted_warcs = log_pathname_fully_extracted_warcs
+        self.__stream_warc = stream_warc
+        self.__number_of_record_extraction_processes = number_of_record_extraction_processes
+        self.__ordered_record_delivery = ordered_record_delivery
+        self.__warc_record_ranges = warc_record_ranges
+        self.__checkpoint_interval = checkpoint_interval
+
+        self.__connect_to_s3()
+
+        self.__run()
 
+    def download_from_commoncrawl(self, warc_path, reuse_previously_downloaded_files=True, local_download_dir_warc=None,
+                                  local_download_dir_warc_max_size=None, show_download_progress=False,
+                                  log_level=logging.ERROR):
+        """
+        Only downloads a WARC file from commoncrawl.org to local_download_dir_warc without extracting it. A subsequent
+        extract_from_commoncrawl(...) of the same WARC file with reuse_previously_downloaded_files=True then uses the
+        downloaded file, which allows to download the next WARC file while the current one is being extracted.
+        :param warc_path:
+        :param reuse_previously_downloaded_files:
+        :param local_download_dir_warc:
+        :param local_download_dir_warc_max_size:
+        :param show_download_progress:
+        :param log_level:
+        :return: File path name of the downloaded file
+        """
+        self.__warc_path = warc_path
+        if local_download_dir_warc:
+            self.__local_download_dir_warc = local_download_dir_warc
+        self.__reuse_previously_downloaded_files = reuse_previously_downloaded_files
+        self.__local_download_dir_warc_max_size = local_download_dir_warc_max_size
+        self.__show_download_progress = show_download_progress
+        self.__log_level = log_level
+
+        self.__connect_to_s3()
+        self.__setup()
+
+        return self.__download(warc_path)
+
+    def __connect_to_s3(self):
+        """
+        Uses the commoncrawl bucket on S3 if it is accessible, else data.commoncrawl.org
+        :return:
+        """
         self.__s3_client = None
         try:
             s3_client = boto3.client('s3')
@@ -354,6 +1209,3 @@ class CommonCrawlExtractor:
             self.__s3_client = s3_client
         except (botocore.exceptions.ClientError, botocore.exceptions.NoCredentialsError):
             self.__logger.info('Failed to read %s bucket, using monthly WARC file listings', self.__cc_bucket)
-
-
-        self.__run()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Provides index sources that resolve which records of the WARC files on commoncrawl.org belong to the hosts of
+interest. Each record is identified by a (warc_filename, offset, length) triple, which allows to fetch only these
+records via HTTP range requests instead of downloading and scanning entire WARC files.
+"""
+import gzip
+import json
+import logging
+
+from six.moves.urllib.parse import urlsplit
+
+from .commoncrawl_extractor import HostSuffixIndex
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+__author__ = "Felix Hamborg"
+__copyright__ = "Copyright 2024"
+__credits__ = ["Sebastian Nagel"]
+
+
+class IndexSource(object):
+    """
+    Base class of index sources. Subclasses implement lookup(...) to yield the records of the given hosts.
+    """
+
+    def lookup(self, valid_hosts=None):
+        """
+        Yields the records of the given hosts
+        :param valid_hosts: list of host names, a record matches if its host is one of them or a subdomain of them. If
+            None or empty, all records match.
+        :return: A generator of (warc_filename, offset, length) triples
+        """
+        raise NotImplementedError()
+
+    def lookup_by_warc_path(self, valid_hosts=None):
+        """
+        Resolves the records of the given hosts and groups them by WARC file
+        :param valid_hosts:
+        :return: A dict of WARC paths mapping to lists of (offset, length) tuples sorted by offset
+        """
+        ranges_by_warc_path = {}
+        for warc_filename, offset, length in self.lookup(valid_hosts):
+            ranges_by_warc_path.setdefault(warc_filename, []).append((offset, length))
+        for ranges in ranges_by_warc_path.values():
+            ranges.sort()
+        return ranges_by_warc_path
+
+
+class CdxIndexSource(IndexSource):
+    """
+    Reads index files in the CDXJ format used by commoncrawl.org and pywb, i.e., one record per line consisting of the
+    SURT key, the timestamp and a JSON object with at least the fields url, filename, offset and length. Files ending
+    with .gz are decompressed.
+    """
+
+    def __init__(self, paths):
+        """
+        :param paths: path or list of paths to local CDXJ files
+        """
+        self.log = logging.getLogger(__name__)
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+
+    def lookup(self, valid_hosts=None):
+        hosts = HostSuffixIndex(valid_hosts or [])
+        for path in self.paths:
+            opener = gzip.open if path.endswith('.gz') else open
+            with opener(path, 'rt', encoding='utf-8') as index_file:
+                for line in index_file:
+                    try:
+                        fields = json.loads(line.split(' ', 2)[2])
+                        if hosts and urlsplit(fields['url']).hostname not in hosts:
+                            continue
+                        yield fields['filename'], int(fields['offset']), int(fields['length'])
+                    except (IndexError, KeyError, ValueError, TypeError):
+                        self.log.debug('skipping malformed index line in %s: %s', path, line)
+
+
+class ParquetIndexSource(IndexSource):
+    """
+    Reads index files in the columnar (Parquet) format used by commoncrawl.org, i.e., with the columns url_host_name,
+    warc_filename, warc_record_offset and warc_record_length. Requires pyarrow.
+    """
+
+    columns = ['url_host_name', 'warc_filename', 'warc_record_offset', 'warc_record_length']
+
+    def __init__(self, paths):
+        """
+        :param paths: path or list of paths to local Parquet files
+        """
+        if pq is None:
+            raise ModuleNotFoundError("Using ParquetIndexSource requires pyarrow")
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+
+    def lookup(self, valid_hosts=None):
+        hosts = HostSuffixIndex(valid_hosts or [])
+        for path in self.paths:
+            for batch in pq.ParquetFile(path).iter_batches(columns=self.columns):
+                for host, warc_filename, offset, length in zip(*(batch.column(name).to_pylist()
+                                                                 for name in self.columns)):
+                    if hosts and not (host and host in hosts):
+                        continue
+                    yield warc_filename, offset, length
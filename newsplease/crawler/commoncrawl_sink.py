@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+"""
+Provides sinks that store the articles extracted by crawl_from_commoncrawl. In contrast to
+callback_on_article_extracted, which is invoked within each extraction process, the extraction processes send batches
+of articles to a single sink in the main process, which writes them to a few large, compressed shard files instead of
+one file per article.
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+
+from ..NewsArticle import NewsArticle
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+__author__ = "Felix Hamborg"
+__copyright__ = "Copyright 2024"
+__credits__ = ["Sebastian Nagel"]
+
+
+class ArticleSink(object):
+    """
+    Base class of sinks. Subclasses implement write(...) and, if needed, close().
+    """
+
+    def write(self, articles):
+        """
+        Stores a batch of articles
+        :param articles: list of article dicts, see NewsArticle.get_dict()
+        :return:
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Is invoked after the last batch has been written
+        :return:
+        """
+        pass
+
+
+class CallbackSink(ArticleSink):
+    """
+    Invokes a callback for each article, e.g., a callback_on_article_extracted written for previous versions. Other than
+    callback_on_article_extracted, the callback is invoked in the main process only.
+    """
+
+    def __init__(self, callback):
+        """
+        :param callback: function that is invoked with a NewsArticle
+        """
+        self.callback = callback
+
+    def write(self, articles):
+        for article_dict in articles:
+            article = NewsArticle()
+            for key, value in article_dict.items():
+                setattr(article, key, value)
+            self.callback(article)
+
+
+class ShardedFileSink(ArticleSink):
+    """
+    Base class of sinks that write the articles to shard files in a directory. A new shard is started once the current
+    one contains articles_per_shard articles. While a shard is written, its name ends with .tmp, so that complete
+    shards can be processed while the crawler is still running.
+    """
+
+    file_extension = None
+
+    def __init__(self, directory, articles_per_shard=100000, prefix='articles'):
+        """
+        :param directory: directory that the shards are written to, is created if it does not exist
+        :param articles_per_shard: maximum number of articles per shard
+        :param prefix: prefix of the shards' file names, which are followed by the start time of the crawler and the
+            number of the shard, e.g., articles-20240101120000-00000.jsonl.gz
+        """
+        self.log = logging.getLogger(__name__)
+        self.directory = directory
+        self.articles_per_shard = articles_per_shard
+        self.prefix = '%s-%s' % (prefix, datetime.datetime.now().strftime('%Y%m%d%H%M%S'))
+        self.shard_index = 0
+        self.shard_filepath = None
+        self.articles_in_shard = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, articles):
+        while articles:
+            if self.shard_filepath is None:
+                self.shard_filepath = os.path.join(self.directory, '%s-%05i%s' % (self.prefix, self.shard_index,
+                                                                                  self.file_extension))
+                self.open_shard(self.shard_filepath + '.tmp')
+            number_of_articles = min(len(articles), self.articles_per_shard - self.articles_in_shard)
+            self.write_to_shard(articles[:number_of_articles])
+            self.articles_in_shard += number_of_articles
+            articles = articles[number_of_articles:]
+            if self.articles_in_shard >= self.articles_per_shard:
+                self.__complete_shard()
+
+    def close(self):
+        if self.shard_filepath is not None:
+            self.__complete_shard()
+
+    def __complete_shard(self):
+        self.close_shard()
+        os.replace(self.shard_filepath + '.tmp', self.shard_filepath)
+        self.log.info('wrote %i articles to %s', self.articles_in_shard, self.shard_filepath)
+        self.shard_filepath = None
+        self.shard_index += 1
+        self.articles_in_shard = 0
+
+    def open_shard(self, filepath):
+        raise NotImplementedError()
+
+    def write_to_shard(self, articles):
+        raise NotImplementedError()
+
+    def close_shard(self):
+        raise NotImplementedError()
+
+
+class JsonLinesSink(ShardedFileSink):
+    """
+    Writes the articles to (gzipped) JSON Lines shards, i.e., one JSON object per line and article.
+    """
+
+    def __init__(self, directory, articles_per_shard=100000, prefix='articles', compress=True):
+        """
+        :param directory:
+        :param articles_per_shard:
+        :param prefix:
+        :param compress: if True, the shards are gzipped
+        """
+        self.compress = compress
+        self.file_extension = '.jsonl.gz' if compress else '.jsonl'
+        self.shard_file = None
+        super(JsonLinesSink, self).__init__(directory, articles_per_shard, prefix)
+
+    def open_shard(self, filepath):
+        opener = gzip.open if self.compress else open
+        self.shard_file = opener(filepath, 'wt', encoding='utf-8')
+
+    def write_to_shard(self, articles):
+        for article in articles:
+            self.shard_file.write(json.dumps(article, default=str, separators=(',', ':'), ensure_ascii=False))
+            self.shard_file.write('\n')
+
+    def close_shard(self):
+        self.shard_file.close()
+        self.shard_file = None
+
+
+class ParquetSink(ShardedFileSink):
+    """
+    Writes the articles to Parquet shards. Requires pyarrow.
+    """
+
+    file_extension = '.parquet'
+
+    def __init__(self, directory, articles_per_shard=100000, prefix='articles', row_group_size=10000):
+        """
+        :param directory:
+        :param articles_per_shard:
+        :param prefix:
+        :param row_group_size: number of articles that are buffered and written as one row group
+        """
+        if pa is None:
+            raise ModuleNotFoundError("Using ParquetSink requires pyarrow")
+        self.schema = pa.schema([('authors', pa.list_(pa.string()))] +
+                                [(name, pa.timestamp('us')) for name in ['date_download', 'date_modify',
+                                                                         'date_publish']] +
+                                [(name, pa.string()) for name in ['description', 'filename', 'image_url', 'language',
+                                                                  'localpath', 'maintext', 'source_domain', 'text',
+                                                                  'title', 'title_page', 'title_rss', 'url']])
+        self.row_group_size = row_group_size
+        self.writer = None
+        self.rows = []
+        super(ParquetSink, self).__init__(directory, articles_per_shard, prefix)
+
+    def open_shard(self, filepath):
+        self.writer = pq.ParquetWriter(filepath, self.schema, compression='zstd')
+
+    def write_to_shard(self, articles):
+        self.rows += articles
+        if len(self.rows) >= self.row_group_size:
+            self.__write_row_group()
+
+    def close_shard(self):
+        self.__write_row_group()
+        self.writer.close()
+        self.writer = None
+
+    def __write_row_group(self):
+        if self.rows:
+            self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+
+class ArticleBatcher(object):
+    """
+    Collects the articles extracted in an extraction process and puts them on a queue in batches, from where they are
+    passed to the sink. Used by crawl_from_commoncrawl as callback_on_article_extracted.
+    """
+
+    def __init__(self, article_batch_queue, batch_size=100):
+        """
+        :param article_batch_queue: queue that is shared with the main process
+        :param batch_size: number of articles per batch
+        """
+        self.article_batch_queue = article_batch_queue
+        self.batch_size = batch_size
+        self.batch = []
+
+    def __call__(self, article):
+        self.batch.append(article.get_dict())
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Puts the collected articles on the queue, must be invoked after the extraction of each WARC file
+        :return:
+        """
+        if self.batch:
+            self.article_batch_queue.put(self.batch)
+            self.batch = []
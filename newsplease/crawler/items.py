@@ -26,6 +26,8 @@ class NewscrawlerItem(scrapy.Item):
     html_title = scrapy.Field()
     # Response object from crawler
     spider_response = scrapy.Field()
+    # ParsedDocument of the response's body, shared by the extractors
+    parsed_document = scrapy.Field()
     # Title of the article as store in the RSS feed
     rss_title = scrapy.Field()
     # Extracted article title
@@ -32,17 +32,31 @@ def detect_encoding(bytesobject):
     return None
 
 
-def decode_response(response):
-    """Read the first chunk of server response and decode it"""
-    guessed_encoding = detect_encoding(response.content)
+def decode_response(response, content=None):
+    """Read the first chunk of server response and decode it
+
+    :param response: the response
+    :param content: the body of the response as bytes if it was streamed, else response.content is used
+    """
+    if content is None:
+        content = response.content
+    guessed_encoding = detect_encoding(content)
     LOGGER.debug('response/guessed encoding: %s / %s', response.encoding, guessed_encoding)
     # process
     if guessed_encoding is not None:
         try:
-            htmltext = response.content.decode(guessed_encoding)
-        except UnicodeDecodeError:
+            htmltext = content.decode(guessed_encoding)
+        except (UnicodeDecodeError, LookupError):
             LOGGER.warning('encoding error: %s / %s', response.encoding, guessed_encoding)
-            htmltext = response.text
+            htmltext = decode_with_declared_encoding(response, content)
     else:
-        htmltext = response.text
+        htmltext = decode_with_declared_encoding(response, content)
     return htmltext
+
+
+def decode_with_declared_encoding(response, content):
+    """Decode the body with the encoding declared by the server, like response.text"""
+    try:
+        return content.decode(response.encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return content.decode('utf-8', errors='replace')
@@ -1,7 +1,9 @@
+import collections
+import concurrent.futures as cf
 import socket
-import copy
 import threading
 import logging
+from urllib.parse import urlsplit
 
 import requests
 import urllib3
@@ -10,54 +12,76 @@ from .response_decoder import decode_response
 
 MAX_FILE_SIZE = 20000000
 MIN_FILE_SIZE = 10
+# size of the chunks in which responses are read, so that downloads stop as soon as MAX_FILE_SIZE is exceeded
+CHUNK_SIZE = 64 * 1024
+# maximum number of concurrent requests of fetch_urls
+MAX_WORKERS = 32
+# maximum number of concurrent requests to the same host
+MAX_WORKERS_PER_HOST = 4
 
 LOGGER = logging.getLogger(__name__)
 
 # user agent
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/53.0.2785.143 Safari/537.36"
 
-# customize headers
+# customize headers, connections are kept alive and reused by the sessions of the fetching threads
 HEADERS = {
-    "Connection": "close",
     "User-Agent": USER_AGENT,
 }
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
 class SimpleCrawler(object):
-    _results = {}
+    # the requests session of each thread, which pools the connections to the hosts
+    _local = threading.local()
 
     @staticmethod
-    def fetch_url(url, request_args=None):
+    def _get_session():
         """
-        Crawls the html content of the parameter url and returns the html
-        :param url:
-        :param request_args: optional arguments that `request` takes
-        :return:
+        Returns the requests session of the current thread, which is created on first use
+        :return: A requests.Session
         """
-        return SimpleCrawler._fetch_url(url, False, request_args=request_args)
+        session = getattr(SimpleCrawler._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            SimpleCrawler._local.session = session
+        return session
 
     @staticmethod
-    def _fetch_url(url, is_threaded, request_args=None):
+    def fetch_url(url, request_args=None):
         """
-        Crawls the html content of the parameter url and saves the html in _results
+        Crawls the html content of the parameter url and returns the html
         :param url:
-        :param is_threaded: If True, results will be stored for later processing by the fetch_urls method. Else not.
         :param request_args: optional arguments that `request` takes
-        :return: html of the url
+        :return:
         """
         if request_args is None:
             request_args = {}
         if "headers" not in request_args:
-            request_args["headers"] = HEADERS
+            request_args = dict(request_args, headers=HEADERS)
 
         html_str = None
         # send
         try:
-            # read by streaming chunks (stream=True, iter_content=xx)
-            # so we can stop downloading as soon as MAX_FILE_SIZE is reached
-            response = requests.get(
-                url, verify=False, allow_redirects=True, **request_args)
+            # read by streaming chunks, so we can stop downloading as soon as MAX_FILE_SIZE is reached
+            with SimpleCrawler._get_session().get(
+                    url, verify=False, allow_redirects=True, stream=True, **request_args) as response:
+                # safety checks
+                if response.status_code != 200:
+                    LOGGER.error("not a 200 response: %s", response.status_code)
+                    return None
+                content_length = response.headers.get("Content-Length", "")
+                if content_length.isdigit() and int(content_length) > MAX_FILE_SIZE:
+                    LOGGER.error("too large: %s %s", url, content_length)
+                    return None
+
+                content = bytearray()
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    content += chunk
+                    if len(content) > MAX_FILE_SIZE:
+                        LOGGER.error("too large: %s >%s", url, MAX_FILE_SIZE)
+                        return None
+                content = bytes(content)
         except (requests.exceptions.MissingSchema, requests.exceptions.InvalidURL):
             LOGGER.error("malformed URL: %s", url)
         except requests.exceptions.TooManyRedirects:
@@ -67,42 +91,86 @@ class SimpleCrawler(object):
         except (
             socket.timeout,
             requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
             requests.exceptions.Timeout,
             socket.error,
             socket.gaierror,
         ) as err:
             LOGGER.error("connection/timeout error: %s %s", url, err)
         else:
-            # safety checks
-            if response.status_code != 200:
-                LOGGER.error("not a 200 response: %s", response.status_code)
-            elif response.text is None or len(response.text) < MIN_FILE_SIZE:
-                LOGGER.error("too small/incorrect: %s %s", url, len(response.text))
-            elif len(response.text) > MAX_FILE_SIZE:
-                LOGGER.error("too large: %s %s", url, len(response.text))
+            if len(content) < MIN_FILE_SIZE:
+                LOGGER.error("too small/incorrect: %s %s", url, len(content))
             else:
-                html_str = decode_response(response)
-        if is_threaded:
-            SimpleCrawler._results[url] = html_str
+                html_str = decode_response(response, content)
         return html_str
 
     @staticmethod
-    def fetch_urls(urls, request_args=None):
+    def iter_fetch_urls(urls, request_args=None, max_workers=MAX_WORKERS, max_workers_per_host=MAX_WORKERS_PER_HOST):
+        """
+        Crawls the html content of all given urls in parallel and yields the results as they complete. At most
+        max_workers requests are sent at once, and at most max_workers_per_host of them to the same host. The hosts are
+        served in turns, so that a host with many urls does not delay the others.
+        :param urls:
+        :param request_args: optional arguments that `request` takes
+        :param max_workers: maximum number of concurrent requests
+        :param max_workers_per_host: maximum number of concurrent requests to the same host
+        :return: A generator of tuples of the url and its html, which is None if the url could not be crawled
+        """
+        # pending urls per host, the order of the hosts is the order in which they get their turns
+        pending = collections.OrderedDict()
+        for url in dict.fromkeys(urls):
+            try:
+                host = urlsplit(url).netloc.lower()
+            except ValueError as err:
+                # e.g., an invalid IPv6 address, which could not be crawled anyway
+                LOGGER.error("invalid url: %s %s", url, err)
+                yield url, None
+                continue
+            pending.setdefault(host, collections.deque()).append(url)
+        running_per_host = collections.Counter()
+        futures = {}
+
+        with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or futures:
+                # submit urls of hosts that have capacity left until max_workers requests are running
+                submitted = True
+                while submitted and len(futures) < max_workers:
+                    submitted = False
+                    for host in list(pending):
+                        if len(futures) >= max_workers:
+                            break
+                        if running_per_host[host] >= max_workers_per_host:
+                            continue
+                        url = pending[host].popleft()
+                        if not pending[host]:
+                            del pending[host]
+                        else:
+                            # the host's next url waits for the other hosts' turns
+                            pending.move_to_end(host)
+                        futures[executor.submit(SimpleCrawler.fetch_url, url, request_args)] = (url, host)
+                        running_per_host[host] += 1
+                        submitted = True
+
+                done, _ = cf.wait(futures, return_when=cf.FIRST_COMPLETED)
+                for future in done:
+                    url, host = futures.pop(future)
+                    running_per_host[host] -= 1
+                    try:
+                        html_str = future.result()
+                    except Exception as err:
+                        LOGGER.error("request error: %s %s", url, err)
+                        html_str = None
+                    yield url, html_str
+
+    @staticmethod
+    def fetch_urls(urls, request_args=None, max_workers=MAX_WORKERS, max_workers_per_host=MAX_WORKERS_PER_HOST):
         """
         Crawls the html content of all given urls in parallel. Returns when all requests are processed.
         :param urls:
         :param request_args: optional arguments that `request` takes
-        :return:
+        :param max_workers: maximum number of concurrent requests, see iter_fetch_urls
+        :param max_workers_per_host: maximum number of concurrent requests to the same host, see iter_fetch_urls
+        :return: A dict containing the given urls as keys and their html, or None, as values
         """
-        threads = [
-            threading.Thread(target=SimpleCrawler._fetch_url, args=(url, True, request_args))
-            for url in urls
-        ]
-        for thread in threads:
-            thread.start()
-        for thread in threads:
-            thread.join()
-
-        results = copy.deepcopy(SimpleCrawler._results)
-        SimpleCrawler._results = {}
-        return results
+        return dict(SimpleCrawler.iter_fetch_urls(urls, request_args=request_args, max_workers=max_workers,
+                                                  max_workers_per_host=max_workers_per_host))
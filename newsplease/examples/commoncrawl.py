@@ -32,6 +32,8 @@ import datetime
 from datetime import date
 
 from ..crawler import commoncrawl_crawler as commoncrawl_crawler
+from ..crawler.commoncrawl_index import CdxIndexSource, ParquetIndexSource
+from ..crawler.commoncrawl_sink import JsonLinesSink, ParquetSink
 
 __author__ = "Felix Hamborg"
 __copyright__ = "Copyright 2024"
@@ -43,6 +45,9 @@ __credits__ = ["Sebastian Nagel"]
 my_local_download_dir_warc = './cc_download_warc/'
 # download dir for articles
 my_local_download_dir_article = './cc_download_articles/'
+# if set, articles are not saved as one JSON file each (see on_valid_article_extracted) but written to a few large,
+# compressed shard files in my_local_download_dir_article, which is much faster for large crawls
+my_sink = None  # example: JsonLinesSink(my_local_download_dir_article, articles_per_shard=100000)
 # hosts (if None or empty list, any host is OK)
 my_filter_valid_hosts = []  # example: ['elrancaguino.cl']
 # start date (if None, any date is OK as start date), as datetime
@@ -59,8 +64,15 @@ my_warc_files_end_date = None # example: datetime.datetime(2020, 3, 2)
 # if date filtering is strict and news-please could not detect the date of an article, the article will be discarded
 my_filter_strict_date = True
 # if True, the script checks whether a file has been downloaded already and uses that file instead of downloading
-# again. Note that there is no check whether the file has been downloaded completely or is valid!
+# again. Files are only reused if they have been downloaded completely and the remote file has not changed since.
+# Interrupted downloads are resumed.
 my_reuse_previously_downloaded_files = True
+# if set, the least recently used WARC files are deleted from my_local_download_dir_warc to keep its size below this
+# limit (in bytes). Only useful if my_delete_warc_after_extraction is False.
+my_local_download_dir_warc_max_size = None  # example: 50 * 1024 ** 3
+# if True, the WARC files are not downloaded to my_local_download_dir_warc, but articles are extracted while the WARC
+# files are being transferred, so that no scratch disk space is needed
+my_stream_warc = False
 # continue after error
 my_continue_after_error = True
 # show the progress of downloading the WARC files
@@ -71,17 +83,43 @@ my_log_level = logging.INFO
 my_json_export_style = 1  # 0 (minimize), 1 (pretty)
 # number of extraction processes
 my_number_of_extraction_processes = 1
+# number of processes that extract articles from the records of a single WARC file. If greater than 1, WARC files are
+# processed one after another and my_number_of_extraction_processes is ignored. This is useful for jobs that cover only
+# a few WARC files.
+my_number_of_record_extraction_processes = 1
+# if True, articles extracted by multiple record extraction processes are passed on in the order of their records
+my_ordered_record_delivery = True
+# number of WARC files that each extraction process downloads ahead while it extracts the current WARC file. This keeps
+# the CPU busy if downloading a WARC file takes about as long as extracting it. Each WARC file takes about 1 GB.
+my_number_of_prefetched_warc_files = 0
+# if set, no further WARC files are prefetched while the downloaded but not yet extracted WARC files take more than this
+# many bytes
+my_prefetch_max_size = None  # example: 4 * 1024 ** 3
 # if True, the WARC file will be deleted after all articles have been extracted from it
 my_delete_warc_after_extraction = True
 # if True, will continue extraction from the latest fully downloaded but not fully extracted WARC files and then
 # crawling new WARC files. This assumes that the filter criteria have not been changed since the previous run!
 my_continue_process = True
+# if my_continue_process is True, the position in the WARC file is saved every this many records, so that the
+# extraction of an interrupted WARC file continues at the last checkpoint instead of its beginning. The articles
+# extracted between the last checkpoint and the interruption are then passed on again, so deduplicate them, e.g., by
+# url, if your callback or sink is not idempotent
+my_checkpoint_interval = 1000
+# if set, the time budget for the extraction of an article in seconds. An article whose extraction exceeds it only
+# contains the information extracted until then
+my_extraction_timeout = None  # example: 10
+# if set, larger HTML is reduced by emptying its <script> and <style> tags and then truncated to this size before the
+# extraction
+my_max_html_size = None  # example: 2 * 1024 ** 2
 # if True, will crawl and extract main image of each article. Note that the WARC files
 # do not contain any images, so that news-please will crawl the current image from
 # the articles online webpage, if this option is enabled.
 my_fetch_images = False
 # if True, just list the WARC files to be processed, but do not actually download and process them
 my_dry_run=False
+# if set, an index that lists the records of my_filter_valid_hosts. Then, only these records are fetched via range
+# requests instead of downloading all WARC files
+my_index_source = None  # example: CdxIndexSource('./cc-news.cdxj.gz') or ParquetIndexSource('./cc-news.parquet')
 ############ END YOUR CONFIG #########
 
 
@@ -129,7 +167,8 @@ def on_valid_article_extracted(article):
 
 
 def callback_on_warc_completed(warc_path, counter_article_passed, counter_article_discarded,
-                               counter_article_error, counter_article_total, counter_warc_processed):
+                               counter_article_error, counter_article_total, counter_warc_processed,
+                               counter_article_rejected_by_stage=None):
     """
     This function will be invoked for each WARC file that was processed completely. Parameters represent total values,
     i.e., cumulated over all all previously processed WARC files.
@@ -139,6 +178,9 @@ def callback_on_warc_completed(warc_path, counter_article_passed, counter_articl
     :param counter_article_error:
     :param counter_article_total:
     :param counter_warc_processed:
+    :param counter_article_rejected_by_stage: dict of the number of discarded articles per filter stage, i.e., 'headers'
+        (HTTP status, content type and length, host), 'date_probe' (publishing date in meta tags or JSON-LD), and
+        'extraction' (full article extraction)
     :return:
     """
     pass
@@ -175,6 +217,7 @@ def main():
                                                strict_date=my_filter_strict_date,
                                                reuse_previously_downloaded_files=my_reuse_previously_downloaded_files,
                                                local_download_dir_warc=my_local_download_dir_warc,
+                                               local_download_dir_warc_max_size=my_local_download_dir_warc_max_size,
                                                continue_after_error=my_continue_after_error,
                                                show_download_progress=my_show_download_progress,
                                                number_of_extraction_processes=my_number_of_extraction_processes,
@@ -182,7 +225,17 @@ def main():
                                                delete_warc_after_extraction=my_delete_warc_after_extraction,
                                                continue_process=True,
                                                fetch_images=my_fetch_images,
-                                               dry_run=my_dry_run)
+                                               dry_run=my_dry_run,
+                                               stream_warc=my_stream_warc,
+                                               number_of_record_extraction_processes=my_number_of_record_extraction_processes,
+                                               ordered_record_delivery=my_ordered_record_delivery,
+                                               index_source=my_index_source,
+                                               number_of_prefetched_warc_files=my_number_of_prefetched_warc_files,
+                                               prefetch_max_size=my_prefetch_max_size,
+                                               checkpoint_interval=my_checkpoint_interval,
+                                               extraction_timeout=my_extraction_timeout,
+                                               max_html_size=my_max_html_size,
+                                               sink=my_sink)
 
 
 if __name__ == "__main__":
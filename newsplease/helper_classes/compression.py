@@ -0,0 +1,99 @@
+"""
+Helper class for compressing the values that news-please stores, e.g., in Redis. Each value starts with a header that
+records its codec, so that values remain readable when the codec is changed. Values without a header are LZMA
+compressed, which was the only codec before the header was introduced. LZMA values are still written without a header,
+so that they can be read by older versions of news-please.
+"""
+import lzma
+import zlib
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# magic bytes of the header, which values without a header, i.e., LZMA (.xz) values, cannot start with
+HEADER_MAGIC = b"\x00NP"
+
+# the codecs and their ids in the header
+CODEC_IDS = {"zlib": 1, "lz4": 2, "zstd": 3}
+
+
+class Compressor:
+    """
+    Compresses values with the codec given by its name and decompresses values of all codecs.
+    """
+
+    def __init__(self, codec="lzma", level=None, dictionary_path=None):
+        """
+        :param codec: lzma (default, readable by older versions of news-please), zlib, lz4 or zstd
+        :param level: the compression level, None for the default level of the codec. For lzma, it is the preset (0 to
+            9), which can be combined with lzma.PRESET_EXTREME.
+        :param dictionary_path: path of a dictionary for zstd, which compresses small values much better if it was
+            trained on similar values, e.g., with zstd --train. It is needed to decompress the values, too.
+        """
+        if codec != "lzma" and codec not in CODEC_IDS:
+            raise ValueError("Unknown codec %s, expected one of lzma, %s" % (codec, ", ".join(CODEC_IDS)))
+        if codec == "lz4" and lz4 is None:
+            raise ModuleNotFoundError("lz4 is required for the lz4 codec, install it with pip install lz4")
+        if (codec == "zstd" or dictionary_path) and zstandard is None:
+            raise ModuleNotFoundError("zstandard is required for the zstd codec, install it with pip install zstandard")
+
+        self.codec = codec
+        self.level = level
+        self.header = HEADER_MAGIC + bytes([CODEC_IDS[codec]]) if codec in CODEC_IDS else b""
+
+        self.__zstd_dictionary = None
+        if dictionary_path:
+            with open(dictionary_path, "rb") as dictionary_file:
+                self.__zstd_dictionary = zstandard.ZstdCompressionDict(dictionary_file.read())
+        self.__zstd_compressor = None
+        self.__zstd_decompressor = None
+
+    def compress(self, data):
+        """
+        Compresses the data with the codec
+        :param data: bytes
+        :return: bytes, the header and the compressed data
+        """
+        if self.codec == "lzma":
+            return lzma.compress(data, preset=self.level)
+        if self.codec == "zlib":
+            return self.header + zlib.compress(data, -1 if self.level is None else self.level)
+        if self.codec == "lz4":
+            return self.header + lz4.frame.compress(data, compression_level=self.level or 0)
+        if self.__zstd_compressor is None:
+            self.__zstd_compressor = zstandard.ZstdCompressor(level=3 if self.level is None else self.level,
+                                                              dict_data=self.__zstd_dictionary)
+        return self.header + self.__zstd_compressor.compress(data)
+
+    def decompress(self, value):
+        """
+        Decompresses a value of any codec
+        :param value: bytes, a value returned by compress or an LZMA compressed value without header
+        :return: bytes
+        """
+        if not value.startswith(HEADER_MAGIC):
+            return lzma.decompress(value)
+
+        codec_id = value[len(HEADER_MAGIC)]
+        data = value[len(HEADER_MAGIC) + 1:]
+        if codec_id == CODEC_IDS["zlib"]:
+            return zlib.decompress(data)
+        if codec_id == CODEC_IDS["lz4"]:
+            if lz4 is None:
+                raise ModuleNotFoundError("lz4 is required to read lz4 compressed values, install it with pip install lz4")
+            return lz4.frame.decompress(data)
+        if codec_id == CODEC_IDS["zstd"]:
+            if zstandard is None:
+                raise ModuleNotFoundError("zstandard is required to read zstd compressed values, install it with pip "
+                                          "install zstandard")
+            if self.__zstd_decompressor is None:
+                self.__zstd_decompressor = zstandard.ZstdDecompressor(dict_data=self.__zstd_dictionary)
+            return self.__zstd_decompressor.decompress(data)
+        raise ValueError("Unknown codec id %i in the header of the value" % codec_id)
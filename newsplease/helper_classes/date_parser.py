@@ -0,0 +1,101 @@
+"""
+Helper functions for parsing the dates found in articles. Most dates are written in ISO 8601 or RFC 1123 format, e.g.,
+in meta tags and JSON-LD, and are parsed by a strict fast path. Other strings are parsed by dateutil, and since the
+same strings recur across the articles of a site, e.g., relative dates or dates of navigation elements, the results of
+dateutil are memoized. dateutil fills the fields that a string lacks, e.g., the year of "5 March", from the current date,
+hence the results are memoized per day.
+"""
+import datetime
+import functools
+import re
+
+from dateutil import parser
+
+# maximum number of date strings whose dateutil results are memoized per process
+DATEUTIL_CACHE_SIZE = 4096
+
+# to improve performance, regex statements are compiled only once per module
+re_iso_date = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?(Z|[+-]\d{2}(?::?\d{2})?)?)?'
+)
+re_rfc_date = re.compile(
+    r'(?:(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun), )?(\d{1,2}) (Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) (\d{4}) '
+    r'(\d{2}):(\d{2})(?::(\d{2}))? (GMT|UTC|[+-]\d{4})'
+)
+
+MONTHS = {month: number for number, month in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], 1)}
+
+
+def parse_date(date_string):
+    """
+    Parses a date string like dateutil.parser.parse, but tries the ISO 8601 and RFC 1123 formats first and memoizes
+    the results of dateutil
+    :param date_string: A string
+    :return: A datetime, which is timezone aware if the string contains a time zone, or None if the string could not be
+        parsed
+    """
+    if not isinstance(date_string, str):
+        return None
+    date_string = date_string.strip()
+    try:
+        date = _parse_strict(date_string)
+        if date is not None:
+            return date
+    except ValueError:
+        # e.g., the 30th of February, which dateutil rejects as well, but with its own error handling
+        pass
+    return _parse_with_dateutil(date_string, datetime.date.today())
+
+
+def _parse_strict(date_string):
+    """
+    Parses date strings in ISO 8601 format, e.g., 2015-11-26T07:11:02Z, or RFC 1123 format, e.g.,
+    Thu, 26 Nov 2015 07:11:02 GMT
+    :param date_string:
+    :return: A datetime or None if the string is in neither format
+    """
+    match = re_iso_date.fullmatch(date_string)
+    if match:
+        year, month, day, hour, minute, second, fraction, zone = match.groups()
+        return datetime.datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0),
+                                 int(second or 0), int((fraction or '0').ljust(6, '0')), _get_timezone(zone))
+
+    match = re_rfc_date.fullmatch(date_string)
+    if match:
+        day, month, year, hour, minute, second, zone = match.groups()
+        return datetime.datetime(int(year), MONTHS[month], int(day), int(hour), int(minute), int(second or 0),
+                                 0, _get_timezone(zone))
+    return None
+
+
+def _get_timezone(zone):
+    """
+    Returns the timezone of a UTC offset
+    :param zone: None, Z, GMT, UTC or an offset like +01:00, +0100 or +01
+    :return: A timezone or None if zone is None
+    """
+    if zone is None:
+        return None
+    if zone in ('Z', 'GMT', 'UTC'):
+        return datetime.timezone.utc
+    digits = zone[1:].replace(':', '')
+    offset = datetime.timedelta(hours=int(digits[:2]), minutes=int(digits[2:] or 0))
+    if not offset:
+        return datetime.timezone.utc
+    return datetime.timezone(-offset if zone[0] == '-' else offset)
+
+
+@functools.lru_cache(maxsize=DATEUTIL_CACHE_SIZE)
+def _parse_with_dateutil(date_string, today):
+    """
+    Parses a date string with dateutil, the results are memoized
+    :param date_string:
+    :param today: A date, the current date, from which the fields that the string lacks are taken. It is part of the
+        key of the memoized results, so that they do not outlive the day.
+    :return: A datetime or None if the string could not be parsed
+    """
+    try:
+        return parser.parse(date_string, default=datetime.datetime.combine(today, datetime.time()))
+    except Exception:
+        return None
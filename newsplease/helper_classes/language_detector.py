@@ -0,0 +1,81 @@
+"""
+Helper functions for detecting the language of texts with langdetect. The language profiles are loaded only once per
+process into a seeded detector factory, so that the results are deterministic, and only a capped sample of each text is
+inspected, since langdetect preprocesses the whole text before it cuts it down to its maximum length.
+"""
+import re
+
+from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+from langdetect.lang_detect_exception import LangDetectException
+
+# maximum number of characters of a text that are inspected
+MAX_TEXT_LENGTH = 2000
+# number of evenly spaced windows that the inspected characters of longer texts are sampled from
+NUMBER_OF_SAMPLES = 4
+# minimum probability of a detected language to stop inspecting further texts
+MIN_CONFIDENCE = 0.9
+# seed of langdetect's random sampling of n-grams
+SEED = 0
+
+# to improve performance, regex statements are compiled only once per module
+re_whitespace = re.compile(r'\s+')
+re_leading_partial_word = re.compile(r'^\S*\s+')
+re_trailing_partial_word = re.compile(r'\s+\S*$')
+
+_detector_factory = None
+
+
+def get_detector_factory():
+    """
+    Returns the detector factory of the process, which is created and loads the language profiles on first use
+    :return: A seeded DetectorFactory
+    """
+    global _detector_factory
+    if _detector_factory is None:
+        detector_factory = DetectorFactory()
+        detector_factory.load_profile(PROFILES_DIRECTORY)
+        detector_factory.set_seed(SEED)
+        _detector_factory = detector_factory
+    return _detector_factory
+
+
+def sample_text(text, max_length=MAX_TEXT_LENGTH):
+    """
+    Returns the text if it is not longer than max_length, else NUMBER_OF_SAMPLES evenly spaced windows of the text that
+    are max_length characters long in total. The windows are trimmed to whitespace, so that no words are cut.
+    :param text:
+    :param max_length:
+    :return: A string
+    """
+    if len(text) <= max_length:
+        return text
+    window_length = max_length // NUMBER_OF_SAMPLES
+    step = len(text) // NUMBER_OF_SAMPLES
+    windows = []
+    for start in range(0, step * NUMBER_OF_SAMPLES, step):
+        window = text[start:start + window_length]
+        if start > 0:
+            window = re_leading_partial_word.sub('', window, 1)
+        windows.append(re_trailing_partial_word.sub('', window, 1))
+    return ' '.join(windows)
+
+
+def detect_language(text):
+    """
+    Detects the language of a sample of the text
+    :param text:
+    :return: A tuple of the language code, e.g., en or zh, and its probability, or (None, 0.0) if the language could
+        not be detected
+    """
+    if not text:
+        return None, 0.0
+    detector = get_detector_factory().create()
+    detector.append(re_whitespace.sub(' ', sample_text(text)).strip())
+    try:
+        probabilities = detector.get_probabilities()
+    except LangDetectException:
+        return None, 0.0
+    if not probabilities:
+        return None, 0.0
+    # langdetect distinguishes zh-cn and zh-tw, the extractors only return the language
+    return probabilities[0].lang.split('-')[0], probabilities[0].prob
@@ -1,3 +1,7 @@
+# the fields of an ArticleCandidate that are extracted from the article
+FIELDS = ('title', 'description', 'text', 'topimage', 'author', 'publish_date', 'language')
+
+
 class ArticleCandidate:
     """This is a helpclass to store the result of an article after it was extracted. Every implemented extractor
     returns an ArticleCanditate as result.
@@ -1,22 +1,143 @@
+import contextlib
 import importlib
 import inspect
 import logging
+import re
+import signal
+import threading
+import time
+import types
 
+from .article_candidate import FIELDS
 from .cleaner import Cleaner
 from .comparer.comparer import Comparer
 from .extractors.abstract_extractor import AbstractExtractor
+from .parsed_document import ParsedDocument
+
+# initialized extractors, see get_extractor
+_extractors = {}
+
+# whether it was logged that _time_limit cannot enforce the time budget
+_unenforced_time_limit_logged = False
+
+# the fields that the cascade waits for and the minimum number of words of their values, values that are not strings,
+# e.g., dates, count as one word
+CASCADE_THRESHOLDS = {'title': 1, 'text': 50, 'publish_date': 1, 'language': 1}
+
+# share of the time budget of an article that each extractor still gets after the budget was exceeded, so that cheap
+# extractors, e.g., of the publishing date, still contribute to a partial result
+GRACE_SHARE = 0.1
+
+# to improve performance, regex statements are compiled only once per module
+re_script_or_style = re.compile(r'<(script|style)\b([^>]*)>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+re_script_or_style_bytes = re.compile(rb'<(script|style)\b([^>]*)>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+class ExtractionTimeout(BaseException):
+    """Raised when an extractor exceeds the time budget of an article. It derives from BaseException, so that the broad
+    exception handlers of the extractors do not swallow it."""
+    pass
+
+
+@contextlib.contextmanager
+def _time_limit(seconds):
+    """Raises ExtractionTimeout if the block takes longer than the given seconds. The time limit relies on SIGALRM,
+    which only the main thread receives, hence it is not enforced in other threads or on platforms without SIGALRM,
+    which is logged once. The previous handler of SIGALRM and its timer are restored afterwards, the timer with the
+    time that was left when the block started, or shortly after the block if that time has passed meanwhile.
+
+    :param seconds: A float, the time limit, or None for no time limit
+    """
+    global _unenforced_time_limit_logged
+    if seconds is None:
+        yield
+        return
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        if not _unenforced_time_limit_logged:
+            _unenforced_time_limit_logged = True
+            logging.getLogger(__name__).warning(
+                'The time budget of the extraction is not enforced, since SIGALRM is only available in the main thread '
+                'on Unix')
+        yield
+        return
+
+    def raise_timeout(signum, frame):
+        raise ExtractionTimeout()
+
+    previous_handler = signal.signal(signal.SIGALRM, raise_timeout)
+    previous_delay, previous_interval = signal.setitimer(signal.ITIMER_REAL, seconds)
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if previous_delay > 0:
+            # a timer of 0 would cancel the previous timer instead of firing it
+            remaining_delay = max(previous_delay - (time.perf_counter() - start_time), 1e-6)
+            signal.setitimer(signal.ITIMER_REAL, remaining_delay, previous_interval)
+
+
+def _strip_script_or_style(match):
+    """Empties a <script> or <style> tag unless it is a JSON-LD script, which contains metadata such as the publishing
+    date."""
+    if isinstance(match.group(0), bytes):
+        if b'ld+json' in match.group(2).lower():
+            return match.group(0)
+        return match.expand(rb'<\1\2></\1>')
+    if 'ld+json' in match.group(2).lower():
+        return match.group(0)
+    return match.expand(r'<\1\2></\1>')
+
+
+def get_extractor(extractor_list, cascade=False, timeout=None, max_html_size=None):
+    """
+    Returns an Extractor with the given extractors. Since initializing the extractors, comparers and the cleaner is
+    expensive compared to extracting a single article, there is only one Extractor per process and configuration.
+
+    :param extractor_list: List of strings (or tuples of module and class name) containing all extractors to be
+        initialized.
+    :param cascade: if True, the extractors are run as a cascade, see Extractor
+    :param timeout: time budget per article in seconds, see Extractor
+    :param max_html_size: maximum size of the HTML of an article, see Extractor
+    :return: An Extractor
+    """
+    key = (tuple(extractor_list), cascade, timeout, max_html_size)
+    extractor = _extractors.get(key)
+    if extractor is None:
+        extractor = _extractors[key] = Extractor(extractor_list, cascade, timeout=timeout,
+                                                 max_html_size=max_html_size)
+    return extractor
 
 
 class Extractor:
     """This class initializes all extractors and saves the results of them. When adding a new extractor, it needs to
     be initialized here and added to list_extractor.
+
+    By default, all extractors are run and their results are compared. In cascade mode, the extractors are run in the
+    given order, which should be the order of their cost, until the fields of cascade_thresholds are extracted. An
+    extractor is skipped if none of the fields of cascade_thresholds that it can extract is still missing, and it only
+    contributes the fields that are still missing. Use get_stats() to tune the order.
+
+    Pathological pages, e.g., with huge tables or deeply nested DOMs, can keep the extractors busy for minutes. If a
+    timeout is set, an extractor that exceeds the remaining time budget of the article is interrupted, the remaining
+    extractors only get a share of the budget (GRACE_SHARE) each, and the article is compared from the results of the
+    extractors that completed. The interruption relies on SIGALRM, so the budget is wall-clock time and only enforced
+    in the main thread on Unix. If max_html_size is set, larger HTML is reduced before the extraction by emptying its
+    <script> (except JSON-LD) and <style> tags, and then truncated if it is still too large.
     """
 
-    def __init__(self, extractor_list):
+    def __init__(self, extractor_list, cascade=False, cascade_thresholds=None, timeout=None, max_html_size=None):
         """
         Initializes all the extractors, comparers and the cleaner.
 
         :param extractor_list: List of strings containing all extractors to be initialized.
+        :param cascade: if True, the extractors are run as a cascade
+        :param cascade_thresholds: dict mapping the fields that the cascade waits for to the minimum number of words of
+            their values, defaults to CASCADE_THRESHOLDS
+        :param timeout: time budget per article in seconds, None for no time budget
+        :param max_html_size: maximum number of characters (bytes if the HTML is given as bytes) of the HTML that is
+            passed to the extractors, None for no limit
         """
 
         def proc_instance(instance):
@@ -55,21 +176,170 @@ class Extractor:
         self.cleaner = Cleaner()
         self.comparer = Comparer()
 
-    def extract(self, item):
-        """Runs the HTML-response trough a list of initialized extractors, a cleaner and compares the results.
+        self.cascade = cascade
+        self.cascade_thresholds = CASCADE_THRESHOLDS if cascade_thresholds is None else cascade_thresholds
+        self.timeout = timeout
+        self.max_html_size = max_html_size
+        # the Extractor is shared by the threads of a process, see get_extractor, which update the stats
+        self.__stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resets the stats of the extractors, see get_stats."""
+        with self.__stats_lock:
+            self.stats = {}
+            for extractor in self.extractor_list:
+                self.stats[extractor._name()] = {'runs': 0, 'skips': 0, 'timeouts': 0, 'seconds': 0.0,
+                                                 'hits': {field: 0 for field in extractor.fields}}
+
+    def get_stats(self):
+        """Returns the stats of the extractors, which help to order them by cost and benefit in cascade mode.
 
+        :return: A dict mapping the names of the extractors to dicts with the number of runs, the number of skips (in
+            cascade mode), the number of timeouts, i.e., runs that were interrupted because the time budget
+            of the article was exceeded, the total and mean seconds per run, and the hit rate of each field that the
+            extractor can extract, i.e., the share of runs that returned a value for the field
+        """
+        stats = {}
+        with self.__stats_lock:
+            for name, extractor_stats in self.stats.items():
+                runs = extractor_stats['runs']
+                stats[name] = {
+                    'runs': runs,
+                    'skips': extractor_stats['skips'],
+                    'timeouts': extractor_stats['timeouts'],
+                    'seconds': extractor_stats['seconds'],
+                    'mean_seconds': extractor_stats['seconds'] / runs if runs else 0.0,
+                    'hit_rates': {field: hits / runs if runs else 0.0
+                                  for field, hits in extractor_stats['hits'].items()}
+                }
+        return stats
+
+    @staticmethod
+    def _number_of_words(value):
+        """Returns the number of words of an extracted value, values that are not strings or lists count as one word."""
+        if value is None:
+            return 0
+        if isinstance(value, str):
+            return len(value.split())
+        if isinstance(value, list):
+            return len(value)
+        return 1
+
+    def _cap_html(self, html):
+        """Returns the HTML if it is not larger than max_html_size, else the HTML with emptied <script> (except JSON-LD)
+        and <style> tags, which is truncated if it is still larger than max_html_size.
+
+        :param html: A string or bytes, the HTML
+        :return: A string or bytes, the HTML
+        """
+        if self.max_html_size is None or html is None or len(html) <= self.max_html_size:
+            return html
+        if isinstance(html, bytes):
+            html = re_script_or_style_bytes.sub(_strip_script_or_style, html)
+        else:
+            html = re_script_or_style.sub(_strip_script_or_style, html)
+        return html[:self.max_html_size]
+
+    def _run_extractor(self, extractor, item, deadline=None):
+        """Runs the extractor on the item and updates its stats.
+
+        :param extractor: The extractor to run
         :param item: NewscrawlerItem to be processed.
-        :return: An updated NewscrawlerItem including the results of the extraction
+        :param deadline: A float, the time.perf_counter() value at which the time budget of the article is exceeded, or
+            None for no time budget
+        :return: The ArticleCandidate returned by the extractor, or None if the time budget was exceeded
         """
+        remaining_seconds = None
+        if deadline is not None:
+            remaining_seconds = max(deadline - time.perf_counter(), self.timeout * GRACE_SHARE)
+
+        start_time = time.perf_counter()
+        article_candidate = None
+        timed_out = False
+        try:
+            with _time_limit(remaining_seconds):
+                article_candidate = extractor.extract(item)
+        except ExtractionTimeout:
+            timed_out = True
+            self.log.warning('%s: %s exceeded the time budget of %.1f seconds', item.get('url'), extractor._name(),
+                             remaining_seconds)
+        finally:
+            seconds = time.perf_counter() - start_time
+            with self.__stats_lock:
+                extractor_stats = self.stats[extractor._name()]
+                extractor_stats['runs'] += 1
+                extractor_stats['timeouts'] += timed_out
+                extractor_stats['seconds'] += seconds
+                for field in extractor.fields:
+                    if getattr(article_candidate, field, None):
+                        extractor_stats['hits'][field] += 1
+        return article_candidate
+
+    def _run_cascade(self, item, deadline=None):
+        """Runs the extractors in their order until the fields of cascade_thresholds are extracted.
 
+        :param item: NewscrawlerItem to be processed.
+        :param deadline: see _run_extractor
+        :return: A list of ArticleCandidates, which only contain the fields that were missing when they were extracted
+        """
         article_candidates = []
+        extracted_fields = set()
 
         for extractor in self.extractor_list:
-            article_candidate = extractor.extract(item)
+            missing_fields = [field for field in extractor.fields
+                              if field in self.cascade_thresholds and field not in extracted_fields]
+            if not missing_fields:
+                with self.__stats_lock:
+                    self.stats[extractor._name()]['skips'] += 1
+                continue
+
+            article_candidate = self._run_extractor(extractor, item, deadline)
+            if article_candidate is None:
+                continue
+            for field in FIELDS:
+                if field in extracted_fields:
+                    # only fields that are still missing are taken from later extractors
+                    setattr(article_candidate, field, None)
+                elif self._number_of_words(getattr(article_candidate, field, None)) >= \
+                        self.cascade_thresholds.get(field, 1):
+                    extracted_fields.add(field)
             article_candidates.append(article_candidate)
 
-        article_candidates = self.cleaner.clean(article_candidates)
-        article = self.comparer.compare(item, article_candidates)
+        return article_candidates
+
+    def extract(self, item):
+        """Runs the HTML-response trough a list of initialized extractors, a cleaner and compares the results.
+
+        :param item: NewscrawlerItem to be processed.
+        :return: An updated NewscrawlerItem including the results of the extraction
+        """
+
+        deadline = time.perf_counter() + self.timeout if self.timeout is not None else None
+
+        # the extractors get the capped HTML, the original response is restored afterwards
+        response = item['spider_response']
+        html = self._cap_html(response.body)
+        if html is not response.body:
+            item['spider_response'] = types.SimpleNamespace(body=html)
+
+        try:
+            # the HTML is parsed once and shared by the extractors
+            item['parsed_document'] = ParsedDocument(html)
+            if self.cascade:
+                article_candidates = self._run_cascade(item, deadline)
+            else:
+                article_candidates = [article_candidate for article_candidate in
+                                      (self._run_extractor(extractor, item, deadline)
+                                       for extractor in self.extractor_list)
+                                      if article_candidate is not None]
+
+            article_candidates = self.cleaner.clean(article_candidates)
+            article = self.comparer.compare(item, article_candidates)
+        finally:
+            # free the DOM, which is not needed anymore after the comparer fell back to the page's text, if at all
+            item['parsed_document'] = None
+            item['spider_response'] = response
 
         item['article_title'] = article.title
         item['article_description'] = article.description
@@ -26,6 +26,10 @@ class Cleaner:
         :return: A string, the cleaned string
         """
 
+        if '<' not in arg and '&' not in arg:
+            # there are neither tags nor entities, so parsing would not change anything
+            return arg.strip()
+
         if len(arg) > 0:
             try:
                 raw = html.fromstring(arg)
@@ -92,7 +96,9 @@ class Cleaner:
             article_candidate.text = self.do_cleaning(article_candidate.text)
             article_candidate.topimage = self.do_cleaning(article_candidate.topimage)
             article_candidate.author = self.do_cleaning(article_candidate.author)
-            article_candidate.publish_date = self.do_cleaning(article_candidate.publish_date)
+            # dates are extracted as datetime objects, which do not need to be cleaned
+            if isinstance(article_candidate.publish_date, str):
+                article_candidate.publish_date = self.do_cleaning(article_candidate.publish_date)
 
             results.append(article_candidate)
 
@@ -38,5 +38,5 @@ class Comparer:
         result.topimage = self.comparer_topimage.extract(item, article_candidates)
         result.author = self.comparer_author.extract(item, article_candidates)
         result.publish_date = self.comparer_date.extract(item, article_candidates)
-        result.language = self.comparer_language.extract(item, article_candidates)
+        result.language = self.comparer_language.extract(item, article_candidates, result.text)
         return result
@@ -1,11 +1,17 @@
+from ....helper_classes.language_detector import detect_language
+
+
 class ComparerLanguage:
     """Implements a compare method for detected languages"""
 
-    def extract(self, item, list_article_candidate):
-        """Compares how often any language was detected.
+    def extract(self, item, list_article_candidate, main_text=None):
+        """Compares how often any language was detected. If no extractor detected a language but the langdetect
+        extractor is used, the language of the main text is detected, or the language of the whole page's visible text if
+        there is no main text.
 
         :param item: The corresponding NewscrawlerItem
         :param list_article_candidate: A list, the list of ArticleCandidate-Objects which have been extracted
+        :param main_text: A string, the main text selected by ComparerText
         :return: A string, the language which was most frequently detected
         """
 
@@ -25,6 +31,9 @@ class ComparerLanguage:
                     language_newspaper = article_candidate.language
 
         if not languages_extracted:
+            # the langdetect extractor leaves the detection of the whole text to the comparer
+            if any(article_candidate.extractor == "langdetect" for article_candidate in list_article_candidate):
+                return self.detect_language(item, main_text)
             return None
 
         # Create a set of the extracted languages, so every lang appears once
@@ -48,3 +57,18 @@ class ComparerLanguage:
             return (max(languages_extracted_number))[1]
         else:
             return None
+
+    @staticmethod
+    def detect_language(item, main_text):
+        """Detects the language of the main text or, if there is none, of the whole page's visible text.
+
+        :param item: The corresponding NewscrawlerItem
+        :param main_text: A string, the main text selected by ComparerText
+        :return: A string, the detected language
+        """
+        if not main_text:
+            parsed_document = item.get('parsed_document')
+            if parsed_document is None:
+                return None
+            main_text = parsed_document.visible_text
+        return detect_language(main_text)[0]
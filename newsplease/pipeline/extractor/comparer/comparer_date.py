@@ -6,7 +6,7 @@ class ComparerDate():
 
         :param item: The corresponding NewscrawlerItem
         :param list_article_candidate: A list, the list of ArticleCandidate-Objects which have been extracted
-        :return: A string, the most likely publish date
+        :return: A datetime, the most likely publish date
         """
         list_publish_date = []
 
@@ -16,15 +16,13 @@ class ComparerText():
         # The minimal number of words a text needs to have
         min_number_words = 15
 
-        # The texts of the article candidates and the respective extractors are saved in a tuple in list_text.
+        # The texts of the article candidates, the respective extractors and the sets of the texts' words are saved in a
+        # triple in list_text. Texts that are shorter than min_number_words are left out.
         for article_candidate in article_candidate_list:
             if article_candidate.text != None:
-                list_text.append((article_candidate.text, article_candidate.extractor))
-
-        # Remove texts that are shorter than min_number_words.
-        for text_tuple in list_text:
-            if len(text_tuple[0].split()) < min_number_words:
-                list_text.remove(text_tuple)
+                words = article_candidate.text.split()
+                if len(words) >= min_number_words:
+                    list_text.append((article_candidate.text, article_candidate.extractor, set(words)))
 
         # If there is no value in the list, return None.
         if len(list_text) == 0:
@@ -43,19 +41,21 @@ class ComparerText():
             # Compare every text with all other texts at least once
             for a, b, in itertools.combinations(list_text, 2):
 
-                # Create sets from the texts
-                set_a = set(a[0].split())
-                set_b = set(b[0].split())
-                symmetric_difference_a_b = set_a ^ set_b
-                intersection_a_b = set_a & set_b
-
-                # Replace 0 with -1 in order to elude division by zero
-                if intersection_a_b == 0:
-                    intersection_a_b = -1
+                # The sets of words are created only once per text, the size of their symmetric difference follows from
+                # the size of their intersection
+                set_a = a[2]
+                set_b = b[2]
+                number_of_common_words = len(set_a & set_b)
+                number_of_different_words = len(set_a) + len(set_b) - 2 * number_of_common_words
 
-                # Create the score. It divides the number of words which are not in both texts by the number of words which
-                # are in both texts and subtracts the result from 1. The closer to 1 the more similiar they are.
-                score = 1 - ((len(symmetric_difference_a_b)) / (2 * len(intersection_a_b)))
+                if number_of_common_words == 0:
+                    # Texts without common words are the least similar
+                    score = float('-inf')
+                else:
+                    # Create the score. It divides the number of words which are not in both texts by the number of
+                    # words which are in both texts and subtracts the result from 1. The closer to 1 the more similiar
+                    # they are.
+                    score = 1 - (number_of_different_words / (2 * number_of_common_words))
                 list_score.append((score, a[1], b[1]))
 
             # Find out which is the highest score
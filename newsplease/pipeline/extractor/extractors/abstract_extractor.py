@@ -1,6 +1,7 @@
 from abc import ABCMeta, abstractmethod
 
-from ..article_candidate import ArticleCandidate
+from ..article_candidate import ArticleCandidate, FIELDS
+from ..parsed_document import ParsedDocument
 
 
 class AbstractExtractor:
@@ -9,6 +10,10 @@ class AbstractExtractor:
 
     __metaclass__ = ABCMeta
 
+    # the fields of the ArticleCandidate that the extractor can extract, in cascade mode, the extractor is skipped if
+    # all of them are already extracted
+    fields = FIELDS
+
     @abstractmethod
     def __init__(self):
         self.name = None
@@ -17,6 +22,13 @@ class AbstractExtractor:
         """Returns the name of the article extractor."""
         return self.name
 
+    def _parsed_document(self, item):
+        """Returns the ParsedDocument of the item's HTML, which is shared by all extractors."""
+        parsed_document = item.get('parsed_document')
+        if parsed_document is None:
+            parsed_document = item['parsed_document'] = ParsedDocument(item['spider_response'].body)
+        return parsed_document
+
     def _language(self, item):
         """Returns the language of the extracted article."""
         return None
@@ -1,11 +1,9 @@
 import json
 import re
-from copy import deepcopy
-
-from bs4 import BeautifulSoup
-from dateutil.parser import parse
 
 from .abstract_extractor import AbstractExtractor
+from ..parsed_document import ParsedDocument
+from ....helper_classes.date_parser import parse_date
 
 try:
     import urllib.request as urllib2
@@ -18,12 +16,44 @@ re_pub_date = re.compile(
 )
 re_class = re.compile("pubdate|timestamp|article_date|articledate|date", re.IGNORECASE)
 
+# (attribute, lowercase value) of the meta tags that contain the publishing date, e.g.,
+# <meta name="pubdate" content="2015-11-26T07:11:02Z" >
+DATE_META_KEYS = [
+    ('name', 'pubdate'),
+    ('name', 'publishdate'),
+    ('name', 'timestamp'),
+    ('name', 'dc.date.issued'),
+    ('itemprop', 'dc.date'),
+    ('property', 'article:published_time'),
+    ('name', 'date'),
+    ('property', 'bt:pubdate'),
+    ('name', 'sailthru.date'),
+    ('name', 'article.published'),
+    ('name', 'published-date'),
+    ('name', 'article.created'),
+    ('name', 'article_date_original'),
+    ('name', 'cxenseparse:recs:publishtime'),
+    ('name', 'date_published'),
+    ('itemprop', 'datepublished'),
+    ('itemprop', 'datecreated'),
+    ('itemprop', 'dcterms.date'),
+    ('itemprop', 'dcterms.created'),
+    ('itemprop', 'og:published_time datetime'),
+]
+# meta tags with an image URL, which might contain the date, e.g.,
+# <meta property="og:image" content="http://www.dailytimes.com.pk/digital_images/400/2015-11-26/norway.jpg"/>
+IMAGE_META_KEYS = [('property', 'og:image'), ('itemprop', 'image')]
+# <meta http-equiv="data" content="10:27:15 AM Thursday, November 26, 2015">
+HTTP_EQUIV_DATE_META_KEY = ('http-equiv', 'date')
+
 
 class DateExtractor(AbstractExtractor):
     """This class implements ArticleDateExtractor as an article extractor. ArticleDateExtractor is
     a subclass of ExtractorInterface.
     """
 
+    fields = ('publish_date',)
+
     def __init__(self):
         self.name = "date_extractor"
 
@@ -31,24 +61,23 @@ class DateExtractor(AbstractExtractor):
         """Returns the publish_date of the extracted article."""
 
         url = item['url']
-        html = deepcopy(item['spider_response'].body)
         publish_date = None
 
         try:
-            if html is None:
+            if item['spider_response'].body is None:
                 request = urllib2.Request(url)
                 # Using a browser user agent, decreases the change of sites blocking this request - just a suggestion
                 # request.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko)
                 # Chrome/41.0.2228.0 Safari/537.36')
-                html = urllib2.build_opener().open(request).read()
-
-            html = BeautifulSoup(html, "lxml")
+                document = ParsedDocument(urllib2.build_opener().open(request).read())
+            else:
+                document = self._parsed_document(item)
 
-            publish_date = self._extract_from_json(html)
+            publish_date = self._extract_from_json(document)
             if publish_date is None:
-                publish_date = self._extract_from_meta(html)
+                publish_date = self._extract_from_meta(document)
             if publish_date is None:
-                publish_date = self._extract_from_html_tag(html)
+                publish_date = self._extract_from_html_tag(document)
             if publish_date is None:
                 publish_date = self._extract_from_url(url)
         except Exception as e:
@@ -58,11 +87,15 @@ class DateExtractor(AbstractExtractor):
         return publish_date
 
     def parse_date_str(self, date_string):
-        try:
-            date = parse(date_string)
-            return date.strftime('%Y-%m-%d %H:%M:%S')
-        except:
+        """Parses a date string, the time zone and fractions of seconds are dropped.
+
+        :param date_string: A string
+        :return: A datetime or None if the string could not be parsed
+        """
+        date = parse_date(date_string)
+        if date is None:
             return None
+        return date.replace(tzinfo=None, microsecond=0)
 
     def _extract_from_url(self, url):
         """Try to extract from the article URL - simple but might work as a fallback"""
@@ -73,14 +106,20 @@ class DateExtractor(AbstractExtractor):
             return self.parse_date_str(m.group(0))
         return None
 
-    def _extract_from_json(self, html):
+    def _extract_from_json(self, document):
+        if not document.json_ld_blocks:
+            return None
+        return self.date_from_json_ld(document.json_ld_blocks[0])
+
+    def date_from_json_ld(self, json_ld_block):
+        """Returns the date of a JSON-LD block, dateCreated takes precedence over datePublished.
+
+        :param json_ld_block: A string, the unparsed content of the JSON-LD script tag
+        :return: A datetime or None
+        """
         date = None
         try:
-            script = html.find('script', type='application/ld+json')
-            if script is None:
-                return None
-
-            data = json.loads(script.string)
+            data = json.loads(json_ld_block)
 
             try:
                 date = self.parse_date_str(data['datePublished'])
@@ -96,155 +135,74 @@ class DateExtractor(AbstractExtractor):
 
         return date
 
-    def _extract_from_meta(self, html):
-        date = None
-        for meta in html.findAll("meta"):
-            meta_name = meta.get('name', '').lower()
-            item_prop = meta.get('itemprop', '').lower()
-            http_equiv = meta.get('http-equiv', '').lower()
-            meta_property = meta.get('property', '').lower()
-
-            # <meta name="pubdate" content="2015-11-26T07:11:02Z" >
-            if 'pubdate' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name='publishdate' content='201511261006'/>
-            if 'publishdate' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="timestamp"  data-type="date" content="2015-11-25 22:40:25" />
-            if 'timestamp' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="DC.date.issued" content="2015-11-26">
-            if 'dc.date.issued' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta itemprop="dc.date" content="2015-11-26T11:53:00.000Z" />
-            if 'dc.date' == item_prop:
-                date = meta['content'].strip()
-                break
-
-            # <meta property="article:published_time"  content="2015-11-25" />
-            if 'article:published_time' == meta_property:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="Date" content="2015-11-26" />
-            if 'date' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta property="bt:pubDate" content="2015-11-26T00:10:33+00:00">
-            if 'bt:pubdate' == meta_property:
-                date = meta['content'].strip()
-                break
-                # <meta name="sailthru.date" content="2015-11-25T19:56:04+0000" />
-            if 'sailthru.date' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="article.published" content="2015-11-26T11:53:00.000Z" />
-            if 'article.published' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="published-date" content="2015-11-26T11:53:00.000Z" />
-            if 'published-date' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="article.created" content="2015-11-26T11:53:00.000Z" />
-            if 'article.created' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="article_date_original" content="Thursday, November 26, 2015,  6:42 AM" />
-            if 'article_date_original' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="cXenseParse:recs:publishtime" content="2015-11-26T14:42Z"/>
-            if 'cxenseparse:recs:publishtime' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta name="DATE_PUBLISHED" content="11/24/2015 01:05AM" />
-            if 'date_published' == meta_name:
-                date = meta['content'].strip()
-                break
-
-            # <meta itemprop="datePublished" content="2015-11-26T11:53:00.000Z" />
-            if 'datepublished' == item_prop:
-                date = meta['content'].strip()
-                break
-
-            # <meta itemprop="datePublished" content="2015-11-26T11:53:00.000Z" />
-            if 'datecreated' == item_prop:
-                date = meta['content'].strip()
-                break
-
-            # <meta itemprop="dcterms.date" content="2015-11-26T11:53:00.000Z" />
-            if 'dcterms.date' == item_prop:
-                date = meta['content'].strip()
-                break
-
-            # <meta itemprop="dcterms.created" content="2015-11-26T11:53:00.000Z" />
-            if 'dcterms.created' == item_prop:
-                date = meta['content'].strip()
-                break
-
-            # <meta itemprop="dcterms.created" content="2015-11-26T11:53:00.000Z" />
-            if 'og:published_time datetime' == item_prop:
-                date = meta['content'].strip()
-                break
+    def _extract_from_meta(self, document):
+        """Returns the date of the first meta tag that contains a date, see DATE_META_KEYS. Meta tags with an image URL
+        that contains a date (see IMAGE_META_KEYS) and the meta tag <meta http-equiv="date" ...> are also considered.
+        Instead of checking each meta tag against all keys, the tags are looked up in the document's meta_index."""
+        meta_index = document.meta_index
+        date_positions = [meta_index[key][0] for key in DATE_META_KEYS if key in meta_index]
+        date_position = min(date_positions) if date_positions else len(document.meta_tags)
+        http_equiv_position = meta_index[HTTP_EQUIV_DATE_META_KEY][0] if HTTP_EQUIV_DATE_META_KEY in meta_index \
+            else len(document.meta_tags)
+
+        # a tag with an image URL only counts if it precedes the tag with the date, or if it is the same tag and the
+        # date is given by http-equiv, which is checked last
+        image_positions = sorted(position for key in IMAGE_META_KEYS for position in meta_index.get(key, []))
+        for position in image_positions:
+            if position > min(date_position, http_equiv_position) \
+                    or position == date_position:
+                break
+            url = document.meta_tags[position]['content'].strip()
+            possible_date = self._extract_from_url(url)
+            if possible_date is not None:
+                return possible_date
+
+        position = min(date_position, http_equiv_position)
+        if position < len(document.meta_tags):
+            return self.parse_date_str(document.meta_tags[position]['content'].strip())
 
-            # <meta property="og:image" content="http://www.dailytimes.com.pk/digital
-            # _images/400/2015-11-26/norway-return-number-of-asylum-seekers-to-pakistan-1448538771-7363.jpg"/>
-            if 'og:image' == meta_property or "image" == item_prop:
-                url = meta['content'].strip()
-                possible_date = self._extract_from_url(url)
-                if possible_date is not None:
-                    return self.parse_date_str(possible_date)
-
-            # <meta http-equiv="data" content="10:27:15 AM Thursday, November 26, 2015">
-            if 'date' == http_equiv:
-                date = meta['content'].strip()
-                break
-
-        if date is not None:
-            return self.parse_date_str(date)
+        return None
 
+    @staticmethod
+    def _string(element):
+        """Returns the text of the element if it is the element's only content (also if it is nested in a single child
+        element), else None."""
+        if len(element) == 0:
+            return element.text
+        if len(element) == 1 and not element.text and not element[0].tail:
+            return DateExtractor._string(element[0])
         return None
 
-    def _extract_from_html_tag(self, html):
+    def _extract_from_html_tag(self, document):
+        if document.tree is None:
+            return None
+
         # <time>
-        for time in html.findAll("time"):
+        for time in document.tree.iter('time'):
             datetime = time.get('datetime', '')
             if len(datetime) > 0:
                 return self.parse_date_str(datetime)
 
-            datetime = time.get('class', '')
+            datetime = time.get('class', '').split()
             if len(datetime) > 0 and datetime[0].lower() == "timestamp":
-                return self.parse_date_str(time.string)
+                return self.parse_date_str(self._string(time))
 
-        tag = html.find("span", {"itemprop": "datePublished"})
-        if tag is not None:
-            date_string = tag.get("content")
-            if date_string is None:
-                date_string = tag.text
-            if date_string is not None:
-                return self.parse_date_str(date_string)
+        for tag in document.tree.iter('span'):
+            if tag.get('itemprop') == 'datePublished':
+                date_string = tag.get("content")
+                if date_string is None:
+                    date_string = tag.text_content()
+                if date_string is not None:
+                    return self.parse_date_str(date_string)
+                break
 
         # class=
-        for tag in html.find_all(['span', 'p', 'div'], class_=re_class):
-            date_string = tag.string
+        for tag in document.tree.iter('span', 'p', 'div'):
+            if not re_class.search(tag.get('class', '')):
+                continue
+            date_string = self._string(tag)
             if date_string is None:
-                date_string = tag.text
+                date_string = tag.text_content()
 
             date = self.parse_date_str(date_string)
 
@@ -1,32 +1,35 @@
 import locale
 import re
 
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
-from lxml import html
-
 from .abstract_extractor import AbstractExtractor
+from ....helper_classes.language_detector import detect_language, MIN_CONFIDENCE
+
+# maximum number of <article> elements that are inspected with langdetect
+MAX_ARTICLES = 3
 
 
 class LangExtractor(AbstractExtractor):
     """This class implements LangDetect as an article extractor but it can only
     detect the extracted language (en, de, ...).
 
+    The language of the whole page is not detected here, but by ComparerLanguage, which inspects the main text that
+    was selected by ComparerText instead.
     """
 
+    fields = ('language',)
+
     def __init__(self):
         self.name = "langdetect"
         self.langcode_pattern = re.compile(r'\b[a-zA-Z]{2}(?=([-_]|\b))')
 
     def _language(self, item):
-        """Returns the language of the extracted article by analyzing metatags and inspecting the visible text
-        with langdetect"""
+        """Returns the language of the extracted article by analyzing metatags and inspecting the text of <article>
+        elements with langdetect"""
 
-        response = item['spider_response'].body
-        try:
-            root = html.fromstring(response)
-        except ValueError:
-            root = html.fromstring(response.encode("utf-8"))
+        document = self._parsed_document(item)
+        root = document.tree
+        if root is None:
+            return None
 
         # Check for lang-attributes
         lang = root.get('lang')
@@ -36,36 +39,27 @@ class LangExtractor(AbstractExtractor):
 
         # Check for general meta tags
         if lang is None:
-            meta = root.cssselect('meta[name="language"]')
+            meta = [tag for tag in document.meta_tags if tag.get('name') == 'language']
             if len(meta) > 0:
                 lang = meta[0].get('content')
 
         # Check for open graph tags
         if lang is None:
-            meta = root.cssselect('meta[property="og:locale"]')
+            meta = [tag for tag in document.meta_tags if tag.get('property') == 'og:locale']
             if len(meta) > 0:
                 lang = meta[0].get('content')
 
-        # Look for <article> elements and inspect the one with the largest payload with langdetect
-        if lang is None:
-            article_list = []
-            for article in root.xpath('//article'):
-                article_list.append(re.sub(r'\s+', ' ', article.text_content().strip()))
-                longest_articles = sorted(article_list, key=lambda article: len(article), reverse=True)
-                for article in longest_articles:
-                    try:
-                        lang = detect(article)
-                    except LangDetectException:
-                        continue
-                    else:
-                        break
-
-        # Analyze the whole body with langdetect
+        # Look for <article> elements and inspect the ones with the largest payload with langdetect. The first language
+        # that is detected with high confidence is used, else the most probable one
         if lang is None:
-            try:
-                lang = detect(root.text_content().strip())
-            except LangDetectException:
-                pass
+            articles = sorted((article.text_content() for article in root.iter('article')), key=len, reverse=True)
+            best_probability = 0.0
+            for article in articles[:MAX_ARTICLES]:
+                detected_lang, probability = detect_language(article)
+                if probability > best_probability:
+                    lang, best_probability = detected_lang, probability
+                if probability >= MIN_CONFIDENCE:
+                    break
 
         # Try to normalize output
         if lang is not None:
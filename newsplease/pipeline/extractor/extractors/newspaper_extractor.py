@@ -40,11 +40,8 @@ class NewspaperExtractor(AbstractExtractor):
         article_candidate.topimage = article.top_image
         article_candidate.author = article.authors
         if article.publish_date:
-            try:
-                article_candidate.publish_date = article.publish_date.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError as exception:
-                self.log.debug('%s: Newspaper failed to extract the date in the supported format,'
-                              'Publishing date set to None' % item['url'])
+            # like the date_extractor, drop the time zone and fractions of seconds
+            article_candidate.publish_date = article.publish_date.replace(tzinfo=None, microsecond=0)
         article_candidate.language = article.meta_lang
 
         return article_candidate
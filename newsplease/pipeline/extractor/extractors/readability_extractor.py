@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 from readability import Document
 
 from .abstract_extractor import AbstractExtractor
@@ -12,6 +10,8 @@ class ReadabilityExtractor(AbstractExtractor):
 
     """
 
+    fields = ('title', 'description', 'text')
+
     def __init__(self):
         self.name = "readability"
 
@@ -22,7 +22,8 @@ class ReadabilityExtractor(AbstractExtractor):
         :return: ArticleCandidate containing the recovered article data.
         """
 
-        doc = Document(deepcopy(item['spider_response'].body))
+        # readability modifies the DOM while extracting, hence it parses the HTML itself
+        doc = Document(item['spider_response'].body)
         description = doc.summary()
 
         article_candidate = ArticleCandidate()
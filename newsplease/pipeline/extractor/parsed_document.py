@@ -0,0 +1,79 @@
+from lxml import html
+
+
+class ParsedDocument:
+    """Parses the HTML of an article once and provides views on it that are computed lazily, i.e., on first access, so
+    that the extractors do not need to parse the same HTML again. The views must not be modified.
+    """
+
+    def __init__(self, html_string):
+        """
+        :param html_string: A string, the HTML of the article
+        """
+        self.html = html_string
+        self.__tree = None
+        self.__is_parsed = False
+        self.__meta_tags = None
+        self.__meta_index = None
+        self.__json_ld_blocks = None
+        self.__visible_text = None
+
+    @property
+    def tree(self):
+        """The lxml tree of the HTML or None if it could not be parsed."""
+        if not self.__is_parsed:
+            self.__is_parsed = True
+            if self.html:
+                try:
+                    try:
+                        self.__tree = html.fromstring(self.html)
+                    except ValueError:
+                        # strings with an encoding declaration must be passed as bytes
+                        self.__tree = html.fromstring(self.html.encode("utf-8"))
+                except Exception:
+                    self.__tree = None
+        return self.__tree
+
+    @property
+    def meta_tags(self):
+        """A list of the attributes of all meta tags in document order, each as a dict with lowercase keys."""
+        if self.__meta_tags is None:
+            self.__meta_tags = []
+            self.__meta_index = {}
+            if self.tree is not None:
+                for position, meta in enumerate(self.tree.iter('meta')):
+                    attributes = {key.lower(): value for key, value in meta.attrib.items()}
+                    self.__meta_tags.append(attributes)
+                    for key, value in attributes.items():
+                        if key != 'content':
+                            self.__meta_index.setdefault((key, value.lower()), []).append(position)
+        return self.__meta_tags
+
+    @property
+    def meta_index(self):
+        """A dict mapping each (attribute, lowercase value) pair of the meta tags, e.g., ('name', 'pubdate'), to the
+        positions of the tags with that pair in meta_tags, in ascending order."""
+        if self.__meta_index is None:
+            self.meta_tags
+        return self.__meta_index
+
+    @property
+    def json_ld_blocks(self):
+        """A list of the (unparsed) contents of all JSON-LD script tags in document order."""
+        if self.__json_ld_blocks is None:
+            self.__json_ld_blocks = []
+            if self.tree is not None:
+                for script in self.tree.iter('script'):
+                    if script.get('type', '').strip().lower() == 'application/ld+json':
+                        self.__json_ld_blocks.append(script.text or '')
+        return self.__json_ld_blocks
+
+    @property
+    def visible_text(self):
+        """The text of the document without the contents of script and style tags."""
+        if self.__visible_text is None:
+            self.__visible_text = ''
+            if self.tree is not None:
+                self.__visible_text = ''.join(
+                    self.tree.xpath('//text()[not(ancestor::script) and not(ancestor::style)]')).strip()
+        return self.__visible_text
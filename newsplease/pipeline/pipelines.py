@@ -3,42 +3,46 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: http://doc.scrapy.org/en/latest/topics/item-pipeline.html
 import datetime
+import hashlib
 import json
 import logging
-import lzma
 import os.path
 import sys
+import time
 import warnings
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from configparser import RawConfigParser
 from enum import Enum
 from itertools import islice, chain
-from typing import Optional, Dict, Any, Set, Tuple
+from typing import Optional, Dict, Any, List, Set, Tuple
 from typing_extensions import TypedDict, cast
 
 import scrapy
 
 import pymysql
 import psycopg2
-from dateutil import parser as dateparser
-from elasticsearch import Elasticsearch
+import psycopg2.extras
+from elasticsearch import Elasticsearch, helpers
 from scrapy.exceptions import DropItem
 
 from redis import StrictRedis
+from redis.client import Pipeline
 
 from NewsArticle import NewsArticle
 from .extractor import article_extractor
 from ..config import CrawlerConfig
+from ..helper_classes.compression import Compressor
+from ..helper_classes.date_parser import parse_date
 
 if sys.version_info[0] < 3:
     ConnectionError = OSError
 
 try:
-    import numpy as np
-    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 except ImportError:
-    np = None
-    pd = None
+    pa = None
+    pq = None
 
 
 class HTMLCodeHandling(object):
@@ -68,12 +72,22 @@ class ArticleMasterExtractor(object):
         self.cfg = CrawlerConfig.get_instance()
         self.extractor_list = self.cfg.section("ArticleMasterExtractor")[
             "extractors"]
+        self.cascade = self.cfg.section("ArticleMasterExtractor").get("cascade", False)
+        self.timeout = self.cfg.section("ArticleMasterExtractor").get("timeout", None)
+        self.max_html_size = self.cfg.section("ArticleMasterExtractor").get("max_html_size", None)
 
-        self.extractor = article_extractor.Extractor(self.extractor_list)
+        self.extractor = article_extractor.Extractor(self.extractor_list, self.cascade, timeout=self.timeout,
+                                                     max_html_size=self.max_html_size)
 
     def process_item(self, item, spider):
         return self.extractor.extract(item)
 
+    def close_spider(self, spider):
+        for name, stats in self.extractor.get_stats().items():
+            self.log.info("Extractor %s: %i runs, %i skips, %i timeouts, %.1f ms per run, hit rates: %s", name,
+                          stats['runs'], stats['skips'], stats['timeouts'], stats['mean_seconds'] * 1000,
+                          ', '.join('%s %.2f' % (field, rate) for field, rate in stats['hit_rates'].items()))
+
 
 class RSSCrawlCompare(object):
     """
@@ -137,7 +151,8 @@ class RSSCrawlCompare(object):
 
 class MySQLStorage(object):
     """
-    Handles remote storage of the meta data in the DB
+    Handles remote storage of the meta data in the DB. The items are buffered and written in batches of batch_size
+    items, each in a single transaction.
     """
 
     log = None
@@ -145,8 +160,18 @@ class MySQLStorage(object):
     database = None
     conn = None
     cursor = None
+    # number of items that are written at once, 1 writes every item immediately
+    batch_size = 1
+    # maximum time in milliseconds that an item is buffered, checked when the next item arrives
+    batch_timeout = 1000
+    # current versions of the buffered items and their urls
+    buffer = None
+    buffered_urls = None
+    # time.monotonic() when the first item of the buffer arrived
+    buffer_start = None
     # initialize necessary DB queries for this pipe
-    compare_versions = ("SELECT * FROM CurrentVersions WHERE url=%s")
+    compare_versions = ("SELECT * FROM CurrentVersions WHERE url IN (%s)")
+    select_ids = ("SELECT id, url FROM CurrentVersions WHERE url IN (%s)")
     insert_current = ("INSERT INTO CurrentVersions(local_path,\
                           modified_date,download_date,source_domain,url,\
                           html_title, ancestor, descendant, version,\
@@ -165,7 +190,7 @@ class MySQLStorage(object):
                           %(ancestor)s, %(descendant)s, %(version)s,\
                           %(rss_title)s)")
 
-    delete_from_current = ("DELETE FROM CurrentVersions WHERE id = %s")
+    delete_from_current = ("DELETE FROM CurrentVersions WHERE id IN (%s)")
 
     # init database connection
     def __init__(self):
@@ -173,6 +198,10 @@ class MySQLStorage(object):
 
         self.cfg = CrawlerConfig.get_instance()
         self.database = self.cfg.section("MySQL")
+        self.batch_size = max(1, self.database.get("batch_size", 1))
+        self.batch_timeout = self.database.get("batch_timeout", 1000)
+        self.buffer = []
+        self.buffered_urls = set()
         # Establish DB connection
         # Closing of the connection is handled once the spider closes
         self.conn = pymysql.connect(host=self.database["host"],
@@ -184,95 +213,116 @@ class MySQLStorage(object):
 
     def process_item(self, item, spider):
         """
-        Store item data in DB.
-        First determine if a version of the article already exists,
-          if so then 'migrate' the older version to the archive table.
-        Second store the new article in the current version table
+        Buffers the item data and stores the buffer in the DB once it contains batch_size items or its first item is
+        older than batch_timeout, see _flush.
         """
+        if item['url'] in self.buffered_urls:
+            # the buffered version is the old version of this one, so it has to be stored first
+            self._flush()
 
-        # Set defaults
-        version = 1
-        ancestor = 0
-
-        # Search the CurrentVersion table for an old version of the article
-        try:
-            self.cursor.execute(self.compare_versions, (item['url'],))
-        except (pymysql.err.OperationalError, pymysql.ProgrammingError, pymysql.InternalError,
-                pymysql.IntegrityError, TypeError) as error:
-            self.log.error("Something went wrong in query: %s", error)
-
-        # Save the result of the query. Must be done before the add,
-        # otherwise the result will be overwritten in the buffer
-        old_version = self.cursor.fetchone()
-
-        if old_version is not None:
-            old_version_list = {
-                'db_id': old_version[0],
-                'local_path': old_version[1],
-                'modified_date': old_version[2],
-                'download_date': old_version[3],
-                'source_domain': old_version[4],
-                'url': old_version[5],
-                'html_title': old_version[6],
-                'ancestor': old_version[7],
-                'descendant': old_version[8],
-                'version': old_version[9],
-                'rss_title': old_version[10], }
-
-            # Update the version number and the ancestor variable for later references
-            version = (old_version[9] + 1)
-            ancestor = old_version[0]
-
-        # Add the new version of the article to the CurrentVersion table
-        current_version_list = {
+        # The version and the ancestor are set once the old version is known
+        self.buffer.append({
             'local_path': item['local_path'],
             'modified_date': item['modified_date'],
             'download_date': item['download_date'],
             'source_domain': item['source_domain'],
             'url': item['url'],
             'html_title': item['html_title'],
-            'ancestor': ancestor,
+            'ancestor': 0,
             'descendant': 0,
-            'version': version,
-            'rss_title': item['rss_title'], }
+            'version': 1,
+            'rss_title': item['rss_title'], })
+        self.buffered_urls.add(item['url'])
+        if len(self.buffer) == 1:
+            self.buffer_start = time.monotonic()
+
+        if len(self.buffer) >= self.batch_size \
+                or (time.monotonic() - self.buffer_start) * 1000 >= self.batch_timeout:
+            self._flush()
+        return item
+
+    def _flush(self):
+        """
+        Store the buffered item data in DB in a single transaction, see _store. If the transaction fails, e.g., since
+        a single item cannot be stored, the items are stored one by one, so that only the failing items are lost.
+        """
+        current_versions = self.buffer
+        self.buffer = []
+        self.buffered_urls = set()
+        if not self._store(current_versions) and len(current_versions) > 1:
+            self.log.info("Storing the %i articles of the failed batch one by one.", len(current_versions))
+            for current_version in current_versions:
+                self._store([current_version])
+
+    def _store(self, current_versions):
+        """
+        Store the item data in DB in a single transaction.
+        First determine which versions of the articles already exist,
+          then 'migrate' these older versions to the archive table.
+        Second store the new articles in the current version table
+        :param current_versions: A list of dicts, the item data
+        :return: False if the transaction failed and was rolled back, else True
+        """
+        if not current_versions:
+            return True
 
+        urls = [current_version['url'] for current_version in current_versions]
         try:
-            self.cursor.execute(self.insert_current, current_version_list)
+            # Search the CurrentVersion table for the old versions of the articles
+            self.cursor.execute(self.compare_versions % ', '.join(['%s'] * len(urls)), urls)
+            old_versions = {}
+            for old_version in self.cursor.fetchall():
+                old_versions.setdefault(old_version[5], old_version)
+
+            # Update the version numbers and the ancestors for later references
+            for current_version in current_versions:
+                old_version = old_versions.get(current_version['url'])
+                current_version['version'] = 1 if old_version is None else old_version[9] + 1
+                current_version['ancestor'] = 0 if old_version is None else old_version[0]
+
+            # Delete the old versions of the articles from the CurrentVersion table
+            if old_versions:
+                self.cursor.execute(self.delete_from_current % ', '.join(['%s'] * len(old_versions)),
+                                    [old_version[0] for old_version in old_versions.values()])
+
+            # Add the new versions of the articles to the CurrentVersion table
+            self.cursor.executemany(self.insert_current, current_versions)
+
+            # Move the old versions to the ArchiveVersions table, their descendants are the ids of the new versions
+            if old_versions:
+                self.cursor.execute(self.select_ids % ', '.join(['%s'] * len(old_versions)), list(old_versions))
+                descendants = {}
+                for db_id, url in self.cursor.fetchall():
+                    descendants[url] = max(db_id, descendants.get(url, 0))
+                self.cursor.executemany(self.insert_archive, [{
+                    'db_id': old_version[0],
+                    'local_path': old_version[1],
+                    'modified_date': old_version[2],
+                    'download_date': old_version[3],
+                    'source_domain': old_version[4],
+                    'url': old_version[5],
+                    'html_title': old_version[6],
+                    'ancestor': old_version[7],
+                    'descendant': descendants.get(url, 0),
+                    'version': old_version[9],
+                    'rss_title': old_version[10], } for url, old_version in old_versions.items()])
+
             self.conn.commit()
-            self.log.info("Article inserted into the database.")
+            self.log.info("%i articles inserted into the database, %i old versions moved to the archive.",
+                          len(current_versions), len(old_versions))
+            return True
         except (pymysql.err.OperationalError, pymysql.ProgrammingError, pymysql.InternalError,
-                pymysql.IntegrityError, TypeError) as error:
+                pymysql.IntegrityError, pymysql.err.DataError, TypeError) as error:
             self.log.error("Something went wrong in commit: %s", error)
-
-        # Move the old version from the CurrentVersion table to the ArchiveVersions table
-        if old_version is not None:
-            # Set descendant attribute
-            try:
-                old_version_list['descendant'] = self.cursor.lastrowid
-            except (pymysql.err.OperationalError, pymysql.ProgrammingError, pymysql.InternalError,
-                    pymysql.IntegrityError, TypeError) as error:
-                self.log.error("Something went wrong in id query: %s", error)
-
-            # Delete the old version of the article from the CurrentVersion table
-            try:
-                self.cursor.execute(self.delete_from_current, old_version_list['db_id'])
-                self.conn.commit()
-            except (pymysql.err.OperationalError, pymysql.ProgrammingError, pymysql.InternalError,
-                    pymysql.IntegrityError, TypeError) as error:
-                self.log.error("Something went wrong in delete: %s", error)
-
-            # Add the old version to the ArchiveVersion table
             try:
-                self.cursor.execute(self.insert_archive, old_version_list)
-                self.conn.commit()
-                self.log.info("Moved old version of an article to the archive.")
-            except (pymysql.err.OperationalError, pymysql.ProgrammingError, pymysql.InternalError,
-                    pymysql.IntegrityError, TypeError) as error:
-                self.log.error("Something went wrong in archive: %s", error)
-
-        return item
+                self.conn.rollback()
+            except pymysql.Error as error:
+                self.log.error("Something went wrong in rollback: %s", error)
+            return False
 
     def close_spider(self, spider):
+        # Store the remaining items
+        self._flush()
         # Close DB connection - garbage collection
         self.conn.close()
 
@@ -331,8 +381,11 @@ class ExtractedInformationStorage(object):
 
     @staticmethod
     def datestring_to_date(text):
-        if text:
-            return dateparser.parse(text)
+        if isinstance(text, datetime.datetime):
+            # the publishing date is already extracted as a datetime
+            return text
+        elif text:
+            return parse_date(text)
         else:
             return None
 
@@ -358,7 +411,8 @@ class ExtractedInformationStorage(object):
 
 class PostgresqlStorage(ExtractedInformationStorage):
     """
-    Handles remote storage of the meta data in the DB
+    Handles remote storage of the meta data in the DB. The items are buffered and written in batches of batch_size
+    items, each by a single statement, see upsert_versions, or by plain statements if the batch has a single item.
     """
 
     log = None
@@ -366,7 +420,76 @@ class PostgresqlStorage(ExtractedInformationStorage):
     database = None
     conn = None
     cursor = None
+    # number of items that are written at once, 1 writes every item immediately
+    batch_size = 1
+    # maximum time in milliseconds that an item is buffered, checked when the next item arrives
+    batch_timeout = 1000
+    # current versions of the buffered items and their urls
+    buffer = None
+    buffered_urls = None
+    # time.monotonic() when the first item of the buffer arrived
+    buffer_start = None
     # initialize necessary DB queries for this pipe
+    # Inserts the new versions of the articles into the CurrentVersions table. If a version of an article already
+    # exists (ON CONFLICT on the unique url), it is replaced in place by the new version, which gets a new id, and it
+    # is moved to the ArchiveVersions table with the new id as its descendant. The VALUES are filled in by
+    # execute_values, all sub-statements see the tables as they were before the statement.
+    upsert_versions = ("WITH new_versions(date_modify,date_download, \
+                            localpath,filename,source_domain, \
+                            url,image_url,title,title_page, \
+                            title_rss,maintext,description, \
+                            date_publish,authors,language) AS (VALUES %s), \
+                        old_versions AS ( \
+                            SELECT CurrentVersions.* FROM CurrentVersions \
+                            JOIN new_versions USING (url)), \
+                        current_versions AS ( \
+                            INSERT INTO CurrentVersions(date_modify,date_download, \
+                                localpath,filename,source_domain, \
+                                url,image_url,title,title_page, \
+                                title_rss,maintext,description, \
+                                date_publish,authors,language, \
+                                ancestor,descendant,version) \
+                            SELECT new_versions.date_modify,new_versions.date_download, \
+                                new_versions.localpath,new_versions.filename,new_versions.source_domain, \
+                                new_versions.url,new_versions.image_url,new_versions.title,new_versions.title_page, \
+                                new_versions.title_rss,new_versions.maintext,new_versions.description, \
+                                new_versions.date_publish,new_versions.authors,new_versions.language, \
+                                COALESCE(old_versions.id, 0),0,COALESCE(old_versions.version + 1, 1) \
+                            FROM new_versions LEFT JOIN old_versions USING (url) \
+                            ON CONFLICT (url) DO UPDATE SET \
+                                id = nextval(pg_get_serial_sequence('CurrentVersions', 'id')), \
+                                date_modify = EXCLUDED.date_modify,date_download = EXCLUDED.date_download, \
+                                localpath = EXCLUDED.localpath,filename = EXCLUDED.filename, \
+                                source_domain = EXCLUDED.source_domain,image_url = EXCLUDED.image_url, \
+                                title = EXCLUDED.title,title_page = EXCLUDED.title_page, \
+                                title_rss = EXCLUDED.title_rss,maintext = EXCLUDED.maintext, \
+                                description = EXCLUDED.description,date_publish = EXCLUDED.date_publish, \
+                                authors = EXCLUDED.authors,language = EXCLUDED.language, \
+                                ancestor = EXCLUDED.ancestor,descendant = EXCLUDED.descendant, \
+                                version = EXCLUDED.version \
+                            RETURNING id, url) \
+                        INSERT INTO ArchiveVersions(id,date_modify,date_download,\
+                            localpath,filename,source_domain, \
+                            url,image_url,title,title_page, \
+                            title_rss,maintext,description, \
+                            date_publish,authors,language, \
+                            ancestor,descendant,version) \
+                        SELECT old_versions.id,old_versions.date_modify,old_versions.date_download, \
+                            old_versions.localpath,old_versions.filename,old_versions.source_domain, \
+                            old_versions.url,old_versions.image_url,old_versions.title,old_versions.title_page, \
+                            old_versions.title_rss,old_versions.maintext,old_versions.description, \
+                            old_versions.date_publish,old_versions.authors,old_versions.language, \
+                            old_versions.ancestor,current_versions.id,old_versions.version \
+                        FROM old_versions JOIN current_versions USING (url)")
+
+    # the values of a new version, the casts are needed since the types of the VALUES are not inferred from the table
+    upsert_versions_template = ("(%(date_modify)s::timestamp,%(date_download)s::timestamp, \
+                                    %(localpath)s,%(filename)s,%(source_domain)s, \
+                                    %(url)s,%(image_url)s,%(title)s,%(title_page)s, \
+                                    %(title_rss)s,%(maintext)s,%(description)s, \
+                                    %(date_publish)s::timestamp,%(authors)s::varchar[],%(language)s)")
+
+    # a batch of a single item is written by plain statements, which are faster than planning upsert_versions
     compare_versions = ("SELECT * FROM CurrentVersions WHERE url=%s")
     insert_current = ("INSERT INTO CurrentVersions(date_modify,date_download, \
                         localpath,filename,source_domain, \
@@ -395,7 +518,6 @@ class PostgresqlStorage(ExtractedInformationStorage):
                             %(date_publish)s,%(authors)s,%(language)s, \
                             %(ancestor)s,%(descendant)s,%(version)s)")
 
-
     delete_from_current = ("DELETE FROM CurrentVersions WHERE id = %s")
 
     # init database connection
@@ -404,6 +526,10 @@ class PostgresqlStorage(ExtractedInformationStorage):
         self.log = logging.getLogger(__name__)
         self.cfg = CrawlerConfig.get_instance()
         self.database = self.cfg.section("Postgresql")
+        self.batch_size = max(1, self.database.get("batch_size", 1))
+        self.batch_timeout = self.database.get("batch_timeout", 1000)
+        self.buffer = []
+        self.buffered_urls = set()
         options = f"-c search_path={self.database.get('schema')}" if self.database.get('schema') else ''
         # Establish DB connection
         # Closing of the connection is handled once the spider closes
@@ -417,91 +543,116 @@ class PostgresqlStorage(ExtractedInformationStorage):
 
     def process_item(self, item, spider):
         """
-        Store item data in DB.
-        First determine if a version of the article already exists,
-          if so then 'migrate' the older version to the archive table.
-        Second store the new article in the current version table
+        Buffers the item data and stores the buffer in the DB once it contains batch_size items or its first item is
+        older than batch_timeout, see _flush.
         """
+        if item['url'] in self.buffered_urls:
+            # the buffered version is the old version of this one, so it has to be stored first
+            self._flush()
+
+        self.buffer.append(ExtractedInformationStorage.extract_relevant_info(item))
+        self.buffered_urls.add(item['url'])
+        if len(self.buffer) == 1:
+            self.buffer_start = time.monotonic()
+
+        if len(self.buffer) >= self.batch_size \
+                or (time.monotonic() - self.buffer_start) * 1000 >= self.batch_timeout:
+            self._flush()
+        return item
 
-        # Set defaults
-        version = 1
-        ancestor = 0
-
-        # Search the CurrentVersion table for an old version of the article
-        try:
-            self.cursor.execute(self.compare_versions, (item['url'],))
-        except psycopg2.DatabaseError as error:
-            self.log.error("Something went wrong in query: %s", error)
-
-        # Save the result of the query. Must be done before the add,
-        # otherwise the result will be overwritten in the buffer
-        old_version = self.cursor.fetchone()
-
-        if old_version is not None:
-            old_version_list = {
-                'db_id': old_version[0],
-                'date_modify': old_version[1],
-                'date_download': old_version[2],
-                'localpath': old_version[3],
-                'filename': old_version[4],
-                'source_domain': old_version[5],
-                'url': old_version[6],
-                'image_url': old_version[7],
-                'title': old_version[8],
-                'title_page': old_version[9],
-                'title_rss': old_version[10],
-                'maintext': old_version[11],
-                'description': old_version[12],
-                'date_publish': old_version[13],
-                'authors': old_version[14],
-                'language': old_version[15],
-                'ancestor': old_version[16],
-                'descendant': old_version[17],
-                'version': old_version[18] }
-
-            # Update the version number and the ancestor variable for later references
-            version = (old_version[18] + 1)
-            ancestor = old_version[0]
-
-        # Add the new version of the article to the CurrentVersion table
-        current_version_list = ExtractedInformationStorage.extract_relevant_info(item)
-        current_version_list['ancestor'] = ancestor
-        current_version_list['descendant'] = 0
-        current_version_list['version'] = version
+    def _flush(self):
+        """
+        Store the buffered item data in DB in a single transaction, see _store. If the transaction fails, e.g., since
+        a single item cannot be stored, the items are stored one by one, so that only the failing items are lost.
+        """
+        current_versions = self.buffer
+        self.buffer = []
+        self.buffered_urls = set()
+        if not self._store(current_versions) and len(current_versions) > 1:
+            self.log.info("Storing the %i articles of the failed batch one by one.", len(current_versions))
+            for current_version in current_versions:
+                self._store([current_version])
+
+    def _store(self, current_versions):
+        """
+        Store the item data in DB in a single transaction.
+        The new versions of the articles are inserted into the current version table and the older versions, if any,
+          are 'migrated' to the archive table by a single statement.
+        :param current_versions: A list of dicts, the item data
+        :return: False if the transaction failed and was rolled back, else True
+        """
+        if not current_versions:
+            return True
 
         try:
-            self.cursor.execute(self.insert_current, current_version_list)
+            if len(current_versions) == 1:
+                archived = self._store_single(current_versions[0])
+            else:
+                psycopg2.extras.execute_values(self.cursor, self.upsert_versions, current_versions,
+                                               template=self.upsert_versions_template,
+                                               page_size=len(current_versions))
+                archived = self.cursor.rowcount
             self.conn.commit()
-            self.log.info("Article inserted into the database.")
+            self.log.info("%i articles inserted into the database, %i old versions moved to the archive.",
+                          len(current_versions), archived)
+            return True
         except psycopg2.DatabaseError as error:
             self.log.error("Something went wrong in commit: %s", error)
+            self.conn.rollback()
+            return False
 
-        # Move the old version from the CurrentVersion table to the ArchiveVersions table
-        if old_version is not None:
-            # Set descendant attribute
-            try:
-                old_version_list['descendant'] = self.cursor.fetchone()[0]
-            except psycopg2.DatabaseError as error:
-                self.log.error("Something went wrong in id query: %s", error)
-
-            # Delete the old version of the article from the CurrentVersion table
-            try:
-                self.cursor.execute(self.delete_from_current, (old_version_list['db_id'],))
-                self.conn.commit()
-            except psycopg2.DatabaseError as error:
-                self.log.error("Something went wrong in delete: %s", error)
-
-            # Add the old version to the ArchiveVersion table
-            try:
-                self.cursor.execute(self.insert_archive, old_version_list)
-                self.conn.commit()
-                self.log.info("Moved old version of an article to the archive.")
-            except psycopg2.DatabaseError as error:
-                self.log.error("Something went wrong in archive: %s", error)
+    def _store_single(self, current_version):
+        """
+        Store the data of a single item in DB without committing.
+        First determine if a version of the article already exists,
+          if so then 'migrate' the older version to the archive table.
+        Second store the new article in the current version table
+        :param current_version: A dict, the item data
+        :return: The number of old versions moved to the archive table, 0 or 1
+        """
+        # Search the CurrentVersion table for an old version of the article
+        self.cursor.execute(self.compare_versions, (current_version['url'],))
+        old_version = self.cursor.fetchone()
 
-        return item
+        current_version = dict(current_version, ancestor=0, descendant=0, version=1)
+        if old_version is None:
+            self.cursor.execute(self.insert_current, current_version)
+            return 0
+
+        # Update the version number and the ancestor for later references, the old version has to be deleted first
+        # due to the unique url
+        current_version['ancestor'] = old_version[0]
+        current_version['version'] = old_version[18] + 1
+        self.cursor.execute(self.delete_from_current, (old_version[0],))
+        self.cursor.execute(self.insert_current, current_version)
+        descendant = self.cursor.fetchone()[0]
+
+        # Add the old version to the ArchiveVersion table, its descendant is the id of the new version
+        self.cursor.execute(self.insert_archive, {
+            'db_id': old_version[0],
+            'date_modify': old_version[1],
+            'date_download': old_version[2],
+            'localpath': old_version[3],
+            'filename': old_version[4],
+            'source_domain': old_version[5],
+            'url': old_version[6],
+            'image_url': old_version[7],
+            'title': old_version[8],
+            'title_page': old_version[9],
+            'title_rss': old_version[10],
+            'maintext': old_version[11],
+            'description': old_version[12],
+            'date_publish': old_version[13],
+            'authors': old_version[14],
+            'language': old_version[15],
+            'ancestor': old_version[16],
+            'descendant': descendant,
+            'version': old_version[18]})
+        return 1
 
     def close_spider(self, spider):
+        # Store the remaining items
+        self._flush()
         # Close DB connection - garbage collection
         self.conn.close()
 
@@ -567,7 +718,7 @@ class JsonFileStorage(ExtractedInformationStorage):
 
         # Write JSON to local file system
         with open(file_path, 'w') as file_:
-            json.dump(ExtractedInformationStorage.extract_relevant_info(item), file_, ensure_ascii=False)
+            json.dump(ExtractedInformationStorage.extract_relevant_info(item), file_, default=str, ensure_ascii=False)
 
         return item
 
@@ -584,6 +735,32 @@ class ElasticsearchStorage(ExtractedInformationStorage):
     index_archive = None
     mapping = None
     running = False
+    # number of items that are written at once, 1 writes every item immediately
+    batch_size = 1
+    # maximum time in milliseconds that an item is buffered, checked when the next item arrives
+    batch_timeout = 1000
+    # maximum number of buffers that are stored at once by background threads
+    max_in_flight = 1
+    # number of documents per bulk request
+    chunk_size = 500
+    # number of retries of documents that were rejected due to too many requests (HTTP 429), with exponential backoff
+    # from initial_backoff to max_backoff seconds
+    max_retries = 3
+    initial_backoff = 2
+    max_backoff = 600
+    # whether index_current is searched for previous versions that older versions of news-please stored with ids that
+    # are not derived from the url, which needs an extra request per batch with new articles
+    find_legacy_versions = True
+    # extracted information of the buffered items and their urls
+    buffer = None
+    buffered_urls = None
+    # time.monotonic() when the first item of the buffer arrived
+    buffer_start = None
+    # threads that store the buffers, the futures of the buffers that are being stored, mapped to their urls, and the
+    # urls of all these buffers
+    executor = None
+    pending = None
+    pending_urls = None
 
     def __init__(self):
         self.log = logging.getLogger('elasticsearch.trace')
@@ -604,6 +781,19 @@ class ElasticsearchStorage(ExtractedInformationStorage):
         self.index_current = self.database["index_current"]
         self.index_archive = self.database["index_archive"]
         self.mapping = self.database["mapping"]
+        self.batch_size = max(1, self.database.get("batch_size", 1))
+        self.batch_timeout = self.database.get("batch_timeout", 1000)
+        self.max_in_flight = max(1, self.database.get("max_in_flight", 1))
+        self.chunk_size = self.database.get("chunk_size", 500)
+        self.max_retries = self.database.get("max_retries", 3)
+        self.initial_backoff = self.database.get("initial_backoff", 2)
+        self.max_backoff = self.database.get("max_backoff", 600)
+        self.find_legacy_versions = self.database.get("find_legacy_versions", True)
+        self.buffer = []
+        self.buffered_urls = set()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        self.pending = {}
+        self.pending_urls = set()
 
         # check connection to Database and set the configuration
 
@@ -620,6 +810,8 @@ class ElasticsearchStorage(ExtractedInformationStorage):
             if not self.es.indices.exists(self.index_current):
                 self.es.indices.create(index=self.index_current, ignore=[400, 404])
                 self.es.indices.put_mapping(index=self.index_current, body=self.mapping)
+                # a new index does not contain versions of older versions of news-please
+                self.find_legacy_versions = False
             if not self.es.indices.exists(self.index_archive):
                 self.es.indices.create(index=self.index_archive, ignore=[400, 404])
                 self.es.indices.put_mapping(index=self.index_archive, body=self.mapping)
@@ -634,35 +826,150 @@ class ElasticsearchStorage(ExtractedInformationStorage):
                            "Please check if the database is running and the config is correct: %s" % error)
 
     def process_item(self, item, spider):
-
+        """
+        Buffers the item data and stores the buffer in Elasticsearch once it contains batch_size items or its first item
+        is older than batch_timeout, see _flush.
+        """
         if self.running:
-            try:
-                version = 1
-                ancestor = None
-
-                # search for previous version
-                request = self.es.search(index=self.index_current, body={'query': {'match': {'url.keyword': item['url']}}})
-                if request['hits']['total']['value'] > 0:
-                    # save old version into index_archive
-                    old_version = request['hits']['hits'][0]
-                    old_version['_source']['descendent'] = True
-                    self.es.index(index=self.index_archive, doc_type='_doc', body=old_version['_source'])
-                    version += 1
-                    ancestor = old_version['_id']
-
-                # save new version into old id of index_current
-                self.log.info("Saving to Elasticsearch: %s" % item['url'])
-                extracted_info = ExtractedInformationStorage.extract_relevant_info(item)
-                extracted_info['ancestor'] = ancestor
-                extracted_info['version'] = version
-                self.es.index(index=self.index_current, doc_type='_doc', id=ancestor,
-                              body=extracted_info)
+            if item['url'] in self.buffered_urls or item['url'] in self.pending_urls:
+                # the buffered or pending version is the old version of this one, so it has to be stored first
+                self._flush()
+                self._wait_for_pending()
+
+            self.log.info("Saving to Elasticsearch: %s" % item['url'])
+            extracted_info = ExtractedInformationStorage.extract_relevant_info(item)
+            if isinstance(extracted_info['date_publish'], datetime.datetime):
+                # the mapping of date_publish expects the format yyyy-MM-dd HH:mm:ss
+                extracted_info['date_publish'] = extracted_info['date_publish'].strftime('%Y-%m-%d %H:%M:%S')
+            self.buffer.append(extracted_info)
+            self.buffered_urls.add(item['url'])
+            if len(self.buffer) == 1:
+                self.buffer_start = time.monotonic()
+
+            if len(self.buffer) >= self.batch_size \
+                    or (time.monotonic() - self.buffer_start) * 1000 >= self.batch_timeout:
+                self._flush()
+        return item
 
+    @staticmethod
+    def get_id(url):
+        """
+        Returns the id of the current version of an article in index_current, which is derived from its url, so that
+        the previous version can be fetched by its id. URLs are hashed since ids are limited to 512 bytes.
+        :param url:
+        :return: A string
+        """
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
 
+    def _flush(self):
+        """
+        Passes the buffered item data on to a thread that stores it, at most max_in_flight buffers are stored at once.
+        """
+        articles = self.buffer
+        self.buffer = []
+        self.buffered_urls = set()
+        if not articles:
+            return
+
+        # wait until a thread is available
+        while len(self.pending) >= self.max_in_flight:
+            self._wait_for_pending(1)
+        urls = {article['url'] for article in articles}
+        self.pending[self.executor.submit(self._store, articles)] = urls
+        self.pending_urls.update(urls)
+
+    def _wait_for_pending(self, min_finished=None):
+        """
+        Waits for stores to finish, all stores by default.
+        :param min_finished: if set, the number of stores to wait for at least
+        """
+        for number_finished, future in enumerate(as_completed(list(self.pending)), 1):
+            self.pending_urls.difference_update(self.pending.pop(future))
+            try:
+                future.result()
             except ConnectionError as error:
                 self.running = False
                 self.log.error("Lost connection to Elasticsearch, this module will be deactivated: %s" % error)
-        return item
+            except Exception as error:
+                self.log.error("Failed to save to Elasticsearch: %s" % error)
+            if min_finished is not None and number_finished >= min_finished:
+                break
+
+    def _store(self, articles):
+        """
+        Stores articles in Elasticsearch. The previous versions of the articles are fetched from index_current by their
+        ids and saved into index_archive, then the new versions replace them in index_current. If find_legacy_versions
+        is set, the previous versions that were not found by their ids are searched by their urls. All documents are
+        written with the bulk API, which retries documents that were rejected due to too many requests.
+        :param articles: A list of dicts, the extracted information of the articles
+        """
+        ids = [self.get_id(article['url']) for article in articles]
+
+        # search for previous versions
+        response = self.es.mget(index=self.index_current, body={'ids': ids})
+        old_versions = {doc['_id']: doc['_source'] for doc in response['docs'] if doc.get('found')}
+        legacy_ids = {}
+        if self.find_legacy_versions:
+            legacy_ids = self._find_legacy_versions(
+                {db_id: article['url'] for db_id, article in zip(ids, articles) if db_id not in old_versions},
+                old_versions)
+
+        actions = []
+        for db_id, article in zip(ids, articles):
+            version = 1
+            ancestor = None
+            old_version = old_versions.get(db_id)
+            if db_id in legacy_ids:
+                # the previous version is replaced by the new version with an id derived from the url
+                actions.append({'_op_type': 'delete', '_index': self.index_current, '_id': legacy_ids[db_id]})
+            if old_version is not None:
+                # save old version into index_archive, its id is derived from the id of the article and its version
+                version = old_version.get('version', 1) + 1
+                ancestor = '%s-%i' % (db_id, version - 1)
+                old_version['descendent'] = True
+                actions.append({'_index': self.index_archive, '_id': ancestor, '_source': old_version})
+
+            # save new version into the id of the article in index_current
+            article['ancestor'] = ancestor
+            article['version'] = version
+            actions.append({'_index': self.index_current, '_id': db_id, '_source': article})
+
+        for ok, result in helpers.streaming_bulk(self.es, actions, chunk_size=self.chunk_size,
+                                                 max_retries=self.max_retries, initial_backoff=self.initial_backoff,
+                                                 max_backoff=self.max_backoff, raise_on_error=False,
+                                                 yield_ok=False):
+            self.log.error("Failed to save to Elasticsearch: %s" % result)
+
+    def _find_legacy_versions(self, urls_by_id, old_versions):
+        """
+        Searches index_current for previous versions that were stored by older versions of news-please, whose ids are
+        not derived from the url, with a single terms query on the urls. The found versions are added to old_versions.
+        :param urls_by_id: A dict mapping the ids of the articles whose previous version was not found by its id to
+            their urls
+        :param old_versions: A dict mapping the ids of the articles to their previous versions
+        :return: A dict mapping the ids of the articles to the ids of their previous versions that were found
+        """
+        if not urls_by_id:
+            return {}
+        ids_by_url = {url: db_id for db_id, url in urls_by_id.items()}
+        response = self.es.search(index=self.index_current, body={
+            'query': {'terms': {'url.keyword': list(ids_by_url)}},
+            'size': len(ids_by_url),
+        })
+        legacy_ids = {}
+        for hit in response['hits']['hits']:
+            db_id = ids_by_url.get(hit['_source'].get('url'))
+            if db_id is not None and db_id not in legacy_ids:
+                old_versions[db_id] = hit['_source']
+                legacy_ids[db_id] = hit['_id']
+        return legacy_ids
+
+    def close_spider(self, spider):
+        # Store the remaining items
+        if self.running:
+            self._flush()
+        self._wait_for_pending()
+        self.executor.shutdown()
 
 
 class DateFilter(object):
@@ -712,7 +1019,9 @@ class DateFilter(object):
         else:
             # Create datetime object
             try:
-                publish_date = datetime.datetime.strptime(str(item['article_publish_date']), '%Y-%m-%d %H:%M:%S')
+                publish_date = item['article_publish_date']
+                if not isinstance(publish_date, datetime.datetime):
+                    publish_date = datetime.datetime.strptime(str(publish_date), '%Y-%m-%d %H:%M:%S')
             except ValueError as error:
                 self.log.warning("DateFilter: Extracted date has the wrong format: %s - %s" %
                                  (item['article_publishing_date'], item['url']))
@@ -732,51 +1041,50 @@ class DateFilter(object):
 
 class PandasStorage(ExtractedInformationStorage):
     """
-    Store meta data a Pandas data frame
+    Store meta data in Parquet files, which can be read as a Pandas data frame, e.g., with
+    pd.read_parquet(path).drop_duplicates('url', keep='last'). The articles are buffered column-wise and written to a
+    new file in the directory file_name once row_group_size articles are buffered, so that the memory consumption is
+    bounded and the articles written so far can be read while the crawler is running.
     """
 
     log = None
     cfg = None
-    es = None
-    index_current = None
-    index_archive = None
-    mapping = None
-    running = False
+    # directory of the Parquet files, each crawl writes its own files
+    full_path = None
+    # prefix of the names of the files of this crawl and the number of files written so far
+    file_prefix = None
+    number_of_files = 0
+    # number of articles per file, each file consists of a single row group
+    row_group_size = 10000
+    schema = None
+    # buffered values by column
+    columns = None
+    # columns of dates, which are written as timestamps
+    date_columns = ("date_download", "date_modify", "date_publish")
 
     def __init__(self):
-        if np is None:
-            raise ModuleNotFoundError("Using PandasStorage requires numpy and pandas")
+        if pa is None:
+            raise ModuleNotFoundError("Using PandasStorage requires pyarrow")
         self.log = logging.getLogger(__name__)
         self.cfg = CrawlerConfig.get_instance()
         self.database = self.cfg.section("Pandas")
+        self.row_group_size = max(1, self.database.get("row_group_size", 10000))
 
-        df_index = "url"
-        columns = [
-            "source_domain", "title_page", "title_rss", "localpath", "filename",
-            "date_download", "date_modify", "date_publish", "title", "description",
-            "text", "authors", "image_url", "language", 'url'
-        ]
+        self.schema = pa.schema([
+            ("source_domain", pa.string()), ("title_page", pa.string()), ("title_rss", pa.string()),
+            ("localpath", pa.string()), ("filename", pa.string()), ("date_download", pa.timestamp("us")),
+            ("date_modify", pa.timestamp("us")), ("date_publish", pa.timestamp("us")), ("title", pa.string()),
+            ("description", pa.string()), ("text", pa.string()), ("authors", pa.list_(pa.string())),
+            ("image_url", pa.string()), ("language", pa.string()), ("url", pa.string())
+        ])
+        self.columns = {name: [] for name in self.schema.names}
 
         working_path = self.cfg.section("Files")['working_path']
         file_name = self.database['file_name']
-        self.full_path = os.path.join(working_path, file_name, '.pickle')
-
-        try:
-            self.df = pd.read_pickle(self.full_path)
-            self.log.info(
-                "Found existing Pandas file with %i rows at %s", len(self.df),
-                self.full_path
-            )
-            for col in columns:
-                if col not in self.df.columns:
-                    raise KeyError(col)
-        except FileNotFoundError:
-            self.df = pd.DataFrame(columns=columns.keys())
-            self.log.info("Created new Pandas file at '%s'", self.full_path)
-            self.df.set_index(df_index, inplace=True, drop=False)
-        except KeyError as e:
-            self.log.error("%s is missing a column.", self.full_path)
-            raise e
+        self.full_path = os.path.join(working_path, file_name)
+        os.makedirs(self.full_path, exist_ok=True)
+        self.file_prefix = "part-%s-%i" % (datetime.datetime.now().strftime("%Y%m%d%H%M%S"), os.getpid())
+        self.log.info("Writing Pandas files to '%s'", os.path.join(self.full_path, self.file_prefix + "-*.parquet"))
 
     def process_item(self, item, _spider):
         article = {
@@ -797,24 +1105,63 @@ class PandasStorage(ExtractedInformationStorage):
             'text': item['article_text'],
             'url': item['url']
         }
-        self.df.loc[item['url']] = article
+        for name, values in self.columns.items():
+            values.append(article[name])
+
+        if len(self.columns['url']) >= self.row_group_size:
+            self._flush()
         return item
 
+    @staticmethod
+    def to_timestamp(value):
+        """
+        Converts a date as extracted to a naive datetime, dates with a time zone are converted to UTC
+        :param value: A datetime, a string or None
+        :return: A datetime or None if the value is not a date
+        """
+        if isinstance(value, str):
+            value = parse_date(value)
+        if not isinstance(value, datetime.datetime):
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        return value.replace(tzinfo=None)
+
+    def _flush(self):
+        """
+        Writes the buffered articles to a new file, only the last article of each url is written. The file is written
+        under a hidden name first, which readers of the directory skip, so that they never read an incomplete file.
+        """
+        urls = self.columns['url']
+        if not urls:
+            return
+
+        # the positions of the last articles of the urls, in the order of their arrival
+        last_positions = sorted({url: position for position, url in enumerate(urls)}.values())
+        arrays = []
+        for field in self.schema:
+            values = self.columns[field.name]
+            if field.name in self.date_columns:
+                values = [self.to_timestamp(values[position]) for position in last_positions]
+            else:
+                values = [values[position] for position in last_positions]
+            arrays.append(pa.array(values, type=field.type))
+        self.columns = {name: [] for name in self.schema.names}
+
+        # the files are numbered with leading zeros, so that their names sort in the order they were written
+        file_name = "%s-%06i.parquet" % (self.file_prefix, self.number_of_files)
+        file_path = os.path.join(self.full_path, file_name)
+        hidden_file_path = os.path.join(self.full_path, "." + file_name)
+        pq.write_table(pa.Table.from_arrays(arrays, schema=self.schema), hidden_file_path)
+        os.replace(hidden_file_path, file_path)
+        self.number_of_files += 1
+        self.log.info("Wrote %i articles to Pandas file %s", len(last_positions), file_path)
+
     def close_spider(self, _spider):
         """
         Write out to file
         """
-        self.df['date_download'] = pd.to_datetime(
-            self.df['date_download'], errors='coerce', infer_datetime_format=True
-        )
-        self.df['date_modify'] = pd.to_datetime(
-            self.df['date_modify'], errors='coerce', infer_datetime_format=True
-        )
-        self.df['date_publish'] = pd.to_datetime(
-            self.df['date_publish'], errors='coerce', infer_datetime_format=True
-        )
-        self.df.to_pickle(self.full_path)
-        self.log.info("Wrote to Pandas to %s", self.full_path)
+        self._flush()
 
 
 class Collections(str, Enum):
@@ -832,22 +1179,34 @@ class RedisStorageClient(StrictRedis):
 
     Implementations choices:
     * For faster lookups, we use keys of that form: key = { collection name } + { separator } + { identifier }
-    * LZMA compression
+    * Compression with a configurable codec, which is recorded in each value, see Compressor (LZMA by default)
     * It is safe to store objects not related to news-please in the same db
     * It is possible to set a TTL on objects stored
     """
 
     separator = "::"
 
-    def __init__(self, *args, dangerously_flush_db: bool = False, **kwargs):
+    def __init__(
+        self,
+        *args,
+        dangerously_flush_db: bool = False,
+        compression: str = "lzma",
+        compression_level: Optional[int] = None,
+        compression_dictionary: Optional[str] = None,
+        **kwargs
+    ):
         if "decode_responses" in kwargs:
             warnings.warn("`decode_responses` must remain set to False for compression")
             kwargs["decode_responses"] = False
         super().__init__(*args, **kwargs)
         self.dangerously_flush_db = dangerously_flush_db
+        self.compressor = Compressor(compression, compression_level, compression_dictionary)
 
     @classmethod
     def from_config_parser(cls, config_parser: RawConfigParser):
+        compression_level = config_parser.get(
+            "Redis", "compression_level", fallback=""
+        ).strip()
         connection_kwargs = {
             "host": config_parser.get("Redis", "host"),
             "port": config_parser.getint("Redis", "port"),
@@ -931,6 +1290,15 @@ class RedisStorageClient(StrictRedis):
             "dangerously_flush_db": config_parser.getboolean(
                 "Redis", "dangerously_flush_db", fallback=False
             ),
+            "compression": config_parser.get("Redis", "compression", fallback="lzma"),
+            # an empty value selects the default level of the codec, like an unset one
+            "compression_level": int(compression_level)
+            if compression_level
+            else None,
+            "compression_dictionary": config_parser.get(
+                "Redis", "compression_dictionary", fallback=None
+            )
+            or None,
         }
         return cls(**connection_kwargs)
 
@@ -965,7 +1333,16 @@ class RedisStorageClient(StrictRedis):
         raw = self._get_raw_current_version(url)
         if not raw:
             return None
-        return json.loads(lzma.decompress(raw))
+        return json.loads(self.compressor.decompress(raw))
+
+    def get_current_versions(self, urls: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get the values at name = collection + url for all urls with a single MGET.
+        """
+        if not all(urls):
+            raise ValueError("A value is expected for `url`")
+        raws = self.mget([self._get_name(Collections.CurrentVersions, url) for url in urls])
+        return [json.loads(self.compressor.decompress(raw)) if raw else None for raw in raws]
 
     def save_item(
         self,
@@ -974,17 +1351,22 @@ class RedisStorageClient(StrictRedis):
         collection: Collections = Collections.CurrentVersions,
         version: Optional[str] = None,
         ttl: Optional[int] = None,
+        pipeline: Optional[Pipeline] = None,
     ) -> None:
+        """
+        Set the value at name = collection + url (+ version), on the pipeline if given, so that it is sent with the
+        other commands of the pipeline once it is executed.
+        """
         if not url:
             raise ValueError("A value is expected for `url`")
 
         if collection == Collections.ArchiveVersions and not version:
             raise ValueError("A version value is expected for archives")
 
-        serialized = json.dumps(item)
-        self.set(
+        serialized = json.dumps(item, default=str)
+        (self if pipeline is None else pipeline).set(
             name=self._get_name(collection=collection, url=url, version=version),
-            value=lzma.compress(serialized.encode("utf-8")),
+            value=self.compressor.compress(serialized.encode("utf-8")),
             ex=ttl,
         )
 
@@ -1041,6 +1423,15 @@ class RedisStorage(ExtractedInformationStorage):
         # Capability to avoid storing archives - default is True
         self.enable_archive = self.cfg.parser.getboolean("Redis", "enable_archive", fallback=True)
 
+        # Number of articles that are stored at once and maximum time in milliseconds that an article is buffered,
+        # checked when the next article arrives - default is 1, i.e., every article is stored immediately
+        self.batch_size = max(1, self.cfg.parser.getint("Redis", "batch_size", fallback=1))
+        self.batch_timeout = self.cfg.parser.getfloat("Redis", "batch_timeout", fallback=1000)
+
+        # Buffered articles by url, and time.monotonic() when the first one arrived
+        self.buffer: Dict[str, Dict[str, Any]] = {}
+        self.buffer_start = None
+
     @property
     def is_archive_enabled(self) -> bool:
         return self.enable_archive
@@ -1052,49 +1443,75 @@ class RedisStorage(ExtractedInformationStorage):
         else:
             url = item._values["url"]
 
-        # Set defaults
-        new_version_tag = self.VersionTag(
-            __version=1,
-            __ancestor=0,
-            __descendant=0,
-        )
-
-        old_version = self.conn.get_current_version(url)
+        if url in self.buffer:
+            # the buffered version is the old version of this one, so it has to be stored first
+            self._flush()
 
-        # We still consider an empty value as valid version value
-        # TODO: this could be an option
-        if old_version is not None:
-            # Update the version number and the ancestor variable for later references
-            new_version_tag["__version"] = old_version["__version"] + 1
-            new_version_tag["__ancestor"] = old_version["__version"]
+        self.buffer[url] = cast(Dict[str, Any], ExtractedInformationStorage.extract_relevant_info(item))
+        if len(self.buffer) == 1:
+            self.buffer_start = time.monotonic()
 
-        # Add the new version of the article to the CurrentVersion table
-        new_version = cast(Dict[str, Any], ExtractedInformationStorage.extract_relevant_info(item))
-        new_version = {**new_version, **new_version_tag}
+        if len(self.buffer) >= self.batch_size \
+                or (time.monotonic() - self.buffer_start) * 1000 >= self.batch_timeout:
+            self._flush()
+        return item
 
-        # If an old version existed, this replaces it
-        self.conn.save_item(
-            url=url,
-            item=new_version,
-            ttl=self.ttl,
-        )
-        self.log.info(f"Article from {url!r} inserted in current versions.")
+    def _flush(self):
+        """
+        Stores the buffered articles. The current versions of all articles are fetched with a single MGET, then the new
+        versions and the archived old versions are written with a single pipeline.
+        """
+        buffer = self.buffer
+        self.buffer = {}
+        if not buffer:
+            return
+
+        urls = list(buffer)
+        pipeline = self.conn.pipeline(transaction=False)
+        for url, old_version in zip(urls, self.conn.get_current_versions(urls)):
+            # Set defaults
+            new_version_tag = self.VersionTag(
+                __version=1,
+                __ancestor=0,
+                __descendant=0,
+            )
 
-        # Now, move the old version from the CurrentVersions collection to the ArchiveVersions collection, if applicable
-        if old_version and self.is_archive_enabled:
-            old_version["__descendant"] = new_version_tag["__version"]
+            # We still consider an empty value as valid version value
+            # TODO: this could be an option
+            if old_version is not None:
+                # Update the version number and the ancestor variable for later references
+                new_version_tag["__version"] = old_version["__version"] + 1
+                new_version_tag["__ancestor"] = old_version["__version"]
 
+            # Add the new version of the article to the CurrentVersion table, if an old version existed, this replaces
+            # it
+            new_version = {**buffer[url], **new_version_tag}
             self.conn.save_item(
                 url=url,
-                item=old_version,
-                collection=Collections.ArchiveVersions,
-                version=old_version["__version"],
+                item=new_version,
                 ttl=self.ttl,
+                pipeline=pipeline,
             )
-            self.log.info(f"Moved old version of article from {url!r} to the archive.")
 
-        return item
+            # Now, move the old version from the CurrentVersions collection to the ArchiveVersions collection, if
+            # applicable
+            if old_version and self.is_archive_enabled:
+                old_version["__descendant"] = new_version_tag["__version"]
+
+                self.conn.save_item(
+                    url=url,
+                    item=old_version,
+                    collection=Collections.ArchiveVersions,
+                    version=old_version["__version"],
+                    ttl=self.ttl,
+                    pipeline=pipeline,
+                )
+
+        pipeline.execute()
+        self.log.info(f"{len(urls)} articles inserted in current versions.")
 
     def close_spider(self, spider: scrapy.Spider):
+        # Store the remaining articles
+        self._flush()
         # Close redis connection
         self.conn.close()
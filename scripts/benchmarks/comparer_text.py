@@ -0,0 +1,53 @@
+"""
+Measures the time that ComparerText takes to choose the text of an article from the texts of several extractors. The
+texts are generated, they share most of their words like the texts that different extractors return for the same page.
+E.g.:
+
+    python scripts/benchmarks/comparer_text.py --words 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+sys.path.insert(0, ROOT)
+
+from newsplease.pipeline.extractor.article_candidate import ArticleCandidate  # noqa: E402
+from newsplease.pipeline.extractor.comparer.comparer_text import ComparerText  # noqa: E402
+
+
+def candidates(number_of_words, extractors, seed=0):
+    """Returns ArticleCandidates whose texts keep 80 % of the words of a common text and replace the others."""
+    rnd = random.Random(seed)
+    vocabulary = ['word%i' % i for i in range(50000)]
+    text = [rnd.choice(vocabulary) for _ in range(number_of_words)]
+    article_candidates = []
+    for extractor in extractors:
+        article_candidate = ArticleCandidate()
+        article_candidate.extractor = extractor
+        article_candidate.text = ' '.join(word if rnd.random() < 0.8 else rnd.choice(vocabulary) for word in text)
+        article_candidates.append(article_candidate)
+    return article_candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=20000, help='number of words per text')
+    parser.add_argument('--extractors', type=int, default=3, help='number of texts')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs, the fastest is reported')
+    args = parser.parse_args()
+
+    article_candidates = candidates(args.words, ['extractor%i' % i for i in range(args.extractors)])
+    seconds = []
+    for _ in range(args.repeat):
+        start_time = time.perf_counter()
+        ComparerText().extract(None, article_candidates)
+        seconds.append(time.perf_counter() - start_time)
+    print('%i texts of %i words: %.2f ms, best of %i' % (args.extractors, args.words, min(seconds) * 1000,
+                                                          args.repeat))
+
+
+if __name__ == '__main__':
+    main()
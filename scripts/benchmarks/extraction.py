@@ -0,0 +1,60 @@
+"""
+Measures the time that NewsPlease.from_html takes per article on a corpus of saved pages, by default the pages in
+tests/fixtures/pages. Each page is extracted several times and the fastest time is reported, which is the least
+affected by other load on the machine. To compare two versions of news-please, run the script in a checkout of each,
+e.g.:
+
+    python scripts/benchmarks/extraction.py --repeat 10
+    python scripts/benchmarks/extraction.py --repeat 10 --extractors date_extractor lang_detect_extractor
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+sys.path.insert(0, ROOT)
+
+from newsplease import NewsPlease  # noqa: E402
+from newsplease.pipeline.extractor import article_extractor  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='?', default=os.path.join(ROOT, 'tests', 'fixtures', 'pages'),
+                        help='directory of saved pages (*.html)')
+    parser.add_argument('--repeat', type=int, default=3, help='number of times each page is extracted')
+    parser.add_argument('--extractors', nargs='+', help='if set, only these extractors are run, e.g., date_extractor')
+    args = parser.parse_args()
+
+    if args.extractors:
+        get_extractor = article_extractor.get_extractor
+        article_extractor.get_extractor = lambda extractor_list, **kwargs: get_extractor(args.extractors, **kwargs)
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.corpus, '*.html'))):
+        with open(path, encoding='utf-8') as page_file:
+            pages.append((os.path.basename(path), page_file.read()))
+    if not pages:
+        parser.error('no *.html files in %s' % args.corpus)
+
+    # the first extraction imports the extractors and initializes them
+    NewsPlease.from_html(pages[0][1], url='https://example.com/warm-up', fetch_images=False)
+
+    best_seconds = []
+    for name, html in pages:
+        seconds = []
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            NewsPlease.from_html(html, url='https://example.com/news/' + name, fetch_images=False)
+            seconds.append(time.perf_counter() - start_time)
+        best_seconds.append(min(seconds))
+        print('%-24s %8.2f ms' % (name, min(seconds) * 1000))
+    print('%-24s %8.2f ms per article, %i pages, best of %i' % ('mean', statistics.mean(best_seconds) * 1000,
+                                                               len(pages), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
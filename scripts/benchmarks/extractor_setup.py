@@ -0,0 +1,50 @@
+"""
+Measures what initializing the article Extractor costs compared to extracting an article with NewsPlease.from_html: the
+first extraction of a process, which imports and initializes the extractors, building another Extractor once the
+extractors are imported, and the following extractions, which reuse the Extractor of get_extractor. E.g.:
+
+    python scripts/benchmarks/extractor_setup.py --repeat 50
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+sys.path.insert(0, ROOT)
+
+from newsplease import NewsPlease  # noqa: E402
+from newsplease.pipeline.extractor import article_extractor  # noqa: E402
+
+# the extractors of NewsPlease.from_html without images
+EXTRACTORS = [('newspaper_extractor_no_images', 'NewspaperExtractorNoImages'), 'readability_extractor',
+              'date_extractor', 'lang_detect_extractor']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('page', nargs='?', default=os.path.join(ROOT, 'tests', 'fixtures', 'pages', '01_meta.html'),
+                        help='saved page that is extracted')
+    parser.add_argument('--repeat', type=int, default=20, help='number of extractions and Extractors that are timed')
+    args = parser.parse_args()
+
+    with open(args.page, encoding='utf-8') as page_file:
+        html = page_file.read()
+
+    start_time = time.perf_counter()
+    NewsPlease.from_html(html, url='https://example.com/news/first', fetch_images=False)
+    print('first from_html of the process  %9.2f ms' % ((time.perf_counter() - start_time) * 1000))
+
+    start_time = time.perf_counter()
+    for _ in range(args.repeat):
+        article_extractor.Extractor(EXTRACTORS)
+    print('Extractor()                     %9.2f ms' % ((time.perf_counter() - start_time) / args.repeat * 1000))
+
+    start_time = time.perf_counter()
+    for _ in range(args.repeat):
+        NewsPlease.from_html(html, url='https://example.com/news/next', fetch_images=False)
+    print('further from_html               %9.2f ms' % ((time.perf_counter() - start_time) / args.repeat * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Measures how many articles per second PostgresqlStorage writes to a PostgreSQL server. The tables are created in a
+schema of their own, which is dropped afterwards, so the benchmark can run against a database that is in use. E.g.:
+
+    python scripts/benchmarks/postgresql_storage.py --host localhost --user news --password secret --database news \\
+        --batch-size 1 100 --articles 2000 --versions 0.25
+"""
+import argparse
+import os
+import sys
+import time
+import types
+
+import psycopg2
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+sys.path.insert(0, ROOT)
+
+from newsplease.config import CrawlerConfig  # noqa: E402
+from newsplease.pipeline.pipelines import PostgresqlStorage  # noqa: E402
+
+
+def item(index, url_index):
+    """Returns an item with 5 KB of text like those that the pipeline passes to the storage."""
+    return {
+        'url': 'https://example.com/news/%i' % url_index,
+        'source_domain': b'example.com',
+        'html_title': b'Example News',
+        'rss_title': b'',
+        'local_path': '/data/example.com/%i.html' % index,
+        'filename': '%i.html' % index,
+        'download_date': '2020-01-01 00:00:%02i' % (index % 60),
+        'modified_date': '2020-01-01 00:00:00',
+        'article_title': 'Title %i' % index,
+        'article_description': 'Description %i' % index,
+        'article_text': 'word ' * 1000,
+        'article_image': None,
+        'article_author': ['Jane Doe', 'John Doe'] if index % 3 else [],
+        'article_publish_date': None if index % 4 == 0 else '2019-12-31 10:00:00',
+        'article_language': 'en',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5432)
+    parser.add_argument('--database', default='postgres')
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--schema', default='news_please_benchmark', help='schema that is created and dropped')
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[1, 100], help='batch sizes that are measured')
+    parser.add_argument('--articles', type=int, default=2000, help='number of articles per batch size')
+    parser.add_argument('--versions', type=float, default=0.0,
+                        help='share of the articles that are new versions of previous articles, e.g., 0.25')
+    args = parser.parse_args()
+
+    connection_args = dict(host=args.host, port=args.port, database=args.database, user=args.user,
+                           password=args.password)
+    with open(os.path.join(ROOT, 'newsplease', 'init-postgresql-db.sql')) as sql_file:
+        create_tables = sql_file.read()
+    number_of_urls = max(1, round(args.articles * (1 - args.versions)))
+    items = [item(index, index % number_of_urls) for index in range(args.articles)]
+
+    conn = psycopg2.connect(**connection_args)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        for batch_size in args.batch_size:
+            cursor.execute('DROP SCHEMA IF EXISTS %s CASCADE; CREATE SCHEMA %s; SET search_path TO %s;'
+                           % ((args.schema,) * 3))
+            cursor.execute(create_tables)
+            # the storage reads its configuration from the CrawlerConfig singleton
+            section = dict(connection_args, schema=args.schema, batch_size=batch_size, batch_timeout=10 ** 9)
+            CrawlerConfig.instance = types.SimpleNamespace(section=lambda name: dict(section))
+
+            storage = PostgresqlStorage()
+            start_time = time.perf_counter()
+            for article in items:
+                storage.process_item(dict(article), None)
+            storage.close_spider(None)
+            seconds = time.perf_counter() - start_time
+
+            cursor.execute('SELECT count(*) FROM CurrentVersions')
+            current_versions = cursor.fetchone()[0]
+            # archived versions whose descendant is the current version with the next version number
+            cursor.execute('SELECT count(*) FROM ArchiveVersions a JOIN CurrentVersions c ON c.id = a.descendant '
+                           'AND c.ancestor = a.id AND c.version = a.version + 1')
+            linked_versions = cursor.fetchone()[0]
+            print('batch_size %5i: %7.0f articles/s, %i current versions, %i archived versions linked to their '
+                  'successors' % (batch_size, args.articles / seconds, current_versions, linked_versions))
+    finally:
+        CrawlerConfig.instance = None
+        cursor.execute('DROP SCHEMA IF EXISTS %s CASCADE' % args.schema)
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
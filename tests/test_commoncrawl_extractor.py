@@ -0,0 +1,158 @@
+import http.server
+import io
+import os
+import re
+import threading
+
+import pytest
+from warcio.archiveiterator import ArchiveIterator
+from warcio.statusandheaders import StatusAndHeaders
+from warcio.warcwriter import WARCWriter
+
+from newsplease.crawler import commoncrawl_crawler
+from newsplease.crawler.commoncrawl_extractor import CommonCrawlExtractor
+
+WARC_PATH = 'crawl-data/CC-NEWS/2020/05/CC-NEWS-20200501000000-00000.warc.gz'
+NUMBER_OF_RECORDS = 24
+
+
+def html(i):
+    return ('<html lang="en"><head><title>Story %i</title>'
+            '<meta property="article:published_time" content="2020-05-01T10:00:00Z"/></head>'
+            '<body><article><h1>Story %i</h1><p>%s</p></article></body></html>' % (
+                i, i, ' '.join('Sentence number %i about the news of day %i.' % (j, i) for j in range(40))))
+
+
+def write_warc(path):
+    """Writes a WARC file with HTML responses and some records that are discarded, returns the urls of the HTML
+    responses in the order of their records."""
+    urls = []
+    with open(path, 'wb') as warc_file:
+        writer = WARCWriter(warc_file, gzip=True)
+        for i in range(NUMBER_OF_RECORDS):
+            url = 'https://www.example.com/story/%i' % i
+            body = html(i).encode('utf-8')
+            content_type = 'image/png' if i % 5 == 4 else 'text/html; charset=utf-8'
+            http_headers = StatusAndHeaders('200 OK', [('Content-Type', content_type),
+                                                       ('Content-Length', str(len(body)))], protocol='HTTP/1.1')
+            record = writer.create_warc_record(url, 'response', payload=io.BytesIO(body), http_headers=http_headers,
+                                               warc_headers_dict={'WARC-Date': '2020-05-01T00:00:00Z'})
+            writer.write_record(record)
+            if content_type.startswith('text/html'):
+                urls.append(url)
+    return urls
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files like commoncrawl.org, including HTTP range requests."""
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+        if not match or not os.path.isfile(path):
+            return super().do_GET()
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else os.path.getsize(path) - 1
+        with open(path, 'rb') as served_file:
+            served_file.seek(start)
+            data = served_file.read(end - start + 1)
+        self.send_response(206)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def warc_urls(tmp_path, monkeypatch):
+    """Serves a WARC file at WARC_PATH on a local HTTP server, returns the urls of its HTML responses."""
+    os.makedirs(os.path.dirname(str(tmp_path / WARC_PATH)))
+    urls = write_warc(str(tmp_path / WARC_PATH))
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0), lambda *args, **kwargs: RangeRequestHandler(*args, directory=str(tmp_path), **kwargs))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(CommonCrawlExtractor, '_CommonCrawlExtractor__cc_base_url',
+                        'http://127.0.0.1:%i/' % server.server_address[1])
+    yield urls
+    server.shutdown()
+    server.server_close()
+
+
+def extract(tmp_path, **kwargs):
+    """Extracts the WARC file, returns the urls of the extracted articles and the number of discarded records per
+    filter stage."""
+    urls = []
+    rejected = {}
+    CommonCrawlExtractor().extract_from_commoncrawl(
+        WARC_PATH, lambda article: urls.append(article.url),
+        callback_on_warc_completed=lambda *args, counter_article_rejected_by_stage: rejected.update(
+            counter_article_rejected_by_stage),
+        local_download_dir_warc=str(tmp_path / 'download'), **kwargs)
+    return urls, rejected
+
+
+def test_downloaded_file(tmp_path, warc_urls):
+    urls, rejected = extract(tmp_path)
+    assert urls == warc_urls
+    assert rejected['headers'] == NUMBER_OF_RECORDS - len(warc_urls)
+
+
+def test_streaming_delivers_records_in_order(tmp_path, warc_urls):
+    urls, rejected = extract(tmp_path, stream_warc=True)
+    assert urls == warc_urls
+    assert rejected['headers'] == NUMBER_OF_RECORDS - len(warc_urls)
+    assert not os.path.exists(str(tmp_path / 'download' / os.path.basename(WARC_PATH)))
+
+
+@pytest.mark.parametrize('stream_warc', [False, True])
+def test_parallel_extraction_delivers_records_in_order(tmp_path, warc_urls, stream_warc):
+    urls, rejected = extract(tmp_path, stream_warc=stream_warc, number_of_record_extraction_processes=3)
+    assert urls == warc_urls
+    assert rejected['headers'] == NUMBER_OF_RECORDS - len(warc_urls)
+
+
+def test_parallel_extraction_without_ordered_delivery(tmp_path, warc_urls):
+    urls, rejected = extract(tmp_path, stream_warc=True, number_of_record_extraction_processes=3,
+                             ordered_record_delivery=False)
+    assert sorted(urls) == sorted(warc_urls)
+
+
+def record_ranges(tmp_path, urls):
+    """Returns the (offset, length) ranges of the records of the given urls in the WARC file."""
+    ranges = []
+    with open(str(tmp_path / WARC_PATH), 'rb') as warc_file:
+        records = ArchiveIterator(warc_file)
+        for record in records:
+            url = record.rec_headers.get_header('WARC-Target-URI')
+            records.read_to_end()
+            if url in urls:
+                ranges.append((records.get_record_offset(), records.get_record_length()))
+    return ranges
+
+
+# a gap of 0 bytes fetches every record with its own request, the default gap fetches all records with one request
+@pytest.mark.parametrize('max_range_gap', [0, 64 * 1024])
+@pytest.mark.parametrize('number_of_record_extraction_processes', [1, 3])
+def test_record_ranges(tmp_path, warc_urls, monkeypatch, number_of_record_extraction_processes, max_range_gap):
+    monkeypatch.setattr(CommonCrawlExtractor, '_CommonCrawlExtractor__max_range_gap', max_range_gap)
+    selected_urls = warc_urls[::3]
+    urls, rejected = extract(tmp_path, warc_record_ranges=record_ranges(tmp_path, selected_urls),
+                             number_of_record_extraction_processes=number_of_record_extraction_processes)
+    assert urls == selected_urls
+    assert not os.path.exists(str(tmp_path / 'download' / os.path.basename(WARC_PATH)))
+
+
+def test_prefetching_with_parallel_extraction(tmp_path, warc_urls):
+    # the record processes are started while the prefetching thread downloads the next WARC file
+    second_warc_path = WARC_PATH.replace('-00000.', '-00001.')
+    second_warc_urls = write_warc(str(tmp_path / second_warc_path))
+    urls = []
+    start_commoncrawl_extractors = getattr(commoncrawl_crawler, '__start_commoncrawl_extractors')
+    start_commoncrawl_extractors([WARC_PATH, second_warc_path], number_of_prefetched_warc_files=1,
+                                 callback_on_article_extracted=lambda article: urls.append(article.url),
+                                 local_download_dir_warc=str(tmp_path / 'download'),
+                                 number_of_record_extraction_processes=3)
+    assert urls == warc_urls + second_warc_urls
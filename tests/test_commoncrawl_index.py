@@ -0,0 +1,73 @@
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+from newsplease.crawler.commoncrawl_index import CdxIndexSource, ParquetIndexSource
+
+CDXJ_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'commoncrawl_index', 'index.cdxj')
+WARC_A = 'crawl-data/CC-NEWS/2020/05/a.warc.gz'
+WARC_B = 'crawl-data/CC-NEWS/2020/05/b.warc.gz'
+
+# the records of example.com and its subdomains in the index, grouped by WARC file and sorted by offset
+EXAMPLE_COM_RANGES = {
+    WARC_A: [(1200, 800), (5000, 700)],
+    WARC_B: [(0, 400), (400, 500)],
+}
+
+
+def cdxj_records():
+    """Returns the (warc_filename, offset, length, host) tuples of the valid lines of the CDXJ fixture."""
+    records = []
+    with open(CDXJ_PATH) as index_file:
+        for line in index_file:
+            fields = json.loads(line.split(' ', 2)[2])
+            if 'filename' in fields:
+                host = fields['url'].split('/')[2]
+                records.append((fields['filename'], int(fields['offset']), int(fields['length']), host))
+    return records
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    warc_filenames, offsets, lengths, hosts = zip(*cdxj_records())
+    table = pa.table({
+        'url_host_name': list(hosts),
+        'warc_filename': list(warc_filenames),
+        'warc_record_offset': pa.array(offsets, pa.int32()),
+        'warc_record_length': pa.array(lengths, pa.int32()),
+    })
+    path = str(tmp_path / 'index.parquet')
+    # small row groups, so that the lookup reads several batches
+    pq.write_table(table, path, row_group_size=2)
+    return path
+
+
+def test_cdx_lookup_by_warc_path():
+    assert CdxIndexSource(CDXJ_PATH).lookup_by_warc_path(['example.com']) == EXAMPLE_COM_RANGES
+
+
+def test_cdx_lookup_without_hosts_skips_malformed_lines():
+    records = list(CdxIndexSource(CDXJ_PATH).lookup())
+    assert records == [(warc_filename, offset, length) for warc_filename, offset, length, host in cdxj_records()]
+
+
+def test_cdx_lookup_of_compressed_files(tmp_path):
+    compressed_path = str(tmp_path / 'index.cdxj.gz')
+    with open(CDXJ_PATH, 'rb') as index_file, gzip.open(compressed_path, 'wb') as compressed_file:
+        shutil.copyfileobj(index_file, compressed_file)
+    source = CdxIndexSource([compressed_path, CDXJ_PATH])
+    assert source.lookup_by_warc_path(['news.example.org']) == {WARC_A: [(3000, 600), (3000, 600)]}
+
+
+def test_parquet_lookup_by_warc_path(parquet_path):
+    assert ParquetIndexSource(parquet_path).lookup_by_warc_path(['example.com']) == EXAMPLE_COM_RANGES
+
+
+def test_parquet_lookup_without_hosts(parquet_path):
+    records = list(ParquetIndexSource(parquet_path).lookup())
+    assert records == [(warc_filename, offset, length) for warc_filename, offset, length, host in cdxj_records()]
@@ -0,0 +1,45 @@
+from newsplease.pipeline.extractor.article_candidate import ArticleCandidate
+from newsplease.pipeline.extractor.comparer.comparer_text import ComparerText
+
+
+def candidate(extractor, text):
+    article_candidate = ArticleCandidate()
+    article_candidate.extractor = extractor
+    article_candidate.text = text
+    return article_candidate
+
+
+def words(prefix, number):
+    return ' '.join('%s%i' % (prefix, i) for i in range(number))
+
+
+def test_texts_without_common_words():
+    # the score of texts without common words used to divide by zero
+    short_text, long_text = words('a', 20), words('b', 30)
+    assert ComparerText().extract(None, [candidate('x', short_text), candidate('y', long_text)]) == long_text
+
+
+def test_texts_without_common_words_are_least_similar():
+    text = words('a', 30)
+    similar_text = words('a', 25)
+    other_text = words('b', 40)
+    candidates = [candidate('x', other_text), candidate('y', similar_text), candidate('z', text)]
+    assert ComparerText().extract(None, candidates) == text
+
+
+def test_newspaper_is_preferred_among_most_similar_texts():
+    text = words('a', 30)
+    candidates = [candidate('newspaper', words('a', 25)), candidate('y', text), candidate('z', words('b', 40))]
+    assert ComparerText().extract(None, candidates) == words('a', 25)
+
+
+def test_short_texts_are_left_out():
+    # two short texts in a row used to leave the second one in the list, which then was compared to the long text
+    long_text = words('a', 20)
+    candidates = [candidate('x', 'short text'), candidate('y', 'also short'), candidate('z', long_text)]
+    assert ComparerText().extract(None, candidates) == long_text
+
+
+def test_no_text():
+    candidates = [candidate('x', None), candidate('y', 'short text')]
+    assert ComparerText().extract(None, candidates) is None
@@ -0,0 +1,32 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from newsplease.crawler.items import NewscrawlerItem
+from newsplease.pipeline.extractor.extractors.date_extractor import DateExtractor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'date_extractor')
+
+# the publishing dates that the DateExtractor extracted from the fixtures before the meta tags were looked up in an
+# index, formatted as its parse_date_str did before it returned naive datetimes
+with open(os.path.join(FIXTURES, 'expected.json')) as expected_file:
+    EXPECTED = json.load(expected_file)
+
+
+@pytest.mark.parametrize('filename', sorted(EXPECTED))
+def test_publish_date_is_unchanged(filename):
+    with open(os.path.join(FIXTURES, filename)) as html_file:
+        html = html_file.read()
+    item = NewscrawlerItem()
+    item['url'] = EXPECTED[filename]['url']
+    item['spider_response'] = SimpleNamespace(body=html)
+
+    publish_date = DateExtractor()._publish_date(item)
+
+    if EXPECTED[filename]['publish_date'] is None:
+        assert publish_date is None
+    else:
+        assert publish_date.tzinfo is None
+        assert publish_date.strftime('%Y-%m-%d %H:%M:%S') == EXPECTED[filename]['publish_date']
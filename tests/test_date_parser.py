@@ -0,0 +1,20 @@
+import datetime
+
+from newsplease.helper_classes.date_parser import _parse_with_dateutil, parse_date
+
+
+def test_missing_fields_are_taken_from_the_current_date():
+    assert parse_date('5 March') == datetime.datetime(datetime.date.today().year, 3, 5)
+
+
+def test_memoized_results_depend_on_the_day():
+    # the memoized result of one day must not be returned on another day
+    assert _parse_with_dateutil('5 March', datetime.date(2020, 12, 31)) == datetime.datetime(2020, 3, 5)
+    assert _parse_with_dateutil('5 March', datetime.date(2021, 1, 1)) == datetime.datetime(2021, 3, 5)
+    assert _parse_with_dateutil('14:30', datetime.date(2021, 1, 1)) == datetime.datetime(2021, 1, 1, 14, 30)
+
+
+def test_fully_specified_strings():
+    assert parse_date('2015-11-26T07:11:02Z') == datetime.datetime(2015, 11, 26, 7, 11, 2, tzinfo=datetime.timezone.utc)
+    assert parse_date('November 26, 2015') == datetime.datetime(2015, 11, 26)
+    assert parse_date('no date') is None
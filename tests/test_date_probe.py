@@ -0,0 +1,86 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from newsplease.crawler.commoncrawl_extractor import CommonCrawlExtractor
+from newsplease.pipeline.extractor.extractors.date_extractor import DateExtractor
+
+URL = 'https://example.com/news/article.html'
+
+# HTML with conflicting publishing dates, the DateExtractor takes the first date of its rule order
+CONFLICTING_DATES = {
+    'weak meta tag before strong meta tag': '''<html><head>
+        <meta name="date" content="2015-03-01">
+        <meta property="article:published_time" content="2020-06-15T10:00:00Z">
+        </head><body><p>Text</p></body></html>''',
+    'strong meta tag before weak meta tag': '''<html><head>
+        <meta property="article:published_time" content="2020-06-15T10:00:00+02:00">
+        <meta name="date" content="2015-03-01">
+        </head><body><p>Text</p></body></html>''',
+    'http-equiv before strong meta tag': '''<html><head>
+        <meta http-equiv="date" content="Sun, 01 Mar 2015 10:00:00 GMT">
+        <meta itemprop="datePublished" content="2020-06-15">
+        </head><body><p>Text</p></body></html>''',
+    'image URL with a date before strong meta tag': '''<html><head>
+        <meta property="og:image" content="https://example.com/images/2015-03-01/photo.jpg">
+        <meta property="article:published_time" content="2020-06-15">
+        </head><body><p>Text</p></body></html>''',
+    'unquoted weak meta tag before strong meta tag': '''<html><head>
+        <meta name=timestamp content=2015-03-01>
+        <meta property="article:published_time" content="2020-06-15">
+        </head><body><p>Text</p></body></html>''',
+    'first JSON-LD block without date, second with date': '''<html><head>
+        <script type="application/ld+json">{"@type": "Organization", "name": "Example"}</script>
+        <script type="application/ld+json">{"@type": "NewsArticle", "datePublished": "2015-03-01"}</script>
+        <meta property="article:published_time" content="2020-06-15">
+        </head><body><p>Text</p></body></html>''',
+    'JSON-LD dateCreated and datePublished': '''<html><head>
+        <script type="application/ld+json">
+        {"@type": "NewsArticle", "datePublished": "2015-03-01", "dateCreated": "2020-06-15"}
+        </script>
+        </head><body><p>Text</p></body></html>''',
+    'JSON-LD before meta tag': '''<html><head>
+        <meta property="article:published_time" content="2015-03-01">
+        <script type="application/ld+json">{"@type": "NewsArticle", "datePublished": "2020-06-15"}</script>
+        </head><body><p>Text</p></body></html>''',
+    'JSON-LD list': '''<html><head>
+        <script type="application/ld+json">[{"@type": "NewsArticle", "datePublished": "2015-03-01"}]</script>
+        <meta property="article:published_time" content="2020-06-15">
+        </head><body><p>Text</p></body></html>''',
+}
+
+
+def extract_date(html):
+    item = {'url': URL, 'spider_response': SimpleNamespace(body=html)}
+    return DateExtractor()._publish_date(item)
+
+
+def probe(html, start_date, end_date):
+    extractor = CommonCrawlExtractor()
+    extractor._CommonCrawlExtractor__filter_start_date = start_date
+    extractor._CommonCrawlExtractor__filter_end_date = end_date
+    return extractor.filter_record_date_probe(SimpleNamespace(payload=html.encode('utf-8')))
+
+
+@pytest.mark.parametrize('html', CONFLICTING_DATES.values(), ids=list(CONFLICTING_DATES))
+@pytest.mark.parametrize('start_date, end_date', [
+    (datetime.datetime(2015, 1, 1), datetime.datetime(2015, 12, 31)),
+    (datetime.datetime(2020, 1, 1), datetime.datetime(2020, 12, 31)),
+])
+def test_probe_keeps_records_that_the_date_extractor_keeps(html, start_date, end_date):
+    date = extract_date(html)
+    assert date is not None
+    if start_date <= date <= end_date:
+        assert probe(html, start_date, end_date)
+
+
+@pytest.mark.parametrize('html, expected_date', [
+    (CONFLICTING_DATES['strong meta tag before weak meta tag'], datetime.datetime(2020, 6, 15, 10)),
+    (CONFLICTING_DATES['JSON-LD dateCreated and datePublished'], datetime.datetime(2020, 6, 15)),
+    (CONFLICTING_DATES['JSON-LD before meta tag'], datetime.datetime(2020, 6, 15)),
+], ids=['meta tag', 'JSON-LD dateCreated', 'JSON-LD'])
+def test_probe_rejects_records_on_strong_signals(html, expected_date):
+    assert extract_date(html) == expected_date
+    assert not probe(html, datetime.datetime(2015, 1, 1), datetime.datetime(2015, 12, 31))
+    assert probe(html, datetime.datetime(2020, 1, 1), datetime.datetime(2020, 12, 31))
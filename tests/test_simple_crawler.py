@@ -0,0 +1,12 @@
+from newsplease.crawler.simple_crawler import SimpleCrawler
+
+
+def test_invalid_url_maps_to_none(monkeypatch):
+    # an invalid url used to raise a ValueError while the urls were grouped by host, which aborted all requests
+    monkeypatch.setattr(SimpleCrawler, 'fetch_url', staticmethod(lambda url, request_args=None: 'html of ' + url))
+    urls = ['https://example.com/a', 'http://[::1', 'https://example.org/b']
+    assert SimpleCrawler.fetch_urls(urls) == {
+        'https://example.com/a': 'html of https://example.com/a',
+        'http://[::1': None,
+        'https://example.org/b': 'html of https://example.org/b',
+    }
@@ -0,0 +1,57 @@
+import signal
+import threading
+import time
+
+import pytest
+
+from newsplease.pipeline.extractor.article_extractor import ExtractionTimeout, _time_limit
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, 'setitimer'), reason='requires SIGALRM')
+
+
+@pytest.fixture
+def alarms():
+    fired = []
+    previous_handler = signal.signal(signal.SIGALRM, lambda signum, frame: fired.append(signum))
+    yield fired
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    signal.signal(signal.SIGALRM, previous_handler)
+
+
+def test_timeout():
+    with pytest.raises(ExtractionTimeout):
+        with _time_limit(0.05):
+            time.sleep(1)
+
+
+def test_previous_handler_and_timer_are_restored(alarms):
+    signal.setitimer(signal.ITIMER_REAL, 0.3)
+    with _time_limit(5):
+        time.sleep(0.1)
+    assert 0 < signal.getitimer(signal.ITIMER_REAL)[0] <= 0.2
+    time.sleep(0.3)
+    assert alarms == [signal.SIGALRM]
+
+
+def test_expired_previous_timer_fires_after_the_block(alarms):
+    signal.setitimer(signal.ITIMER_REAL, 0.05)
+    with _time_limit(5):
+        time.sleep(0.1)
+    time.sleep(0.05)
+    assert alarms == [signal.SIGALRM]
+
+
+def test_not_enforced_in_other_threads():
+    errors = []
+
+    def run():
+        try:
+            with _time_limit(0.01):
+                time.sleep(0.05)
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert errors == []